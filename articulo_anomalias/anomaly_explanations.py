@@ -0,0 +1,171 @@
+import numpy as np
+import pandas as pd
+
+
+def _node_depths(tree):
+    """Profundidad de cada nodo de un árbol de scikit-learn (recorrido por niveles)"""
+    left, right = tree.tree_.children_left, tree.tree_.children_right
+    depths = np.zeros(tree.tree_.node_count, dtype=np.float64)
+    frontier, depth = np.array([0]), 0
+    while frontier.size:
+        depths[frontier] = depth
+        children = np.concatenate([left[frontier], right[frontier]])
+        frontier = children[children != -1]
+        depth += 1
+    return depths
+
+
+class AnomalyExplainer:
+    """
+    Explicaciones por característica calculadas bajo demanda
+
+    Solo se explican las filas pedidas (normalmente las anomalías que se
+    exportan o se muestran), en lotes vectorizados, y el resultado queda en
+    caché por fila.
+
+    - Isolation Forest: cada división del camino de la fila en cada árbol
+      aporta log(n_padre / n_hijo) a la característica usada, es decir, cuánto
+      redujo la partición en la que cae el registro; la suma del camino es
+      log(n_raíz / n_hoja), así que las contribuciones reparten el aislamiento.
+      También se guarda la profundidad media de la primera división sobre cada
+      característica (profundidad de aislamiento).
+    - Otros motores: `feature_scores` del motor por encima de su nivel base.
+
+    Las contribuciones de cada fila se normalizan para sumar 1.
+    """
+
+    def __init__(self, engine, X, feature_names, batch_size=2000, baseline_rows=None):
+        """
+        Parameters:
+        - engine: DetectorEngine ya ajustado
+        - X: Matriz escalada con la que se ajustó el motor (se guarda por referencia)
+        - feature_names: Nombres de las columnas de X
+        - batch_size: Filas por lote al explicar
+        - baseline_rows: Filas de X para el nivel base de motores sin árboles (None = 10K al azar)
+        """
+        self.engine = engine
+        self.X = X
+        self.feature_names = list(feature_names)
+        self.batch_size = batch_size
+        self.baseline_rows = baseline_rows
+        # Caché: posición de cada fila en los arreglos guardados (-1 = sin calcular)
+        self._slot = np.full(len(X), -1, dtype=np.int64)
+        self._cached_contrib = np.empty((0, len(self.feature_names)))
+        self._cached_depth = np.empty((0, len(self.feature_names)))
+        self._depths = None
+        self._baseline = None
+
+        model = getattr(engine, 'model', None)
+        self.uses_trees = model is not None and hasattr(model, 'estimators_')
+
+    # ------------------------------------------------------------------
+    # Cálculo por lotes
+    # ------------------------------------------------------------------
+    def _explain_trees(self, X):
+        model = self.engine.model
+        if self._depths is None:
+            self._depths = [_node_depths(tree) for tree in model.estimators_]
+
+        n, p = X.shape
+        contributions = np.zeros(n * p)
+        depth_sum = np.zeros(n * p)
+        depth_count = np.zeros(n * p)
+        X = np.asarray(X, dtype=np.float32)
+
+        for tree, features, depths in zip(model.estimators_, model.estimators_features_, self._depths):
+            t = tree.tree_
+            path = tree.decision_path(X[:, features])
+            rows = np.repeat(np.arange(n), np.diff(path.indptr))
+            # Los nodos de cada fila van de la raíz a la hoja: el siguiente es el hijo
+            internal = np.nonzero(t.children_left[path.indices] != -1)[0]
+            nodes, children = path.indices[internal], path.indices[internal + 1]
+            rows = rows[internal]
+
+            keys = rows * p + features[t.feature[nodes]]
+            node_depth = depths[nodes]
+            reduction = np.log(t.n_node_samples[nodes] / t.n_node_samples[children])
+            contributions += np.bincount(keys, weights=reduction, minlength=n * p)
+
+            # Primera división sobre cada característica en el camino de la fila
+            first = np.full(n * p, np.inf)
+            np.minimum.at(first, keys, node_depth)
+            used = np.isfinite(first)
+            depth_sum[used] += first[used]
+            depth_count[used] += 1
+
+        with np.errstate(invalid='ignore'):
+            isolation_depth = depth_sum / depth_count
+        return contributions.reshape(n, p), isolation_depth.reshape(n, p)
+
+    def _explain_scores(self, X):
+        if self._baseline is None:
+            # Nivel base: mínimo de cada característica en una muestra de los datos
+            sample = self.baseline_rows
+            if sample is None:
+                rng = np.random.default_rng(0)
+                sample = rng.choice(len(self.X), size=min(len(self.X), 10000), replace=False)
+            self._baseline = self.engine.feature_scores(self.X[sample]).min(axis=0)
+        contributions = np.maximum(self.engine.feature_scores(X) - self._baseline, 0)
+        return contributions, np.full(X.shape, np.nan)
+
+    def contributions(self, rows):
+        """
+        Contribuciones normalizadas y profundidad de aislamiento de las filas pedidas
+
+        Parameters:
+        - rows: Posiciones de las filas en X
+
+        Returns:
+        - contributions: Matriz (len(rows) x características), cada fila suma 1
+        - isolation_depth: Profundidad media de la primera división por característica (NaN si no aplica)
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        pending = np.unique(rows[self._slot[rows] < 0])
+
+        if len(pending):
+            new_contrib, new_depth = [], []
+            for start in range(0, len(pending), self.batch_size):
+                X = np.asarray(self.X[pending[start:start + self.batch_size]], dtype=np.float64)
+                if self.uses_trees:
+                    contrib, depth = self._explain_trees(X)
+                else:
+                    contrib, depth = self._explain_scores(X)
+                totals = contrib.sum(axis=1, keepdims=True)
+                new_contrib.append(np.divide(contrib, totals, out=np.zeros_like(contrib), where=totals > 0))
+                new_depth.append(depth)
+
+            self._slot[pending] = len(self._cached_contrib) + np.arange(len(pending))
+            self._cached_contrib = np.concatenate([self._cached_contrib] + new_contrib)
+            self._cached_depth = np.concatenate([self._cached_depth] + new_depth)
+
+        slots = self._slot[rows]
+        return self._cached_contrib[slots], self._cached_depth[slots]
+
+    def explain(self, rows, top_k=3):
+        """
+        Principales factores de cada fila como texto y columnas
+
+        Returns:
+        - DataFrame indexado por posición con EXPLICACION, FACTOR_PRINCIPAL,
+          PESO_FACTOR_PRINCIPAL y PROFUNDIDAD_FACTOR_PRINCIPAL
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        columns = ['EXPLICACION', 'FACTOR_PRINCIPAL', 'PESO_FACTOR_PRINCIPAL', 'PROFUNDIDAD_FACTOR_PRINCIPAL']
+        if len(rows) == 0:
+            return pd.DataFrame(columns=columns)
+
+        contrib, depth = self.contributions(rows)
+        names = np.array(self.feature_names)
+
+        top = np.argsort(-contrib, axis=1)[:, :top_k]
+        weights = np.take_along_axis(contrib, top, axis=1)
+        # El signo del valor escalado indica si está por encima o debajo de la media
+        above = np.take_along_axis(np.asarray(self.X[rows]), top, axis=1) >= 0
+
+        texts = []
+        for idx, w, up in zip(top, weights, above):
+            parts = [f"{names[j]} {'↑' if u else '↓'} ({wj:.0%})" for j, wj, u in zip(idx, w, up) if wj >= 0.005]
+            texts.append('; '.join(parts))
+
+        top_depth = np.take_along_axis(depth, top[:, :1], axis=1)[:, 0]
+        return pd.DataFrame(dict(zip(columns, [texts, names[top[:, 0]], weights[:, 0], top_depth])), index=rows)
@@ -0,0 +1,118 @@
+"""
+Fuentes CSV comprimidas y de varios meses
+
+Lee los CSV directamente desde archivos .zip o .gz (sin extraerlos a disco)
+y permite apuntar a un patrón glob de exportaciones mensuales, p. ej.
+'exportaciones/reporte_2024*.zip'. Los archivos se abren de uno en uno a
+medida que se consumen los chunks, así que varios meses se leen como un solo
+flujo sin tenerlos todos abiertos ni descomprimidos a la vez. Cada fila se
+etiqueta con el periodo de su fuente (PERIODO_FUENTE).
+"""
+import glob
+import gzip
+import os
+import re
+import zipfile
+import pandas as pd
+
+SOURCE_COLUMN = 'PERIODO_FUENTE'
+ARCHIVE_SUFFIXES = ('.zip', '.gz')
+# AAAAMM, AAAA-MM o AAAA_MM en el nombre del archivo
+_PERIOD_PATTERN = re.compile(r'(?<!\d)(20\d{2})[-_]?(0[1-9]|1[0-2])(?!\d)')
+
+
+def is_archive_source(source):
+    """True si la fuente es un archivo comprimido, un patrón glob o una lista de archivos"""
+    if isinstance(source, (list, tuple)):
+        return True
+    source = str(source)
+    return source.lower().endswith(ARCHIVE_SUFFIXES) or glob.has_magic(source)
+
+
+def expand_sources(source):
+    """
+    Rutas de un patrón glob, una ruta o una lista de ambos
+
+    Los archivos de cada patrón se ordenan por periodo (los formatos AAAAMM y
+    AAAA-MM no se ordenan bien como texto) y después por nombre.
+    """
+    patterns = source if isinstance(source, (list, tuple)) else [source]
+    paths = []
+    for pattern in patterns:
+        pattern = str(pattern)
+        if glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern), key=lambda path: (source_period(path) or '', path)))
+        else:
+            paths.append(pattern)
+    if not paths:
+        raise FileNotFoundError(f"Ningún archivo coincide con {source}")
+    return paths
+
+
+def source_period(name):
+    """Periodo AAAAMM del nombre del archivo o miembro (None si no tiene)"""
+    match = _PERIOD_PATTERN.search(os.path.basename(name))
+    return f"{match.group(1)}{match.group(2)}" if match else None
+
+
+def iter_members(path):
+    """
+    Miembros CSV de una fuente como (nombre, archivo binario abierto)
+
+    - .zip: cada miembro .csv, en el orden del archivo
+    - .gz: el contenido descomprimido
+    - otro: el archivo tal cual
+    """
+    lower = path.lower()
+    if lower.endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith('.csv'):
+                    with archive.open(info) as handle:
+                        yield info.filename, handle
+    elif lower.endswith('.gz'):
+        with gzip.open(path, 'rb') as handle:
+            yield path[:-3], handle
+    else:
+        with open(path, 'rb') as handle:
+            yield path, handle
+
+
+def read_csv_chunks(source, chunksize=100000, tag_column=SOURCE_COLUMN, **read_csv_kwargs):
+    """
+    Chunks de todas las fuentes encadenados de forma perezosa
+
+    Parameters:
+    - source: Ruta, patrón glob o lista de rutas (.csv, .zip o .gz)
+    - chunksize: Filas por chunk
+    - tag_column: Columna con el periodo de la fuente (None = no etiquetar)
+    - read_csv_kwargs: Argumentos para `pd.read_csv` (dtype, encoding, ...)
+
+    El periodo se toma del nombre del miembro, o del archivo si el miembro no
+    lo tiene; si ninguno lo tiene se usa el nombre del archivo sin extensión.
+    """
+    for path in expand_sources(source):
+        for member, handle in iter_members(path):
+            period = source_period(member) or source_period(path) or \
+                os.path.basename(path).split('.')[0]
+            for chunk in pd.read_csv(handle, chunksize=chunksize, **read_csv_kwargs):
+                if tag_column:
+                    chunk[tag_column] = period
+                yield chunk
+
+
+def read_csv_sources(source, chunksize=100000, tag_column=SOURCE_COLUMN, **read_csv_kwargs):
+    """
+    Lee todas las fuentes en un DataFrame
+
+    Las columnas 'category' del dtype se vuelven a categorizar al final, ya
+    que los chunks traen categorías distintas y `pd.concat` las pierde.
+    """
+    data = pd.concat(read_csv_chunks(source, chunksize, tag_column, **read_csv_kwargs), ignore_index=True)
+    dtype = read_csv_kwargs.get('dtype') or {}
+    categories = [col for col, t in dtype.items() if t == 'category' and col in data]
+    if tag_column:
+        categories.append(tag_column)
+    for col in categories:
+        data[col] = data[col].astype('category')
+    return data
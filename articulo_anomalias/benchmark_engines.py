@@ -0,0 +1,108 @@
+"""
+Benchmark de motores de detección: velocidad y concordancia con Isolation Forest
+
+Uso:
+    python benchmark_engines.py --archivo reporte.csv --contaminacion 0.05
+    python benchmark_engines.py --filas 343000            # datos sintéticos
+"""
+import argparse
+import importlib.machinery
+import importlib.util
+import os
+import time
+import numpy as np
+from scipy import stats
+from sklearn.preprocessing import StandardScaler
+from detector_engines import create_engine
+
+
+def cargar_matriz_electro(archivo):
+    """Genera la misma matriz de características que el detector avanzado"""
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'codigo_fuente')
+    loader = importlib.machinery.SourceFileLoader('codigo_fuente', ruta)
+    spec = importlib.util.spec_from_loader('codigo_fuente', loader)
+    modulo = importlib.util.module_from_spec(spec)
+    loader.exec_module(modulo)
+
+    detector = modulo.ElectroPunoAnomalyDetectorAdvanced()
+    data = detector.load_and_preprocess_data(archivo)
+    X = detector.select_features_for_model(data)
+    X = X.replace([np.inf, -np.inf], np.nan)
+    X = X.fillna(X.median())
+    return StandardScaler().fit_transform(X)
+
+
+def matriz_sintetica(filas, columnas=20, contaminacion=0.05, semilla=42):
+    """Datos log-normales con una fracción de registros desplazados"""
+    rng = np.random.default_rng(semilla)
+    X = rng.lognormal(mean=3.5, sigma=0.8, size=(filas, columnas))
+    n_anomalias = int(filas * contaminacion)
+    X[:n_anomalias] *= rng.uniform(3, 10, size=(n_anomalias, columnas))
+    return StandardScaler().fit_transform(X)
+
+
+def ejecutar_benchmark(X, contaminacion=0.05, chunk_size=100000, repeticiones=1):
+    """
+    Mide ajuste y puntuación de cada motor y su concordancia con Isolation Forest
+
+    Returns:
+    - Lista de diccionarios con tiempos y métricas de concordancia
+    """
+    resultados = []
+    referencia = None
+
+    for nombre in ['isolation_forest', 'hbos', 'robust_z']:
+        tiempos_fit, tiempos_score = [], []
+        for _ in range(repeticiones):
+            motor = create_engine(nombre, contamination=contaminacion, chunk_size=chunk_size)
+            inicio = time.perf_counter()
+            motor.fit(X)
+            tiempos_fit.append(time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            scores = motor.score_samples(X)
+            tiempos_score.append(time.perf_counter() - inicio)
+
+        anomalias = scores < motor.offset_
+        if referencia is None:
+            referencia = (scores, anomalias)
+
+        interseccion = np.sum(anomalias & referencia[1])
+        union = np.sum(anomalias | referencia[1])
+        resultados.append({
+            'motor': motor.name,
+            'fit_s': min(tiempos_fit),
+            'score_s': min(tiempos_score),
+            'anomalias': int(anomalias.sum()),
+            'jaccard_vs_if': interseccion / union if union else 1.0,
+            'spearman_vs_if': stats.spearmanr(scores, referencia[0])[0],
+        })
+
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de motores de detección de anomalías")
+    parser.add_argument('--archivo', help="CSV de Electro Puno (si se omite se usan datos sintéticos)")
+    parser.add_argument('--filas', type=int, default=343000, help="Filas sintéticas")
+    parser.add_argument('--contaminacion', type=float, default=0.05)
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--repeticiones', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.archivo:
+        X = cargar_matriz_electro(args.archivo)
+    else:
+        X = matriz_sintetica(args.filas, contaminacion=args.contaminacion)
+
+    print(f"\n⏱️  BENCHMARK DE MOTORES ({X.shape[0]:,} registros x {X.shape[1]} características)")
+    print("-" * 80)
+    print(f"{'Motor':<18} {'Ajuste (s)':<12} {'Score (s)':<12} {'Anomalías':<10} {'Jaccard IF':<11} {'Spearman IF':<11}")
+    print("-" * 80)
+    for r in ejecutar_benchmark(X, args.contaminacion, args.chunk_size, args.repeticiones):
+        print(f"{r['motor']:<18} {r['fit_s']:<12.3f} {r['score_s']:<12.3f} {r['anomalias']:<10,} "
+              f"{r['jaccard_vs_if']:<11.3f} {r['spearman_vs_if']:<11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Intervalos de confianza bootstrap (percentil y BCa) vectorizados
+
+Una remuestra con reemplazo de n datos solo depende de cuántas veces sale cada
+valor distinto, así que se representa como un vector de conteos multinomial
+sobre los valores únicos (por estrato si se estratifica). El consumo tiene
+unos pocos miles de valores distintos frente a 343K filas, por lo que cada
+lote de remuestras es una matriz (remuestras x valores únicos) y los
+estadísticos salen de productos matriz-vector y sumas acumuladas.
+
+Los lotes se reparten entre procesos; cada lote usa su propio SeedSequence
+hijo, de modo que el resultado no depende del número de procesos.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+
+PERCENTILES = {
+    'mediana': 0.50,
+    'percentil_25': 0.25,
+    'percentil_75': 0.75,
+    'percentil_90': 0.90,
+    'percentil_95': 0.95,
+    'percentil_99': 0.99,
+}
+ESTADISTICOS = ['media', 'desviacion_estandar', 'coeficiente_variacion'] + list(PERCENTILES)
+
+
+def comprimir(datos, estratos=None):
+    """
+    Valores únicos y sus conteos (por estrato si se indica)
+
+    Returns:
+    - valores: Valores ordenados de menor a mayor (con repetidos entre estratos)
+    - conteos: Conteo de cada valor dentro de su estrato
+    - estrato: Código del estrato de cada valor
+    """
+    datos = np.asarray(datos, dtype=np.float64)
+    if estratos is None:
+        codigos = np.zeros(len(datos), dtype=np.int64)
+    else:
+        codigos = pd.factorize(np.asarray(estratos))[0].astype(np.int64)
+
+    pares = pd.DataFrame({'estrato': codigos, 'valor': datos})
+    tabla = pares.groupby(['estrato', 'valor'], sort=False).size().reset_index(name='conteo')
+    orden = np.argsort(tabla['valor'].to_numpy(), kind='stable')
+    return (tabla['valor'].to_numpy()[orden], tabla['conteo'].to_numpy()[orden],
+            tabla['estrato'].to_numpy()[orden])
+
+
+def _cuantiles_desde_conteos(acumulado, valores, n, q):
+    """
+    Cuantil con interpolación lineal (como pandas) para cada fila de conteos acumulados
+
+    acumulado: (B x K) suma acumulada de conteos sobre los valores ordenados
+    """
+    B = acumulado.shape[0]
+    h = (n - 1) * q
+    bajo = int(np.floor(h))
+    alto = min(bajo + 1, n - 1)
+    # Búsqueda binaria en todas las filas a la vez desplazando cada fila
+    desplazamiento = (np.arange(B) * (n + 1))[:, None]
+    plano = (acumulado + desplazamiento).ravel()
+    K = acumulado.shape[1]
+    i_bajo = np.searchsorted(plano, bajo + desplazamiento[:, 0], side='right') - np.arange(B) * K
+    i_alto = np.searchsorted(plano, alto + desplazamiento[:, 0], side='right') - np.arange(B) * K
+    return valores[i_bajo] + (h - bajo) * (valores[i_alto] - valores[i_bajo])
+
+
+def estadisticos_desde_conteos(conteos, valores, n):
+    """
+    Estadísticos de cada remuestra representada por conteos (B x K)
+
+    Returns:
+    - dict {estadístico: arreglo de B valores}
+    """
+    pesos = conteos.astype(np.float64)
+    suma = pesos @ valores
+    suma_cuadrados = pesos @ (valores ** 2)
+    media = suma / n
+    varianza = np.maximum(suma_cuadrados - n * media ** 2, 0) / (n - 1)
+    desviacion = np.sqrt(varianza)
+
+    resultado = {
+        'media': media,
+        'desviacion_estandar': desviacion,
+        'coeficiente_variacion': np.divide(desviacion * 100, media, out=np.zeros_like(media), where=media != 0),
+    }
+    acumulado = np.cumsum(conteos, axis=1)
+    for nombre, q in PERCENTILES.items():
+        resultado[nombre] = _cuantiles_desde_conteos(acumulado, valores, n, q)
+    return resultado
+
+
+def _lote_bootstrap(semilla, tamano, valores, conteos, estrato):
+    """Tarea de un proceso: un lote de remuestras (estratificadas si hay varios estratos)"""
+    rng = np.random.default_rng(semilla)
+    n = int(conteos.sum())
+    muestras = np.empty((tamano, len(valores)), dtype=np.int64)
+    for s in np.unique(estrato):
+        columnas = np.flatnonzero(estrato == s)
+        n_s = int(conteos[columnas].sum())
+        muestras[:, columnas] = rng.multinomial(n_s, conteos[columnas] / n_s, size=tamano)
+    return estadisticos_desde_conteos(muestras, valores, n)
+
+
+def _jackknife(valores, conteos):
+    """
+    Estadísticos dejando fuera una observación de cada valor distinto
+
+    Todas las observaciones con el mismo valor dan el mismo resultado, así que
+    basta con K cálculos (uno por valor) ponderados por su conteo.
+    """
+    n = int(conteos.sum())
+    m = n - 1
+    suma = conteos @ valores
+    suma_cuadrados = conteos @ (valores ** 2)
+
+    media = (suma - valores) / m
+    varianza = np.maximum(suma_cuadrados - valores ** 2 - m * media ** 2, 0) / (m - 1)
+    desviacion = np.sqrt(varianza)
+    resultado = {
+        'media': media,
+        'desviacion_estandar': desviacion,
+        'coeficiente_variacion': np.divide(desviacion * 100, media, out=np.zeros_like(media), where=media != 0),
+    }
+
+    acumulado = np.cumsum(conteos)
+    posiciones = np.arange(len(valores))
+
+    def estadistico_orden(i):
+        # Primer índice con acumulado > i sin quitar nada, y con una observación menos
+        j0 = np.searchsorted(acumulado, i, side='right')
+        j1 = np.searchsorted(acumulado, i + 1, side='right')
+        # Quitar una observación del valor k baja en 1 el acumulado desde k
+        return valores[np.where(j0 < posiciones, j0, j1)]
+
+    for nombre, q in PERCENTILES.items():
+        h = (m - 1) * q
+        bajo = int(np.floor(h))
+        alto = min(bajo + 1, m - 1)
+        x_bajo, x_alto = estadistico_orden(bajo), estadistico_orden(alto)
+        resultado[nombre] = x_bajo + (h - bajo) * (x_alto - x_bajo)
+    return resultado
+
+
+def _intervalo_bca(remuestras, estimado, jackknife, pesos, nivel):
+    normal = NormalDist()
+    menores = np.mean(remuestras < estimado) + 0.5 * np.mean(remuestras == estimado)
+    menores = np.clip(menores, 1 / (len(remuestras) + 1), 1 - 1 / (len(remuestras) + 1))
+    z0 = normal.inv_cdf(menores)
+
+    media_jack = np.average(jackknife, weights=pesos)
+    diferencias = media_jack - jackknife
+    denominador = 6 * np.sum(pesos * diferencias ** 2) ** 1.5
+    aceleracion = np.sum(pesos * diferencias ** 3) / denominador if denominador > 0 else 0.0
+
+    cuantiles = []
+    for alfa in [(1 - nivel) / 2, (1 + nivel) / 2]:
+        z = z0 + normal.inv_cdf(alfa)
+        cuantiles.append(normal.cdf(z0 + z / (1 - aceleracion * z)))
+    return np.percentile(remuestras, np.array(cuantiles) * 100)
+
+
+def intervalos_bootstrap(datos, estratos=None, n_remuestras=10000, nivel=0.95, metodo='bca',
+                         semilla=42, n_procesos=1, tamano_lote=500):
+    """
+    Intervalos de confianza bootstrap para media, desviación, CV y percentiles
+
+    Args:
+        datos (array): Valores numéricos sin nulos
+        estratos (array): Estrato de cada dato (p. ej. DISTRITO) para remuestrear dentro de cada uno
+        n_remuestras (int): Número de remuestras
+        nivel (float): Nivel de confianza
+        metodo (str): 'bca' o 'percentil'
+        semilla (int): Semilla raíz
+        n_procesos (int): Procesos en paralelo (None = todos los núcleos)
+        tamano_lote (int): Remuestras por tarea
+
+    Returns:
+        pd.DataFrame: Estimado, error estándar bootstrap e intervalo por estadístico
+    """
+    if metodo not in ('bca', 'percentil'):
+        raise ValueError("metodo debe ser 'bca' o 'percentil'")
+
+    valores, conteos, estrato = comprimir(datos, estratos)
+    n = int(conteos.sum())
+    estimados = {k: v[0] for k, v in estadisticos_desde_conteos(conteos[None, :], valores, n).items()}
+
+    tamanos = [min(tamano_lote, n_remuestras - i) for i in range(0, n_remuestras, tamano_lote)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    argumentos = [(s, t, valores, conteos, estrato) for s, t in zip(semillas, tamanos)]
+    if n_procesos == 1:
+        lotes = [_lote_bootstrap(*a) for a in argumentos]
+    else:
+        with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+            lotes = list(pool.map(_lote_bootstrap, *zip(*argumentos)))
+    remuestras = {k: np.concatenate([lote[k] for lote in lotes]) for k in ESTADISTICOS}
+
+    if metodo == 'bca':
+        # El jackknife agrupa por valor (sin estratos): los valores repetidos dan el mismo resultado
+        valores_unicos, inverso = np.unique(valores, return_inverse=True)
+        conteos_unicos = np.bincount(inverso, weights=conteos).astype(np.int64)
+        jackknife = _jackknife(valores_unicos, conteos_unicos)
+
+    filas = []
+    for nombre in ESTADISTICOS:
+        if metodo == 'bca':
+            inferior, superior = _intervalo_bca(remuestras[nombre], estimados[nombre],
+                                                jackknife[nombre], conteos_unicos, nivel)
+        else:
+            inferior, superior = np.percentile(remuestras[nombre], [50 * (1 - nivel), 50 * (1 + nivel)])
+        filas.append({
+            'estadistico': nombre,
+            'estimado': estimados[nombre],
+            'error_estandar_bootstrap': remuestras[nombre].std(ddof=1),
+            'ic_inferior': inferior,
+            'ic_superior': superior,
+            'metodo': metodo,
+        })
+    return pd.DataFrame(filas).set_index('estadistico')
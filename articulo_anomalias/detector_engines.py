@@ -0,0 +1,243 @@
+from abc import ABC, abstractmethod
+import numpy as np
+
+
+class DetectorEngine(ABC):
+    """
+    Interfaz común para los motores de detección de anomalías
+
+    Sigue la convención de scikit-learn: `score_samples` devuelve valores más
+    bajos para los registros más anómalos, `decision_function` es negativa
+    para las anomalías y `predict` devuelve -1 (anomalía) o 1 (normal).
+
+    El ajuste por chunks se hace con `partial_fit` + `finalize`; `fit`
+    recorre una matriz en memoria con el mismo mecanismo. Cada motor
+    implementa `_fit_sample` y `_score_chunk` (métodos abstractos: un motor
+    incompleto falla al crearlo, no a mitad de un ajuste).
+    """
+
+    name = 'Motor base'
+
+    def __init__(self, contamination=0.05, random_state=42, chunk_size=100000, max_samples=200000):
+        """
+        Parameters:
+        - contamination: Proporción esperada de anomalías
+        - random_state: Semilla para reproducibilidad
+        - chunk_size: Filas por chunk al ajustar y puntuar
+        - max_samples: Tamaño de la muestra de reservorio usada al ajustar por chunks
+        """
+        self.contamination = contamination
+        self.random_state = random_state
+        self.chunk_size = chunk_size
+        self.max_samples = max_samples
+        self.offset_ = None
+        self.n_samples_seen_ = 0
+        self._rng = np.random.default_rng(random_state)
+        self._reservoir = None
+        self._reservoir_keys = None
+
+    def partial_fit(self, X):
+        """Acumula un chunk en una muestra uniforme de tamaño fijo (bottom-k)"""
+        X = np.asarray(X, dtype=np.float64)
+        keys = self._rng.random(len(X))
+        if self._reservoir is None:
+            self._reservoir, self._reservoir_keys = X, keys
+        else:
+            self._reservoir = np.vstack([self._reservoir, X])
+            self._reservoir_keys = np.concatenate([self._reservoir_keys, keys])
+
+        if len(self._reservoir) > self.max_samples:
+            keep = np.argpartition(self._reservoir_keys, self.max_samples)[:self.max_samples]
+            self._reservoir = self._reservoir[keep]
+            self._reservoir_keys = self._reservoir_keys[keep]
+
+        self.n_samples_seen_ += len(X)
+        return self
+
+    def finalize(self):
+        """Estima los parámetros a partir de la muestra y fija el umbral"""
+        if self._reservoir is None:
+            raise ValueError("No se recibieron datos para ajustar el motor")
+        self._fit_sample(self._reservoir)
+        self.offset_ = np.percentile(self.score_samples(self._reservoir), 100 * self.contamination)
+        self._reservoir = self._reservoir_keys = None
+        return self
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        for start in range(0, len(X), self.chunk_size):
+            self.partial_fit(X[start:start + self.chunk_size])
+        self.finalize()
+        # Umbral exacto cuando todos los datos están en memoria
+        self.offset_ = np.percentile(self.score_samples(X), 100 * self.contamination)
+        return self
+
+    def score_samples(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        scores = np.empty(len(X))
+        for start in range(0, len(X), self.chunk_size):
+            scores[start:start + self.chunk_size] = self._score_chunk(X[start:start + self.chunk_size])
+        return scores
+
+    def decision_function(self, X):
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X):
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+    def fit_predict(self, X):
+        return self.fit(X).predict(X)
+
+    @abstractmethod
+    def _fit_sample(self, X):
+        """Estima los parámetros del motor a partir de una muestra (n x d)"""
+
+    @abstractmethod
+    def _score_chunk(self, X):
+        """Scores de un chunk (más bajo = más anómalo)"""
+
+
+class IsolationForestEngine(DetectorEngine):
+    """Isolation Forest de scikit-learn envuelto en la interfaz común"""
+
+    name = 'Isolation Forest'
+
+    def __init__(self, contamination=0.05, random_state=42, chunk_size=100000, max_samples=200000,
+                 n_estimators=100, tree_max_samples='auto', n_jobs=-1):
+        super().__init__(contamination, random_state, chunk_size, max_samples)
+        # scikit-learn solo se importa si se usa este motor
+        from sklearn.ensemble import IsolationForest
+        self.model = IsolationForest(
+            contamination=contamination,
+            random_state=random_state,
+            n_estimators=n_estimators,
+            max_samples=tree_max_samples,
+            n_jobs=n_jobs
+        )
+
+    def fit(self, X):
+        # Con todos los datos en memoria se conserva el ajuste original
+        self.model.fit(X)
+        self.offset_ = self.model.offset_
+        self.n_samples_seen_ = len(X)
+        return self
+
+    def _fit_sample(self, X):
+        self.model.fit(X)
+
+    def finalize(self):
+        if self._reservoir is None:
+            raise ValueError("No se recibieron datos para ajustar el motor")
+        self._fit_sample(self._reservoir)
+        self.offset_ = self.model.offset_
+        self._reservoir = self._reservoir_keys = None
+        return self
+
+    def _score_chunk(self, X):
+        return self.model.score_samples(X)
+
+
+class HBOSEngine(DetectorEngine):
+    """
+    Histogram-Based Outlier Score (HBOS)
+
+    Un histograma de frecuencias iguales por característica; el score es la
+    suma de -log(densidad normalizada). Ajuste y puntuación son O(n).
+    """
+
+    name = 'HBOS'
+
+    def __init__(self, contamination=0.05, random_state=42, chunk_size=100000, max_samples=200000,
+                 n_bins=50, alpha=0.1):
+        super().__init__(contamination, random_state, chunk_size, max_samples)
+        self.n_bins = n_bins
+        self.alpha = alpha
+        self.edges_ = None
+        self.log_density_ = None
+
+    def _fit_sample(self, X):
+        self.edges_ = []
+        self.log_density_ = []
+        quantiles = np.linspace(0, 1, self.n_bins + 1)
+
+        for j in range(X.shape[1]):
+            edges = np.unique(np.quantile(X[:, j], quantiles))
+            if len(edges) < 2:
+                # Característica constante: no aporta al score
+                self.edges_.append(edges)
+                self.log_density_.append(np.zeros(1))
+                continue
+            counts, _ = np.histogram(X[:, j], bins=edges)
+            density = (counts + self.alpha) / (len(X) * np.diff(edges))
+            self.edges_.append(edges)
+            self.log_density_.append(np.log(density / density.max()))
+
+    def feature_scores(self, X):
+        """Contribución -log(densidad) de cada característica (n x d)"""
+        X = np.asarray(X, dtype=np.float64)
+        contributions = np.zeros(X.shape)
+        for j, (edges, log_density) in enumerate(zip(self.edges_, self.log_density_)):
+            if len(edges) < 2:
+                continue
+            bins = np.clip(np.searchsorted(edges, X[:, j], side='right') - 1, 0, len(log_density) - 1)
+            values = -log_density[bins]
+            # Fuera del rango visto al ajustar: densidad mínima
+            outside = (X[:, j] < edges[0]) | (X[:, j] > edges[-1])
+            values[outside] = -log_density.min() + 1.0
+            contributions[:, j] = values
+        return contributions
+
+    def _score_chunk(self, X):
+        return -self.feature_scores(X).sum(axis=1)
+
+
+class RobustZEngine(DetectorEngine):
+    """
+    Z-score robusto multivariado
+
+    Centra cada característica con la mediana y escala con la MAD
+    (1.4826 * MAD); el score es la raíz del promedio de z² por fila.
+    """
+
+    name = 'Z-score robusto'
+
+    def __init__(self, contamination=0.05, random_state=42, chunk_size=100000, max_samples=200000):
+        super().__init__(contamination, random_state, chunk_size, max_samples)
+        self.center_ = None
+        self.scale_ = None
+
+    def _fit_sample(self, X):
+        self.center_ = np.median(X, axis=0)
+        scale = 1.4826 * np.median(np.abs(X - self.center_), axis=0)
+
+        # Si la MAD es cero se usa el IQR y luego la desviación estándar
+        iqr = (np.percentile(X, 75, axis=0) - np.percentile(X, 25, axis=0)) / 1.349
+        scale = np.where(scale > 0, scale, iqr)
+        scale = np.where(scale > 0, scale, X.std(axis=0))
+        scale = np.where(scale > 0, scale, 1.0)
+        # Piso de la escala: una MAD casi nula (residuo de redondeo) dispararía los z de cualquier desvío
+        self.scale_ = np.maximum(scale, np.maximum(np.finfo(np.float64).eps * np.abs(self.center_), 1e-6))
+
+    def feature_scores(self, X):
+        """z² de cada característica (n x d)"""
+        X = np.asarray(X, dtype=np.float64)
+        return ((X - self.center_) / self.scale_) ** 2
+
+    def _score_chunk(self, X):
+        return -np.sqrt(self.feature_scores(X).mean(axis=1))
+
+
+ENGINES = {
+    'isolation_forest': IsolationForestEngine,
+    'hbos': HBOSEngine,
+    'robust_z': RobustZEngine,
+}
+
+
+def create_engine(name, **params):
+    """
+    Crea un motor de detección por nombre ('isolation_forest', 'hbos', 'robust_z')
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Motor desconocido: {name}. Opciones: {list(ENGINES)}")
+    return ENGINES[name](**params)
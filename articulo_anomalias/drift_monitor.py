@@ -0,0 +1,302 @@
+import os
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+
+DRIFT_FEATURES = ['CONSUMO', 'FACTURACIÓN', 'RATIO_CONSUMO_FACTURACION', 'EFICIENCIA_ENERGETICA']
+SEGMENT_COLUMNS = ['DISTRITO', 'TARIFA']
+GLOBAL_SEGMENT = '__GLOBAL__'
+
+
+def feature_values(data, feature):
+    """Valores de una característica; los ratios se calculan si faltan (fórmulas de clean_and_enhance_data)"""
+    if feature in data.columns:
+        return data[feature].to_numpy(dtype=np.float64)
+    consumo = data['CONSUMO'].to_numpy(dtype=np.float64)
+    facturacion = data['FACTURACIÓN'].to_numpy(dtype=np.float64)
+    if feature == 'RATIO_CONSUMO_FACTURACION':
+        return consumo / (facturacion + 1e-8)
+    if feature == 'EFICIENCIA_ENERGETICA':
+        return facturacion / (consumo + 1e-8)
+    raise KeyError(feature)
+
+
+def available_features(data, features):
+    derived = {'RATIO_CONSUMO_FACTURACION', 'EFICIENCIA_ENERGETICA'}
+    return [f for f in features
+            if f in data.columns or (f in derived and {'CONSUMO', 'FACTURACIÓN'} <= set(data.columns))]
+
+
+class DriftMonitor:
+    """
+    Monitor de deriva de distribución por segmento (DISTRITO y TARIFA)
+
+    La referencia es un histograma por segmento y característica sobre cortes
+    fijos (cuantiles de la referencia global), así que se guarda en pocos KB
+    y se actualiza sumando conteos. Cada periodo nuevo se resume con los
+    mismos cortes y se compara con:
+
+    - PSI: sum((p_nuevo - p_ref) * ln(p_nuevo / p_ref)), con suavizado.
+    - KS: máxima diferencia entre las distribuciones acumuladas de los
+      histogramas (aproximación del KS de dos muestras a la resolución de los
+      cortes).
+
+    Un segmento deriva si su PSI o su KS superan el umbral y además la
+    diferencia es significativa para su tamaño (nivel `alpha`): en segmentos
+    pequeños el ruido de muestreo por sí solo da PSI altos. Bajo la hipótesis
+    nula, PSI * n*m/(n+m) sigue aproximadamente una chi-cuadrado con
+    (intervalos - 1) grados de libertad, y el KS tiene valor crítico
+    c(alpha) * sqrt((n+m)/(n*m)). Solo se evalúan segmentos con al menos
+    `min_count` registros en ambos lados. Se recomienda reajustar el modelo si
+    deriva el segmento global o si los segmentos que derivan cubren más de
+    `refit_share` de los registros nuevos.
+    """
+
+    def __init__(self, directory=None, features=None, segment_cols=None, n_bins=20,
+                 psi_threshold=0.2, ks_threshold=0.1, alpha=0.001, min_count=30, refit_share=0.2):
+        """
+        Parameters:
+        - directory: Carpeta donde persistir la referencia (None = solo en memoria)
+        - features: Características a vigilar (DRIFT_FEATURES por defecto, las que existan)
+        - segment_cols: Columnas de segmentación (SEGMENT_COLUMNS por defecto)
+        - n_bins: Número de intervalos de los histogramas
+        - psi_threshold: PSI a partir del cual hay deriva (0.1 moderada, 0.2 significativa)
+        - ks_threshold: Estadístico KS a partir del cual hay deriva
+        - alpha: Nivel de significancia para descartar diferencias debidas al tamaño del segmento
+        - min_count: Registros mínimos por segmento para evaluarlo
+        - refit_share: Proporción de registros en segmentos con deriva que justifica reajustar
+        """
+        self.directory = directory
+        self.features = list(features or DRIFT_FEATURES)
+        self.segment_cols = list(segment_cols or SEGMENT_COLUMNS)
+        self.n_bins = n_bins
+        self.psi_threshold = psi_threshold
+        self.ks_threshold = ks_threshold
+        self.alpha = alpha
+        self.min_count = min_count
+        self.refit_share = refit_share
+
+        self.edges = None        # {característica: cortes internos}
+        self.segments = []       # Claves 'COLUMNA=valor' (y GLOBAL_SEGMENT)
+        self.counts = None       # (segmentos x características x intervalos)
+        self.last_report = None
+
+        if directory and os.path.exists(self._path()):
+            self.load()
+
+    def _path(self):
+        return os.path.join(self.directory, 'referencia_deriva.npz')
+
+    @property
+    def has_reference(self):
+        return self.counts is not None
+
+    # ------------------------------------------------------------------
+    # Histogramas
+    # ------------------------------------------------------------------
+    def _histograms(self, data):
+        """
+        Histogramas de `data` con los cortes de la referencia
+
+        Returns:
+        - keys: Clave de cada segmento presente
+        - counts: (segmentos x características x intervalos)
+        """
+        segment_keys, segment_codes = [GLOBAL_SEGMENT], [np.zeros(len(data), dtype=np.int64)]
+        for col in self.segment_cols:
+            codes, values = pd.factorize(data[col].astype(str).to_numpy(), sort=True)
+            segment_codes.append(codes.astype(np.int64) + len(segment_keys))
+            segment_keys += [f'{col}={v}' for v in values]
+
+        S, B = len(segment_keys), self.n_bins
+        counts = np.zeros((S, len(self.features), B))
+        for f, feature in enumerate(self.features):
+            values = feature_values(data, feature)
+            valid = np.isfinite(values)
+            bins = np.searchsorted(self.edges[feature], values[valid], side='right')
+            for codes in segment_codes:
+                counts[:, f, :] += np.bincount(codes[valid] * B + bins, minlength=S * B).reshape(S, B)
+        return segment_keys, counts
+
+    def _align(self, keys, counts):
+        """
+        Alinea unos histogramas con la referencia sin modificarla
+
+        Returns:
+        - segments: Segmentos de la referencia más los nuevos de `keys`
+        - reference: Conteos de la referencia en ese orden (ceros en los nuevos)
+        - aligned: `counts` en ese orden
+        """
+        positions = {key: i for i, key in enumerate(self.segments)}
+        new_keys = [key for key in keys if key not in positions]
+        segments, reference = self.segments, self.counts
+        if new_keys:
+            segments = self.segments + new_keys
+            reference = np.concatenate([self.counts, np.zeros((len(new_keys),) + self.counts.shape[1:])])
+            positions = {key: i for i, key in enumerate(segments)}
+        aligned = np.zeros_like(reference)
+        aligned[[positions[key] for key in keys]] = counts
+        return segments, reference, aligned
+
+    # ------------------------------------------------------------------
+    # Referencia
+    # ------------------------------------------------------------------
+    def set_reference(self, data, segments=None):
+        """
+        Fija la referencia con los datos con los que se ajustó el modelo
+
+        Parameters:
+        - data: Datos de referencia
+        - segments: Claves de segmentos a reemplazar (None = toda la referencia, con cortes nuevos)
+        """
+        if segments is None or not self.has_reference:
+            self.features = available_features(data, self.features)
+            self.edges = {}
+            for feature in self.features:
+                values = feature_values(data, feature)
+                quantiles = np.quantile(values[np.isfinite(values)], np.linspace(0, 1, self.n_bins + 1)[1:-1])
+                # Cortes repetidos (valores muy concentrados) dejan intervalos vacíos, sin efecto
+                self.edges[feature] = quantiles
+            self.segments, self.counts = self._histograms(data)
+        else:
+            keys, counts = self._histograms(data)
+            self.segments, self.counts, aligned = self._align(keys, counts)
+            replace = np.isin(self.segments, list(segments))
+            self.counts[replace] = aligned[replace]
+        self.save()
+        return self
+
+    def update_reference(self, data, exclude=None):
+        """
+        Suma los conteos de `data` a la referencia (periodos estables)
+
+        Parameters:
+        - exclude: Claves de segmentos que no se actualizan (los que derivaron siguen
+          comparándose con su referencia original hasta que se reajuste). Sus filas
+          se descartan por completo, también del segmento global y de los
+          segmentos de las otras columnas, para que la referencia siga siendo
+          la de los datos estables
+        """
+        if not self.has_reference:
+            return self.set_reference(data)
+        if exclude:
+            excluded = np.zeros(len(data), dtype=bool)
+            for key in exclude:
+                col, _, value = key.partition('=')
+                if col in data.columns:
+                    excluded |= data[col].astype(str).to_numpy() == value
+            data = data[~excluded]
+        keys, counts = self._histograms(data)
+        self.segments, self.counts, aligned = self._align(keys, counts)
+        self.counts += aligned
+        self.save()
+        return self
+
+    # ------------------------------------------------------------------
+    # Comparación
+    # ------------------------------------------------------------------
+    def check(self, data):
+        """
+        Compara `data` con la referencia (no la modifica: los segmentos nuevos
+        se comparan contra una referencia vacía y no se evalúan)
+
+        Returns:
+        - dict con 'report' (DataFrame por segmento y característica), 'drifted_segments',
+          'drifted_share' (proporción de registros en segmentos con deriva) y 'refit'
+        """
+        if not self.has_reference:
+            raise ValueError("El monitor no tiene referencia; usa set_reference primero")
+
+        keys, counts = self._histograms(data)
+        segments, reference, current = self._align(keys, counts)
+
+        n_ref = reference.sum(axis=2)
+        n_new = current.sum(axis=2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Suavizado de medio registro por intervalo para evitar log(0)
+            p_ref = (reference + 0.5) / (n_ref[..., None] + 0.5 * self.n_bins)
+            p_new = (current + 0.5) / (n_new[..., None] + 0.5 * self.n_bins)
+            psi = np.sum((p_new - p_ref) * np.log(p_new / p_ref), axis=2)
+            ks = np.abs(np.cumsum(current, axis=2) / n_new[..., None]
+                        - np.cumsum(reference, axis=2) / n_ref[..., None]).max(axis=2)
+
+        evaluated = (n_ref >= self.min_count) & (n_new >= self.min_count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scale = 1 / n_ref + 1 / n_new
+        z = NormalDist().inv_cdf(1 - self.alpha)
+        # Cuantil chi-cuadrado (aproximación de Wilson-Hilferty) y valor crítico del KS
+        k = self.n_bins - 1
+        psi_critical = k * (1 - 2 / (9 * k) + z * np.sqrt(2 / (9 * k))) ** 3 * scale
+        ks_critical = np.sqrt(-0.5 * np.log(self.alpha / 2)) * np.sqrt(scale)
+        drift = evaluated & (((psi >= self.psi_threshold) & (psi >= psi_critical)) |
+                             ((ks >= self.ks_threshold) & (ks >= ks_critical)))
+
+        S, F = psi.shape
+        segment_names = np.repeat(np.array(segments, dtype=object), F)
+        columns = [key.split('=', 1)[0] for key in segment_names]
+        values = [key.split('=', 1)[1] if '=' in key else '' for key in segment_names]
+        report = pd.DataFrame({
+            'segmento': columns,
+            'valor': values,
+            'caracteristica': np.tile(self.features, S),
+            'n_referencia': n_ref.ravel().astype(np.int64),
+            'n_nuevo': n_new.ravel().astype(np.int64),
+            'psi': psi.ravel(),
+            'ks': ks.ravel(),
+            'evaluado': evaluated.ravel(),
+            'deriva': drift.ravel(),
+        })
+        report = report[report['n_nuevo'] > 0].sort_values('psi', ascending=False).reset_index(drop=True)
+
+        segment_drift = drift.any(axis=1)
+        drifted = [key for key, moved in zip(segments, segment_drift) if moved and key != GLOBAL_SEGMENT]
+        global_position = segments.index(GLOBAL_SEGMENT)
+        global_drift = bool(segment_drift[global_position])
+
+        # Proporción de registros nuevos en segmentos con deriva (la mayor entre las columnas)
+        segment_size = n_new.max(axis=1)
+        total_new = max(segment_size[global_position], 1)
+        share = 0.0
+        for col in self.segment_cols:
+            in_col = np.array([key.startswith(f'{col}=') for key in segments])
+            share = max(share, segment_size[in_col & segment_drift].sum() / total_new)
+
+        self.last_report = {
+            'report': report,
+            'drifted_segments': drifted,
+            'drifted_share': float(share),
+            'global_drift': global_drift,
+            'refit': global_drift or share > self.refit_share,
+        }
+        return self.last_report
+
+    def print_report(self, result=None, top=10):
+        result = result or self.last_report
+        report = result['report']
+        print("\n📡 MONITOREO DE DERIVA")
+        print(f"   Segmentos con deriva: {len(result['drifted_segments'])} "
+              f"({result['drifted_share']:.1%} de los registros nuevos)")
+        print(f"   Deriva global: {'sí' if result['global_drift'] else 'no'}")
+        for _, row in report[report['deriva']].head(top).iterrows():
+            segment = f"{row['segmento']}={row['valor']}" if row['valor'] else 'GLOBAL'
+            print(f"   ⚠️  {segment:<30} {row['caracteristica']:<28} PSI {row['psi']:.3f}  KS {row['ks']:.3f}")
+        print(f"   Recomendación: {'reajustar el modelo' if result['refit'] else 'reutilizar el modelo actual'}")
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+    def save(self):
+        if not self.directory or not self.has_reference:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        arrays = {f'edges__{feature}': edges for feature, edges in self.edges.items()}
+        np.savez(self._path(), counts=self.counts, segments=np.array(self.segments, dtype=str),
+                 features=np.array(self.features, dtype=str), **arrays)
+
+    def load(self):
+        with np.load(self._path(), allow_pickle=False) as f:
+            self.counts = f['counts']
+            self.segments = [str(s) for s in f['segments']]
+            self.features = [str(s) for s in f['features']]
+            self.edges = {feature: f[f'edges__{feature}'] for feature in self.features}
+        self.n_bins = self.counts.shape[2]
@@ -0,0 +1,394 @@
+"""
+CLI no interactiva para estadísticas y detección de anomalías de Electro Puno
+
+Cada subcomando importa solo lo que necesita: `stats` no carga scikit-learn,
+matplotlib ni optuna; los gráficos y la optimización se importan únicamente
+cuando se piden.
+
+Con `--deriva` el modelo ajustado se guarda junto a la referencia de deriva:
+cada mes nuevo se puntúa con ese modelo y solo se reajusta si el monitor
+detecta deriva. `deriva` únicamente reporta (código 3 si conviene reajustar).
+
+Uso:
+    python electro_cli.py stats reporte.csv --exportar estadisticas.csv
+    python electro_cli.py stats reporte.csv --comparar DISTRITO --independencia TARIFA ESTADO_CLIENTE --independencia-por DISTRITO
+    python electro_cli.py detect reporte.csv --modo rapido --motor hbos
+    python electro_cli.py detect reporte.csv --modo avanzado --graficos
+    python electro_cli.py tune reporte.csv --trials 20 --salida parametros.json
+    python electro_cli.py detect reporte.csv --parametros parametros.json
+    python electro_cli.py export reporte.csv --directorio resultados/
+    python electro_cli.py threshold resultados/scores_<ts>.npz --contaminacion 0.01 0.02 0.05
+    python electro_cli.py export reporte.csv --directorio resultados/ --almacen almacen/
+    python electro_cli.py historial almacen/ --codigo 1234567
+    python electro_cli.py export reporte_202401.csv --deriva deriva/
+    python electro_cli.py export reporte_202402.csv --deriva deriva/
+    python electro_cli.py deriva reporte_202403.csv deriva/ --salida deriva_202403.csv
+    python electro_cli.py --tiempos-importacion stats reporte.csv
+    python electro_cli.py detect "exportaciones/reporte_2024*.zip" --modo avanzado
+"""
+import argparse
+import importlib.machinery
+import importlib.util
+import json
+import os
+import sys
+import time
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+RUTA_DATASET_ELECTRO = os.path.join(DIRECTORIO, '..', 'detección de anomalías', 'dataset_electro.py')
+RUTA_CODIGO_FUENTE = os.path.join(DIRECTORIO, 'codigo_fuente')
+
+# Librerías pesadas cuya carga se reporta con --tiempos-importacion
+LIBRERIAS_PESADAS = ['scipy', 'sklearn', 'matplotlib', 'seaborn', 'optuna']
+
+AYUDA_ARCHIVO = "CSV, .zip/.gz con el CSV o patrón glob de exportaciones mensuales (entre comillas)"
+
+sys.path.insert(0, DIRECTORIO)
+
+
+def _cargar_modulo(nombre, ruta):
+    """Importa un script por ruta (algunos no tienen extensión .py)"""
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    loader = importlib.machinery.SourceFileLoader(nombre, ruta)
+    spec = importlib.util.spec_from_loader(nombre, loader)
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo
+    loader.exec_module(modulo)
+    return modulo
+
+
+# ----------------------------------------------------------------------
+# Importaciones por subcomando
+# ----------------------------------------------------------------------
+def importar_stats(args):
+    from estaditicosbasic import EstadisticasDataset
+    if args.graficos:
+        import matplotlib.pyplot  # noqa: F401
+        import seaborn  # noqa: F401
+    return EstadisticasDataset
+
+
+def importar_detect(args):
+    if args.modo == 'avanzado':
+        modulo = _cargar_modulo('codigo_fuente', RUTA_CODIGO_FUENTE)
+        if args.graficos:
+            modulo.configurar_estilo_graficos()
+        return modulo.ElectroPunoAnomalyDetectorAdvanced
+    return _cargar_modulo('dataset_electro', RUTA_DATASET_ELECTRO).FastAnomalyDetector
+
+
+def importar_tune(args):
+    import optuna  # noqa: F401
+    return _cargar_modulo('dataset_electro', RUTA_DATASET_ELECTRO).FastAnomalyDetector
+
+
+def importar_export(args):
+    return _cargar_modulo('codigo_fuente', RUTA_CODIGO_FUENTE).ElectroPunoAnomalyDetectorAdvanced
+
+
+def importar_threshold(args):
+    from score_index import ScoreIndex
+    return ScoreIndex
+
+
+def importar_deriva(args):
+    from drift_monitor import DriftMonitor
+    return DriftMonitor
+
+
+def importar_historial(args):
+    from results_store import ResultsStore
+    return ResultsStore
+
+
+# ----------------------------------------------------------------------
+# Ejecución de subcomandos
+# ----------------------------------------------------------------------
+def ejecutar_stats(args, EstadisticasDataset):
+    calc = EstadisticasDataset(args.archivo)
+    if not calc.cargar_datos():
+        return 1
+    calc.generar_reporte()
+    if args.bootstrap:
+        calc.calcular_intervalos_bootstrap(n_remuestras=args.bootstrap, metodo=args.metodo,
+                                           estratificar_por=args.estratificar, n_procesos=args.procesos or None)
+    if args.comparar or args.independencia:
+        calc.comparar_grupos(por=args.comparar, correccion=args.correccion,
+                             independencia=args.independencia, independencia_por=args.independencia_por)
+    if args.graficos:
+        calc.generar_graficos()
+    if args.exportar:
+        calc.exportar_estadisticas(args.exportar)
+    return 0
+
+
+def _detectar_avanzado(args, Detector):
+    """Carga, ajusta y analiza con el detector avanzado"""
+    contaminacion = 0.05 if args.contaminacion is None else args.contaminacion
+    detector = Detector(contamination=contaminacion, engine=args.motor,
+                        feature_store=args.feature_store, drift_monitor=args.deriva)
+    data = detector.load_and_preprocess_data(args.archivo, n_workers=args.procesos)
+    if data is None:
+        return detector, None, None
+    # Con --deriva reutiliza el modelo guardado con la referencia y solo reajusta si hay deriva
+    predictions, scores = detector.detect_anomalies(data)
+    data_with_results, distrito_df = detector.analyze_anomalies_detailed(data, predictions, scores)
+    return detector, data_with_results, distrito_df
+
+
+def ejecutar_detect(args, Detector):
+    if args.modo == 'avanzado':
+        detector, data_with_results, distrito_df = _detectar_avanzado(args, Detector)
+        if data_with_results is None:
+            return 1
+        if args.graficos:
+            detector.create_advanced_visualizations(data_with_results, distrito_df)
+        return 0
+
+    detector = Detector(args.archivo, engine=args.motor, n_workers=args.procesos)
+    if detector.data is None:
+        return 1
+    if args.parametros:
+        with open(args.parametros, encoding='utf-8') as f:
+            detector.best_params = json.load(f)
+    elif args.contaminacion is not None:
+        detector.best_params = {'n_estimators': 100, 'contamination': args.contaminacion, 'max_samples': 0.5}
+    if args.patrones:
+        detector.detect_patterns_fast()
+        detector.show_pattern_summary()
+    detector.detect_anomalies_fast()
+    detector.quick_report()
+    return 0
+
+
+def ejecutar_tune(args, FastAnomalyDetector):
+    detector = FastAnomalyDetector(args.archivo, n_workers=args.procesos)
+    if detector.data is None:
+        return 1
+    detector.optimize_fast(n_trials=args.trials)
+    print(f"🎯 Mejores parámetros: {detector.best_params}")
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(detector.best_params, f, indent=2)
+        print(f"💾 Parámetros guardados en: {args.salida}")
+    return 0
+
+
+def ejecutar_export(args, Detector):
+    args.archivo = os.path.abspath(args.archivo)
+    detector, data_with_results, distrito_df = _detectar_avanzado(args, Detector)
+    if data_with_results is None:
+        return 1
+    if args.almacen:
+        from results_store import ResultsStore
+        detector.results_store = ResultsStore(os.path.abspath(args.almacen))
+    if args.modelo:
+        detector.save_model_bundle(data_with_results, os.path.abspath(args.modelo))
+    os.makedirs(args.directorio, exist_ok=True)
+    os.chdir(args.directorio)
+    export_info = detector.export_detailed_results(data_with_results, distrito_df)
+    detector.generate_summary_report(data_with_results, distrito_df, export_info)
+    return 0 if export_info else 1
+
+
+def ejecutar_threshold(args, ScoreIndex):
+    index = ScoreIndex.load(args.scores)
+    cortes = [('contaminación', c, dict(contamination=c)) for c in args.contaminacion or []]
+    cortes += [('corte', c, dict(score_threshold=c)) for c in args.corte or []]
+    if not cortes:
+        cortes = [('contaminación', 0.05, dict(contamination=0.05))]
+
+    for nombre, valor, corte in cortes:
+        rows = index.anomaly_rows(**corte)
+        print(f"\n🎚️  {nombre} {valor:g}: {len(rows):,} anomalías "
+              f"({len(rows) / len(index.scores) * 100:.2f}%)")
+        if index.district_codes is not None and index.consumption is not None:
+            top = index.district_summary(**corte).head(args.top)
+            for _, row in top.iterrows():
+                print(f"   {row['distrito']:<20} {row['anomalias']:>7,} ({row['tasa_anomalias']:.1f}%)")
+    return 0
+
+
+def ejecutar_historial(args, ResultsStore):
+    store = ResultsStore(args.almacen)
+    if not store.runs:
+        print(f"❌ No hay corridas en {args.almacen}")
+        return 1
+    runs = args.corridas or None
+    try:
+        if args.codigo:
+            resultado = store.lookup_many(args.codigo, runs=runs)
+        elif args.rango:
+            resultado = store.range_query(*args.rango, runs=runs, only_anomalies=args.solo_anomalias)
+        elif args.distrito:
+            resultado = store.district(args.distrito, runs=runs, only_anomalies=args.solo_anomalias)
+        else:
+            resultado = None
+    except (KeyError, ValueError) as e:
+        print(f"❌ {e.args[0] if e.args else e}")
+        return 1
+
+    if resultado is None:
+        for run_id in store.runs:
+            info = store.manifest['runs'][run_id]
+            print(f"🗂️  {run_id}: {info['filas']:,} filas, {info['anomalias']:,} anomalías, "
+                  f"periodos {info['periodos'][0]}-{info['periodos'][-1]}")
+        return 0
+
+    if resultado.empty:
+        print("⚠️ No se encontraron filas para la consulta (códigos inexistentes o sin resultados)")
+        return 0
+    print(f"🔎 {len(resultado):,} filas en {resultado['CORRIDA'].nunique()} corridas")
+    print(resultado.head(args.top).to_string(index=False))
+    if args.salida:
+        resultado.to_csv(args.salida, index=False, encoding='utf-8-sig')
+        print(f"💾 Resultado guardado en: {args.salida}")
+    return 0
+
+
+def ejecutar_deriva(args, DriftMonitor):
+    from archive_sources import is_archive_source, read_csv_sources
+    import pandas as pd
+
+    monitor = DriftMonitor(args.referencia, psi_threshold=args.psi, ks_threshold=args.ks)
+    columnas = ['CONSUMO', 'FACTURACIÓN'] + monitor.segment_cols
+    if is_archive_source(args.archivo):
+        data = read_csv_sources(args.archivo, usecols=columnas)
+    else:
+        data = pd.read_csv(args.archivo, usecols=columnas)
+    data = data[(data['CONSUMO'] >= 0) & (data['FACTURACIÓN'] >= 0)]
+
+    if args.fijar or not monitor.has_reference:
+        monitor.set_reference(data)
+        print(f"📌 Referencia de deriva fijada con {len(data):,} registros en {args.referencia}")
+        return 0
+    resultado = monitor.check(data)
+    monitor.print_report(resultado, top=args.top)
+    if args.salida:
+        resultado['report'].to_csv(args.salida, index=False, encoding='utf-8-sig')
+        print(f"💾 Reporte de deriva guardado en: {args.salida}")
+    if args.actualizar and not resultado['refit']:
+        monitor.update_reference(data, exclude=resultado['drifted_segments'])
+    # Código 3: se recomienda reajustar (para encadenar con `export` en scripts)
+    return 3 if resultado['refit'] else 0
+
+
+SUBCOMANDOS = {
+    'stats': (importar_stats, ejecutar_stats),
+    'detect': (importar_detect, ejecutar_detect),
+    'tune': (importar_tune, ejecutar_tune),
+    'export': (importar_export, ejecutar_export),
+    'threshold': (importar_threshold, ejecutar_threshold),
+    'historial': (importar_historial, ejecutar_historial),
+    'deriva': (importar_deriva, ejecutar_deriva),
+}
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Estadísticas y detección de anomalías de Electro Puno")
+    parser.add_argument('--tiempos-importacion', action='store_true',
+                        help="Mostrar el tiempo de importación del subcomando y las librerías cargadas")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p = sub.add_parser('stats', help="Estadísticas descriptivas de CONSUMO y FACTURACIÓN")
+    p.add_argument('archivo', help=AYUDA_ARCHIVO)
+    p.add_argument('--graficos', action='store_true')
+    p.add_argument('--exportar', metavar='CSV', help="Exportar estadísticas a CSV")
+    p.add_argument('--bootstrap', type=int, default=0, metavar='N', help="Remuestras bootstrap (0 = no calcular)")
+    p.add_argument('--metodo', choices=['bca', 'percentil'], default='bca')
+    p.add_argument('--estratificar', default=None, help="Columna para estratificar el bootstrap (p. ej. DISTRITO)")
+    p.add_argument('--procesos', type=int, default=1, help="Procesos para el bootstrap (0 = todos los núcleos)")
+    p.add_argument('--comparar', nargs='+', metavar='COLUMNA', default=None,
+                   help="Columnas de agrupación para ANOVA, Kruskal-Wallis y Welch por pares (p. ej. DISTRITO TARIFA)")
+    p.add_argument('--independencia', nargs=2, metavar=('FILAS', 'COLUMNAS'), default=None,
+                   help="Chi-cuadrado de independencia entre dos columnas (p. ej. TARIFA ESTADO_CLIENTE)")
+    p.add_argument('--independencia-por', nargs='+', metavar='COLUMNA', default=None,
+                   help="Repetir la chi-cuadrado dentro de cada grupo (p. ej. DISTRITO)")
+    p.add_argument('--correccion', choices=['holm', 'bh', 'bonferroni'], default='holm')
+
+    def opcion_procesos(p):
+        p.add_argument('--procesos', type=int, default=1,
+                       help="Procesos para leer el CSV por rangos de bytes (0 = todos los núcleos)")
+
+    def opciones_deteccion(p):
+        p.add_argument('archivo', help=AYUDA_ARCHIVO)
+        p.add_argument('--motor', default='isolation_forest', choices=['isolation_forest', 'hbos', 'robust_z'])
+        p.add_argument('--contaminacion', type=float, default=None,
+                       help="Proporción de anomalías (por defecto 0.02 en modo rápido y 0.05 en avanzado)")
+        p.add_argument('--feature-store', default=None, help="Carpeta del feature store incremental")
+        p.add_argument('--deriva', default=None,
+                       help="Carpeta de la referencia de deriva y del modelo guardado (modo avanzado; "
+                            "solo se reajusta si hay deriva)")
+        opcion_procesos(p)
+
+    p = sub.add_parser('detect', help="Detección de anomalías")
+    opciones_deteccion(p)
+    p.add_argument('--modo', choices=['rapido', 'avanzado'], default='rapido')
+    p.add_argument('--parametros', metavar='JSON', help="Parámetros de `tune` (modo rápido)")
+    p.add_argument('--patrones', action='store_true', help="Detectar patrones (modo rápido)")
+    p.add_argument('--graficos', action='store_true', help="Visualizaciones (modo avanzado)")
+
+    p = sub.add_parser('tune', help="Optimización de hiperparámetros con optuna")
+    p.add_argument('archivo', help=AYUDA_ARCHIVO)
+    p.add_argument('--trials', type=int, default=20)
+    opcion_procesos(p)
+    p.add_argument('--salida', metavar='JSON', help="Guardar los mejores parámetros")
+
+    p = sub.add_parser('export', help="Detección avanzada y exportación de CSV y reporte")
+    opciones_deteccion(p)
+    p.add_argument('--directorio', default='.', help="Carpeta de salida")
+    p.add_argument('--almacen', default=None, help="Carpeta del almacén de resultados donde agregar la corrida")
+    p.add_argument('--modelo', default=None, metavar='JOBLIB',
+                   help="Guardar el modelo ajustado para el endpoint /score (p. ej. modelo_anomalias.joblib)")
+
+    p = sub.add_parser('threshold', help="Recalcular anomalías con otro umbral a partir de scores guardados")
+    p.add_argument('scores', help="Archivo scores_<timestamp>.npz de `export`")
+    p.add_argument('--contaminacion', type=float, nargs='+')
+    p.add_argument('--corte', type=float, nargs='+', help="Cortes directos sobre ANOMALY_SCORE")
+    p.add_argument('--top', type=int, default=5, help="Distritos a mostrar por corte")
+
+    p = sub.add_parser('deriva', help="Comparar un periodo nuevo con la referencia del modelo (PSI/KS); "
+                                      "sale con código 3 si conviene reajustar")
+    p.add_argument('archivo', help=AYUDA_ARCHIVO)
+    p.add_argument('referencia', help="Carpeta de la referencia de deriva")
+    p.add_argument('--fijar', action='store_true', help="Fijar `archivo` como nueva referencia")
+    p.add_argument('--actualizar', action='store_true',
+                   help="Sumar el periodo a la referencia si no hace falta reajustar")
+    p.add_argument('--psi', type=float, default=0.2, help="Umbral de PSI")
+    p.add_argument('--ks', type=float, default=0.1, help="Umbral de KS")
+    p.add_argument('--top', type=int, default=10, help="Segmentos con deriva a mostrar")
+    p.add_argument('--salida', metavar='CSV', help="Guardar el reporte completo")
+
+    p = sub.add_parser('historial', help="Consultar corridas guardadas en el almacén de resultados")
+    p.add_argument('almacen', help="Carpeta del almacén (sin filtros: lista las corridas)")
+    consulta = p.add_mutually_exclusive_group()
+    consulta.add_argument('--codigo', nargs='+', help="CODIGO de uno o varios clientes")
+    consulta.add_argument('--rango', nargs=2, metavar=('DESDE', 'HASTA'), help="Rango de CODIGO")
+    consulta.add_argument('--distrito')
+    p.add_argument('--corridas', nargs='+', help="Corridas a consultar (todas por defecto)")
+    p.add_argument('--solo-anomalias', action='store_true', help="Solo filas marcadas (rango y distrito)")
+    p.add_argument('--top', type=int, default=20, help="Filas a mostrar")
+    p.add_argument('--salida', metavar='CSV', help="Guardar el resultado completo")
+
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    importar, ejecutar = SUBCOMANDOS[args.comando]
+
+    inicio = time.perf_counter()
+    objetivo = importar(args)
+    duracion = time.perf_counter() - inicio
+
+    if args.tiempos_importacion:
+        cargadas = [lib for lib in LIBRERIAS_PESADAS if lib in sys.modules]
+        print(f"⏱️  Importación de '{args.comando}': {duracion:.2f} s "
+              f"(librerías pesadas: {', '.join(cargadas) or 'ninguna'})")
+
+    return ejecutar(args, objetivo)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
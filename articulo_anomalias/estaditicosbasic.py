@@ -1,19 +1,31 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
-import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 import warnings
+from archive_sources import is_archive_source, read_csv_sources
 warnings.filterwarnings('ignore')
 
+def asimetria_curtosis(datos):
+    """
+    Asimetría y curtosis de Fisher (mismas fórmulas sesgadas que scipy.stats.skew/kurtosis),
+    calculadas con NumPy para no importar scipy en el cálculo de estadísticas
+    """
+    x = np.asarray(datos, dtype=np.float64)
+    desvios = x - x.mean()
+    m2 = np.mean(desvios**2)
+    if m2 == 0:
+        return np.nan, np.nan
+    m3 = np.mean(desvios**3)
+    m4 = np.mean(desvios**4)
+    return m3 / m2**1.5, m4 / m2**2 - 3.0
+
 class EstadisticasDataset:
     def __init__(self, archivo_csv):
         """
         Inicializa la clase con el archivo CSV
         
         Args:
-            archivo_csv (str): Ruta al archivo CSV
+            archivo_csv (str): Ruta al archivo CSV, a un .zip/.gz o patrón glob de meses
         """
         self.archivo = archivo_csv
         self.df = None
@@ -27,7 +39,11 @@ class EstadisticasDataset:
             
             for encoding in encodings:
                 try:
-                    self.df = pd.read_csv(self.archivo, encoding=encoding)
+                    if is_archive_source(self.archivo):
+                        # Se lee directo del comprimido, etiquetando el periodo de cada fuente
+                        self.df = read_csv_sources(self.archivo, encoding=encoding)
+                    else:
+                        self.df = pd.read_csv(self.archivo, encoding=encoding)
                     print(f"✅ Archivo cargado exitosamente con encoding: {encoding}")
                     break
                 except UnicodeDecodeError:
@@ -76,6 +92,8 @@ class EstadisticasDataset:
         if len(datos) == 0:
             return {"error": "No hay datos numéricos válidos"}
         
+        asimetria, curtosis = asimetria_curtosis(datos)
+        
         estadisticas = {
             'nombre': nombre_columna,
             'cantidad_datos': len(datos),
@@ -107,8 +125,8 @@ class EstadisticasDataset:
             'percentil_99': datos.quantile(0.99),
             
             # Medidas de forma
-            'asimetria': stats.skew(datos),
-            'curtosis': stats.kurtosis(datos),
+            'asimetria': asimetria,
+            'curtosis': curtosis,
             
             # Errores estándar
             'error_estandar_media': datos.std() / np.sqrt(len(datos)),
@@ -243,6 +261,10 @@ class EstadisticasDataset:
             print("❌ Primero debes generar el reporte de estadísticas")
             return
         
+        # Librerías de gráficos solo cuando se necesitan (tardan segundos en importarse)
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
         columnas = self.identificar_columnas()
         
         # Configurar el estilo de los gráficos
@@ -275,6 +297,113 @@ class EstadisticasDataset:
         plt.tight_layout()
         plt.show()
     
+    def calcular_intervalos_bootstrap(self, n_remuestras=10000, metodo='bca', estratificar_por=None,
+                                      nivel=0.95, n_procesos=1, semilla=42):
+        """
+        Intervalos bootstrap (percentil o BCa) para media, desviación, CV y percentiles
+        
+        Args:
+            n_remuestras (int): Número de remuestras
+            metodo (str): 'bca' o 'percentil'
+            estratificar_por (str): Columna para remuestrear dentro de cada grupo (p. ej. 'DISTRITO')
+            nivel (float): Nivel de confianza
+            n_procesos (int): Procesos en paralelo (None = todos los núcleos)
+            semilla (int): Semilla para reproducibilidad
+            
+        Returns:
+            dict: {tipo: DataFrame con estimado, error estándar e intervalo por estadístico}
+        """
+        from bootstrap import intervalos_bootstrap
+        
+        if self.df is None:
+            print("❌ Primero debes cargar los datos")
+            return {}
+        
+        resultados = {}
+        for tipo, nombre_col in self.identificar_columnas().items():
+            datos = pd.to_numeric(self.df[nombre_col], errors='coerce')
+            validos = datos.notna().to_numpy()
+            estratos = self.df[estratificar_por].to_numpy()[validos] if estratificar_por else None
+            
+            print(f"\n🔁 BOOTSTRAP {metodo.upper()} DE {tipo.upper()} ({n_remuestras:,} remuestras"
+                  f"{', estratificado por ' + estratificar_por if estratificar_por else ''})")
+            tabla = intervalos_bootstrap(datos.to_numpy()[validos], estratos, n_remuestras=n_remuestras,
+                                         nivel=nivel, metodo=metodo, semilla=semilla, n_procesos=n_procesos)
+            resultados[tipo] = tabla
+            
+            for nombre, fila in tabla.iterrows():
+                print(f"   {nombre:<24} {fila['estimado']:>12,.2f}  IC {nivel:.0%}: "
+                      f"[{fila['ic_inferior']:,.2f}, {fila['ic_superior']:,.2f}]")
+                # Se agregan a las estadísticas para que salgan en la exportación
+                if tipo in self.estadisticas:
+                    self.estadisticas[tipo][f'ic_bootstrap_{nombre}_inferior'] = fila['ic_inferior']
+                    self.estadisticas[tipo][f'ic_bootstrap_{nombre}_superior'] = fila['ic_superior']
+        
+        return resultados
+    
+    def comparar_grupos(self, por=('DISTRITO', 'TARIFA'), correccion='holm', alfa=0.05,
+                        independencia=None, independencia_por=None):
+        """
+        ANOVA, Kruskal-Wallis y t de Welch por pares entre grupos, en una sola pasada
+        
+        Args:
+            por (str | list): Columna(s) que definen los grupos (vacío = solo independencia)
+            correccion (str): 'holm', 'bh' o 'bonferroni' para los pares
+            alfa (float): Nivel de significancia para el resumen
+            independencia (tuple): Par de columnas para la chi-cuadrado de independencia
+                (p. ej. ('TARIFA', 'ESTADO_CLIENTE'))
+            independencia_por (str | list): Grupos donde se repite la chi-cuadrado (p. ej. 'DISTRITO')
+            
+        Returns:
+            dict: {tipo: dict con 'descriptivos', 'globales' y 'pares'} y, si se
+            pidió, 'independencia' con la tabla de chi-cuadrado
+        """
+        from pruebas_agrupadas import comparar_grupos, independencia_por_grupo
+        
+        if self.df is None:
+            print("❌ Primero debes cargar los datos")
+            return {}
+        
+        por = [] if por is None else [por] if isinstance(por, str) else list(por)
+        resultados = {}
+        if independencia is not None:
+            # No depende de CONSUMO ni FACTURACIÓN: se calcula una sola vez
+            filas, columnas = independencia
+            tabla = independencia_por_grupo(self.df, filas, columnas, independencia_por, correccion=correccion)
+            resultados['independencia'] = tabla
+            
+            grupos = [independencia_por] if isinstance(independencia_por, str) else list(independencia_por or [])
+            print(f"\n🧪 INDEPENDENCIA {filas} x {columnas}"
+                  f"{' POR ' + ' x '.join(grupos) + f' ({len(tabla):,} tablas)' if grupos else ''}")
+            if grupos:
+                significativos = int((tabla['p_corregido'] < alfa).sum())
+                print(f"   Chi-cuadrado: {significativos:,} de {int(tabla['p_valor'].notna().sum()):,} "
+                      f"tablas significativas ({correccion}, alfa = {alfa})")
+            else:
+                fila = tabla.iloc[0]
+                print(f"   Chi-cuadrado = {fila['chi_cuadrado']:,.2f}  gl = {fila['gl']}  p = {fila['p_valor']:.3g}")
+            dudosas = int(((tabla['esperado_minimo'] < 5) & tabla['p_valor'].notna()).sum())
+            if dudosas:
+                print(f"   ⚠️ {dudosas:,} tablas con algún esperado < 5 (aproximación chi-cuadrado dudosa)")
+        
+        if not por:
+            return resultados
+        for tipo, nombre_col in self.identificar_columnas().items():
+            datos = self.df[por].assign(**{nombre_col: pd.to_numeric(self.df[nombre_col], errors='coerce')})
+            resultado = comparar_grupos(datos, nombre_col, por, correccion=correccion)
+            resultados[tipo] = resultado
+            
+            print(f"\n🧪 PRUEBAS DE {tipo.upper()} POR {' x '.join(por)} "
+                  f"({len(resultado['descriptivos']):,} grupos)")
+            for _, fila in resultado['globales'].iterrows():
+                print(f"   {fila['prueba']:<15} estadístico = {fila['estadistico']:,.2f}  p = {fila['p_valor']:.3g}")
+            pares = resultado['pares']
+            significativos = int((pares['p_corregido'] < alfa).sum())
+            print(f"   Pares de Welch: {significativos:,} de {len(pares):,} significativos "
+                  f"({correccion}, alfa = {alfa})")
+        
+        return resultados
+    
     def exportar_estadisticas(self, nombre_archivo="estadisticas_reporte.csv"):
         """Exporta las estadísticas a un archivo CSV"""
         if not self.estadisticas:
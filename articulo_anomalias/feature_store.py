@@ -0,0 +1,391 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+
+# Estadísticas que el detector avanzado espera por cada agrupación
+GROUP_STATS = {
+    'DISTRITO': ['count', 'mean', 'std', 'median', 'min', 'max', 'q25', 'q75'],
+    'PROVINCIA': ['count', 'mean', 'std', 'median'],
+    'TARIFA': ['mean', 'std', 'median'],
+}
+
+GLOBAL_KEY = '__GLOBAL__'
+
+# Columnas que, junto con el valor y los grupos, identifican una fila de un periodo
+ROW_ID_COLUMNS = ['CODIGO']
+
+
+class IncrementalFeatureStore:
+    """
+    Almacén incremental de características por grupo para Electro Puno
+
+    Guarda por cada PERIODO las estadísticas suficientes (conteo, media, M2)
+    y los arreglos ordenados de CONSUMO por DISTRITO, PROVINCIA y TARIFA.
+    Al llegar un mes nuevo solo se actualizan los grupos afectados y las
+    características de las filas nuevas se obtienen del estado acumulado.
+
+    También guarda un hash por fila de cada periodo: si un mes ya almacenado
+    vuelve a llegar con filas agregadas (reporte reemitido o entregado por
+    partes), solo esas filas se combinan con su estado.
+    """
+
+    def __init__(self, directory=None, value_col='CONSUMO', group_stats=None):
+        """
+        Inicializa el almacén
+
+        Parameters:
+        - directory: Carpeta donde persistir el estado (None = solo en memoria)
+        - value_col: Columna numérica sobre la que se calculan las estadísticas
+        - group_stats: Diccionario {columna: [estadísticas]} (GROUP_STATS por defecto)
+        """
+        self.directory = directory
+        self.value_col = value_col
+        self.group_stats = group_stats or GROUP_STATS
+        self.group_cols = list(self.group_stats.keys())
+
+        # Estado por periodo: {periodo: {columna: {clave: (conteo, media, m2, ordenados)}}}
+        self.period_state = {}
+        # Hashes ordenados de las filas registradas: {periodo: uint64[]}
+        self.period_rows = {}
+        # Estado acumulado: {columna: {clave: [conteo, media, m2, ordenados]}}
+        self.merged = {col: {} for col in self.group_cols + [GLOBAL_KEY]}
+        self.categories = {}
+
+        if directory and os.path.exists(os.path.join(directory, 'indice.json')):
+            self.load()
+
+    @property
+    def periods(self):
+        return sorted(self.period_state.keys())
+
+    # ------------------------------------------------------------------
+    # Actualización
+    # ------------------------------------------------------------------
+    def update(self, data, replace=False):
+        """
+        Registra los periodos de `data` en el almacén
+
+        Los periodos nuevos se agregan completos. En un periodo ya almacenado
+        solo se combinan las filas que aún no tiene (comparando hashes de
+        fila), así un mes que creció o que llega por partes queda igual que
+        si se hubiera calculado de una vez; si no trae filas nuevas se omite.
+
+        Parameters:
+        - data: DataFrame con PERIODO, la columna de valores y las columnas de grupo
+        - replace: Si es True, los periodos ya almacenados se recalculan solo
+          con las filas de `data` (para correcciones o filas eliminadas)
+
+        Returns:
+        - Lista de periodos agregados, ampliados o reemplazados
+        """
+        updated = []
+        for period, period_data in data.groupby('PERIODO', sort=True):
+            period = int(period)
+            hashes = self._row_hashes(period_data)
+            if period in self.period_state and not replace:
+                new_rows = self._unseen_rows(period, period_data, hashes)
+                if new_rows is None or not new_rows.any():
+                    continue
+                print(f"⚠️ El periodo {period} ya estaba en el almacén: se agregan {int(new_rows.sum()):,} filas nuevas")
+                period_data, hashes = period_data[new_rows], hashes[new_rows]
+            elif period in self.period_state:
+                self._remove_period(period)
+
+            self._add_period_rows(period, self._period_statistics(period_data), hashes)
+            updated.append(period)
+
+        if updated:
+            print(f"🗄️  Periodos actualizados en el almacén: {updated}")
+            if self.directory:
+                self.save(updated)
+
+        return updated
+
+    def _row_hashes(self, period_data):
+        """Hash de cada fila sobre el valor, los grupos y las columnas identificadoras"""
+        columns = {self.value_col: period_data[self.value_col].to_numpy(dtype=np.float64)}
+        for col in self.group_cols + ROW_ID_COLUMNS:
+            if col in period_data.columns:
+                columns[col] = period_data[col].astype(str).to_numpy()
+        return pd.util.hash_pandas_object(pd.DataFrame(columns), index=False).to_numpy()
+
+    def _unseen_rows(self, period, period_data, hashes):
+        """
+        Máscara de las filas que el periodo almacenado aún no tiene
+
+        Se comparan como multiconjunto: si una fila idéntica aparece k veces en
+        `data` y j veces en el almacén, las k - j últimas se consideran nuevas.
+        Devuelve None si el periodo viene de un almacén sin hashes de fila.
+        """
+        stored = self.period_rows.get(period)
+        if stored is None:
+            count = int(period_data[self.value_col].notna().sum())
+            if count != self.period_state[period][GLOBAL_KEY][GLOBAL_KEY][0]:
+                print(f"⚠️ El periodo {period} cambió ({count:,} filas) pero el almacén no guarda hashes "
+                      f"de fila; usa replace=True para recalcularlo")
+            return None
+        if not len(stored):
+            return np.ones(len(hashes), dtype=bool)
+
+        # Ocurrencia de cada hash entre sus iguales (0, 1, 2...) en el orden de `data`
+        order = np.argsort(hashes, kind='stable')
+        sorted_hashes = hashes[order]
+        occurrence = np.empty(len(hashes), dtype=np.int64)
+        occurrence[order] = np.arange(len(hashes)) - np.searchsorted(sorted_hashes, sorted_hashes, side='left')
+
+        known = (np.searchsorted(stored, hashes, side='right') - np.searchsorted(stored, hashes, side='left'))
+        return occurrence >= known
+
+    def _add_period_rows(self, period, state, hashes):
+        """Combina el estado de unas filas con su periodo y con el acumulado"""
+        current = self.period_state.setdefault(period, {})
+        for col, groups in state.items():
+            period_groups = current.setdefault(col, {})
+            for key, group_state in groups.items():
+                previous = period_groups.get(key)
+                period_groups[key] = group_state if previous is None else _combine(previous, group_state)
+                self._merge_group(col, key, group_state)
+
+        previous = self.period_rows.get(period)
+        self.period_rows[period] = np.sort(hashes if previous is None else np.concatenate([previous, hashes]))
+
+    def _period_statistics(self, period_data):
+        """Calcula estadísticas suficientes y valores ordenados de un periodo"""
+        values = period_data[self.value_col].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        state = {}
+
+        for col in self.group_cols + [GLOBAL_KEY]:
+            if col == GLOBAL_KEY:
+                keys = np.zeros(valid.sum(), dtype=np.int64)
+                uniques = np.array([GLOBAL_KEY], dtype=object)
+            else:
+                if col not in period_data.columns:
+                    continue
+                keys, uniques = pd.factorize(period_data[col].astype(str).to_numpy()[valid])
+            col_values = values[valid]
+
+            # Orden por (grupo, valor) para obtener todos los arreglos de una sola vez
+            order = np.lexsort((col_values, keys))
+            sorted_values = col_values[order].astype(np.float32)
+            counts = np.bincount(keys, minlength=len(uniques))
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+            sums = np.bincount(keys, weights=col_values, minlength=len(uniques))
+            means = sums / np.maximum(counts, 1)
+            m2 = np.bincount(keys, weights=(col_values - means[keys]) ** 2, minlength=len(uniques))
+
+            state[col] = {
+                str(key): (int(counts[i]), float(means[i]), float(m2[i]),
+                           sorted_values[offsets[i]:offsets[i + 1]])
+                for i, key in enumerate(uniques)
+            }
+
+        return state
+
+    def _merge_group(self, col, key, group_state):
+        """Combina el estado de un grupo con el acumulado (fórmula de Chan)"""
+        current = self.merged[col].get(key)
+        if current is None:
+            count_b, mean_b, m2_b, sorted_b = group_state
+            self.merged[col][key] = [count_b, mean_b, m2_b, sorted_b.copy()]
+        else:
+            current[:] = _combine(current, group_state)
+
+    def _remove_period(self, period):
+        """Quita un periodo y reconstruye solo los grupos que contenía"""
+        removed = self.period_state.pop(period)
+        self.period_rows.pop(period, None)
+        for col, groups in removed.items():
+            for key in groups:
+                self.merged[col].pop(key, None)
+                for state in self.period_state.values():
+                    if key in state.get(col, {}):
+                        self._merge_group(col, key, state[col][key])
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def group_table(self, col):
+        """
+        Tabla de estadísticas acumuladas de una agrupación, con los mismos
+        nombres de columnas que genera `clean_and_enhance_data`
+        """
+        rows = []
+        for key, (count, mean, m2, sorted_values) in self.merged[col].items():
+            stats = {
+                'count': count,
+                'mean': mean,
+                'std': np.sqrt(m2 / (count - 1)) if count > 1 else np.nan,
+                'median': _quantile_sorted(sorted_values, 0.5),
+                'min': float(sorted_values[0]),
+                'max': float(sorted_values[-1]),
+                'q25': _quantile_sorted(sorted_values, 0.25),
+                'q75': _quantile_sorted(sorted_values, 0.75),
+            }
+            row = {col: key}
+            for stat in self.group_stats[col]:
+                row[f'{stat.upper()}_{col}'] = stats[stat]
+            rows.append(row)
+
+        columns = [col] + [f'{stat.upper()}_{col}' for stat in self.group_stats[col]]
+        return pd.DataFrame(rows, columns=columns)
+
+    def global_stats(self):
+        """Conteo, media y desviación estándar de todo el histórico"""
+        count, mean, m2, _ = self.merged[GLOBAL_KEY][GLOBAL_KEY]
+        return {'count': count, 'mean': mean, 'std': np.sqrt(m2 / (count - 1)) if count > 1 else np.nan}
+
+    def percentile_in_group(self, data, col):
+        """
+        Percentil (rank(pct=True), método promedio) de cada fila dentro de su
+        grupo, calculado con búsqueda binaria sobre los arreglos ordenados
+        """
+        values = data[self.value_col].to_numpy(dtype=np.float32)
+        result = np.full(len(data), np.nan)
+
+        if col == GLOBAL_KEY:
+            codes = np.zeros(len(data), dtype=np.int64)
+            uniques = [GLOBAL_KEY]
+        else:
+            codes, uniques = pd.factorize(data[col].astype(str).to_numpy())
+
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        for i, key in enumerate(uniques):
+            group = self.merged[col].get(key)
+            if group is None:
+                continue
+            rows = order[bounds[i]:bounds[i + 1]]
+            sorted_values = group[3]
+            left = np.searchsorted(sorted_values, values[rows], side='left')
+            right = np.searchsorted(sorted_values, values[rows], side='right')
+            result[rows] = (left + (right - left + 1) / 2) / len(sorted_values)
+
+        return result
+
+    def enrich(self, data, periods=None):
+        """
+        Agrega a `data` las estadísticas de grupo y los percentiles a partir
+        del estado acumulado, sin recalcular agregados sobre el histórico
+
+        Parameters:
+        - periods: Solo se enriquecen (y se devuelven) las filas de estos
+          periodos, p. ej. los que devolvió `update`; así el costo depende del
+          mes nuevo y no de todo el histórico cargado (None = todas las filas)
+        """
+        if periods is not None:
+            data = data[data['PERIODO'].isin(list(periods))]
+        for col in self.group_cols:
+            if col in data.columns:
+                data = data.merge(self.group_table(col), on=col, how='left')
+
+        if 'DISTRITO' in self.group_cols:
+            data['PERCENTILE_DISTRITO'] = self.percentile_in_group(data, 'DISTRITO')
+        data['PERCENTILE_GLOBAL'] = self.percentile_in_group(data, GLOBAL_KEY)
+
+        return data
+
+    def encode_categories(self, col, values):
+        """
+        Mantiene el vocabulario acumulado de una columna categórica para que
+        las codificaciones sean consistentes entre periodos
+
+        Returns:
+        - Arreglo ordenado de clases (compatible con LabelEncoder.classes_)
+        """
+        known = set(self.categories.get(col, []))
+        known.update(pd.unique(np.asarray(values, dtype=str)))
+        self.categories[col] = sorted(known)
+        return np.array(self.categories[col])
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+    def save(self, periods=None):
+        """Guarda los periodos indicados (todos por defecto) y el índice"""
+        os.makedirs(self.directory, exist_ok=True)
+
+        for period in (periods if periods is not None else self.periods):
+            arrays = {}
+            for col, groups in self.period_state[period].items():
+                keys = list(groups.keys())
+                arrays[f'{col}__keys'] = np.array(keys, dtype=str)
+                arrays[f'{col}__count'] = np.array([groups[k][0] for k in keys], dtype=np.int64)
+                arrays[f'{col}__mean'] = np.array([groups[k][1] for k in keys], dtype=np.float64)
+                arrays[f'{col}__m2'] = np.array([groups[k][2] for k in keys], dtype=np.float64)
+                arrays[f'{col}__values'] = (np.concatenate([groups[k][3] for k in keys])
+                                            if keys else np.empty(0, dtype=np.float32))
+            if period in self.period_rows:
+                arrays['__rows__'] = self.period_rows[period]
+            np.savez(os.path.join(self.directory, f'periodo_{period}.npz'), **arrays)
+
+        index = {
+            'value_col': self.value_col,
+            'group_stats': self.group_stats,
+            'periods': self.periods,
+            'categories': self.categories,
+        }
+        with open(os.path.join(self.directory, 'indice.json'), 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+
+    def load(self):
+        """Carga el índice y todos los periodos persistidos"""
+        with open(os.path.join(self.directory, 'indice.json'), encoding='utf-8') as f:
+            index = json.load(f)
+
+        self.value_col = index['value_col']
+        self.group_stats = index['group_stats']
+        self.group_cols = list(self.group_stats.keys())
+        self.categories = index.get('categories', {})
+        self.merged = {col: {} for col in self.group_cols + [GLOBAL_KEY]}
+        self.period_state = {}
+        self.period_rows = {}
+
+        for period in index['periods']:
+            arrays = np.load(os.path.join(self.directory, f'periodo_{period}.npz'))
+            state = {}
+            for col in self.group_cols + [GLOBAL_KEY]:
+                if f'{col}__keys' not in arrays:
+                    continue
+                counts = arrays[f'{col}__count']
+                offsets = np.concatenate([[0], np.cumsum(counts)])
+                values = arrays[f'{col}__values']
+                state[col] = {
+                    str(key): (int(counts[i]), float(arrays[f'{col}__mean'][i]),
+                               float(arrays[f'{col}__m2'][i]), values[offsets[i]:offsets[i + 1]])
+                    for i, key in enumerate(arrays[f'{col}__keys'])
+                }
+            self.period_state[int(period)] = state
+            if '__rows__' in arrays:
+                self.period_rows[int(period)] = arrays['__rows__']
+            for col, groups in state.items():
+                for key, group_state in groups.items():
+                    self._merge_group(col, key, group_state)
+
+        print(f"🗄️  Almacén cargado: {len(self.period_state)} periodos")
+
+
+def _combine(state_a, state_b):
+    """Une dos estados (conteo, media, m2, ordenados) con la fórmula de Chan"""
+    count_a, mean_a, m2_a, sorted_a = state_a
+    count_b, mean_b, m2_b, sorted_b = state_b
+    if not count_a or not count_b:
+        return tuple(state_b if not count_a else state_a)
+    total = count_a + count_b
+    delta = mean_b - mean_a
+    return (total, mean_a + delta * count_b / total, m2_a + m2_b + delta ** 2 * count_a * count_b / total,
+            np.insert(sorted_a, np.searchsorted(sorted_a, sorted_b), sorted_b))
+
+
+def _quantile_sorted(sorted_values, q):
+    """Cuantil con interpolación lineal (igual que pandas) sobre un arreglo ordenado"""
+    n = len(sorted_values)
+    if n == 0:
+        return np.nan
+    position = q * (n - 1)
+    lower = int(np.floor(position))
+    upper = min(lower + 1, n - 1)
+    fraction = position - lower
+    return float(sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction)
@@ -0,0 +1,143 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+
+
+class MicroBatchScorer:
+    """
+    Agrupa peticiones concurrentes en micro-lotes para puntuarlas juntas
+
+    Cada petición deja sus registros en una cola y espera un Future. Un hilo
+    de fondo toma la primera petición pendiente, junta las que lleguen en los
+    siguientes `max_wait_ms` milisegundos (o hasta `max_batch` registros) y
+    llama una sola vez a `score_fn` con todas. Con un modelo vectorizado el
+    costo de un lote es casi el de un registro, así que el rendimiento crece
+    con la concurrencia y la latencia extra está acotada por `max_wait_ms`.
+    Si el lote falla, cada petición se vuelve a puntuar por separado: el
+    error le llega solo a la que lo causó.
+
+    Lleva contadores de peticiones, registros, lotes, errores y las últimas
+    latencias para `metrics()`.
+    """
+
+    def __init__(self, score_fn, max_batch=512, max_wait_ms=5, latency_window=10000):
+        """
+        Parameters:
+        - score_fn: Función DataFrame -> DataFrame con una fila por registro (en el mismo orden)
+        - max_batch: Registros máximos por lote
+        - max_wait_ms: Espera máxima para completar un lote desde la primera petición
+        - latency_window: Peticiones recientes usadas para los percentiles de latencia
+        """
+        self.score_fn = score_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._batch_sizes = deque(maxlen=latency_window)
+        self._counters = {'peticiones': 0, 'registros': 0, 'lotes': 0, 'errores': 0}
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='micro-batch', daemon=True)
+        self._thread.start()
+
+    def submit(self, records):
+        """Encola registros (DataFrame) y devuelve un Future con su DataFrame de resultados"""
+        future = Future()
+        self._queue.put((records, future, time.perf_counter()))
+        return future
+
+    def score(self, records, timeout=None):
+        """Puntúa registros esperando el resultado del lote en el que entren"""
+        return self.submit(records).result(timeout)
+
+    def _collect(self):
+        """Primera petición pendiente más las que lleguen antes de cerrar el lote"""
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch, size
+
+    def _run(self):
+        while True:
+            batch, size = self._collect()
+            try:
+                results = self.score_fn(pd.concat([records for records, _, _ in batch], ignore_index=True))
+            except Exception as e:
+                if len(batch) == 1:
+                    self._fail(batch, e)
+                else:
+                    # Una petición inválida no debe tumbar a las demás del lote: se reintenta una por una
+                    self._score_separately(batch)
+                continue
+
+            start = 0
+            parts = []
+            for records, _, _ in batch:
+                parts.append(results.iloc[start:start + len(records)].reset_index(drop=True))
+                start += len(records)
+            self._deliver(batch, parts)
+
+    def _score_separately(self, batch):
+        """Puntúa cada petición por su cuenta; solo las que fallan reciben la excepción"""
+        delivered, parts = [], []
+        for item in batch:
+            try:
+                parts.append(self.score_fn(item[0].reset_index(drop=True)).reset_index(drop=True))
+            except Exception as e:
+                self._fail([item], e)
+                continue
+            delivered.append(item)
+        if delivered:
+            self._deliver(delivered, parts)
+
+    def _deliver(self, batch, parts):
+        finished = time.perf_counter()
+        for (_, future, _), part in zip(batch, parts):
+            future.set_result(part)
+        size = sum(len(records) for records, _, _ in batch)
+        with self._lock:
+            self._counters['peticiones'] += len(batch)
+            self._counters['registros'] += size
+            self._counters['lotes'] += 1
+            self._batch_sizes.append(size)
+            self._latencies.extend(finished - submitted for _, _, submitted in batch)
+
+    def _fail(self, batch, error):
+        for _, future, _ in batch:
+            future.set_exception(error)
+        with self._lock:
+            self._counters['errores'] += len(batch)
+
+    def metrics(self):
+        """Contadores de rendimiento y percentiles de latencia (ms) de las peticiones recientes"""
+        with self._lock:
+            counters = dict(self._counters)
+            latencies = np.array(self._latencies) * 1000
+            batch_sizes = np.array(self._batch_sizes)
+        elapsed = time.perf_counter() - self._started
+        metrics = {
+            **counters,
+            'en_cola': self._queue.qsize(),
+            'segundos_activo': round(elapsed, 1),
+            'registros_por_segundo': round(counters['registros'] / elapsed, 2) if elapsed > 0 else 0.0,
+            'registros_por_lote': round(float(batch_sizes.mean()), 2) if len(batch_sizes) else 0.0,
+        }
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            metrics['latencia_ms'] = {'p50': round(p50, 2), 'p95': round(p95, 2), 'p99': round(p99, 2),
+                                      'max': round(float(latencies.max()), 2)}
+        return metrics
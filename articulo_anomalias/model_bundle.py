@@ -0,0 +1,211 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Niveles con media/desviación de CONSUMO usadas por los Z-scores del detector
+GROUP_LEVELS = ['DISTRITO', 'PROVINCIA', 'TARIFA']
+
+
+def average_rank_percentile(sorted_values, values):
+    """
+    Percentil de `values` dentro de `sorted_values` como rank(pct=True) con el
+    método promedio: los empates reciben el rango medio de su bloque
+    """
+    left = np.searchsorted(sorted_values, values, side='left')
+    right = np.searchsorted(sorted_values, values, side='right')
+    percentile = (left + (right - left + 1) / 2) / len(sorted_values)
+    return np.where(np.isnan(values), np.nan, percentile)
+
+
+class ModelBundle:
+    """
+    Modelo de anomalías empaquetado para puntuar recibos uno a uno o en lotes
+
+    Contiene todo lo que el detector avanzado necesita para reconstruir las
+    características de un registro nuevo sin volver a leer el reporte: el
+    scaler y el motor ajustados, las clases de cada LabelEncoder, las
+    medianas usadas para rellenar faltantes, media y desviación de CONSUMO
+    por distrito, provincia y tarifa, y los CONSUMO ordenados de cada
+    distrito (y de todo el ajuste) para los percentiles exactos por búsqueda
+    binaria.
+
+    `score` está vectorizado: un lote de N registros cuesta una sola llamada
+    al scaler y al motor, por eso el servicio web agrupa las peticiones.
+    """
+
+    def __init__(self, feature_names, scaler, engine, encoders, group_stats, district_values,
+                 global_values, fill_values=None, metadata=None):
+        self.feature_names = list(feature_names)
+        self.scaler = scaler
+        self.engine = engine
+        self.encoders = encoders
+        self.group_stats = group_stats
+        self.district_values = district_values
+        self.global_values = global_values
+        self.fill_values = fill_values
+        self.metadata = metadata or {}
+        # Códigos de cada categoría sin pasar por LabelEncoder.transform (que falla con valores nuevos)
+        self._codes = {col: pd.Series(np.arange(len(classes)), index=pd.Index(classes))
+                       for col, classes in encoders.items()}
+
+    @classmethod
+    def from_detector(cls, detector, data):
+        """
+        Empaqueta un detector avanzado ya ajustado
+
+        Parameters:
+        - detector: ElectroPunoAnomalyDetectorAdvanced después de fit_predict_anomalies
+        - data: Datos enriquecidos con los que se ajustó (clean_and_enhance_data)
+        """
+        if not detector.is_fitted:
+            raise ValueError("Primero ejecuta fit_predict_anomalies")
+
+        group_stats = {}
+        for level in GROUP_LEVELS:
+            columns = [f'MEAN_{level}', f'STD_{level}']
+            if level in data.columns and all(c in data.columns for c in columns):
+                # Se conserva el dtype con el que el detector calculó los Z-scores
+                stats = data.groupby(data[level].astype(str), observed=True)[columns].first()
+                stats.columns = ['mean', 'std']
+                group_stats[level] = stats
+
+        if detector.feature_store is not None:
+            # Los percentiles del detector salen de los arreglos acumulados del feature store
+            from feature_store import GLOBAL_KEY
+            merged = detector.feature_store.merged
+            district_values = {key: state[3] for key, state in merged['DISTRITO'].items()}
+            global_values = merged[GLOBAL_KEY][GLOBAL_KEY][3]
+        else:
+            consumo = data['CONSUMO'].to_numpy(dtype=np.float32)
+            names, codes = np.unique(data['DISTRITO'].astype(str).to_numpy(), return_inverse=True)
+            order = np.lexsort((consumo, codes))
+            bounds = np.searchsorted(codes[order], np.arange(len(names) + 1))
+            district_values = {name: consumo[order[bounds[i]:bounds[i + 1]]] for i, name in enumerate(names)}
+            global_values = np.sort(consumo)
+
+        metadata = {
+            'creado': datetime.now().isoformat(timespec='seconds'),
+            'motor': detector.engine.name,
+            'contaminacion': detector.contamination,
+            'filas': int(len(data)),
+            'periodos': sorted(int(p) for p in np.unique(data['PERIODO'])),
+        }
+        encoders = {col: np.asarray(le.classes_).astype(str) for col, le in detector.label_encoders.items()}
+        return cls(detector.feature_names, detector.scaler, detector.engine, encoders, group_stats,
+                   district_values, global_values, detector.fill_values, metadata)
+
+    def save(self, path):
+        import joblib
+        joblib.dump(self, path, compress=3)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        import joblib
+        bundle = joblib.load(path)
+        if not isinstance(bundle, cls):
+            raise TypeError(f"{path} no contiene un ModelBundle")
+        return bundle
+
+    def restore(self, detector):
+        """Deja `detector` ajustado con este modelo (para predecir sin reentrenar)"""
+        from sklearn.preprocessing import LabelEncoder
+        detector.feature_names = list(self.feature_names)
+        detector.scaler = self.scaler
+        detector.engine = self.engine
+        detector.isolation_forest = getattr(self.engine, 'model', None)
+        detector.fill_values = self.fill_values
+        detector.label_encoders = {}
+        for col, classes in self.encoders.items():
+            le = LabelEncoder()
+            le.classes_ = np.asarray(classes)
+            detector.label_encoders[col] = le
+        detector.is_fitted = True
+        return detector
+
+    def _percentile_district(self, consumo, districts):
+        """Percentil de CONSUMO dentro de cada distrito (NaN si el distrito es nuevo)"""
+        percentile = np.full(len(consumo), np.nan)
+        for district in np.unique(districts):
+            sorted_values = self.district_values.get(district)
+            if sorted_values is not None and len(sorted_values):
+                rows = districts == district
+                percentile[rows] = average_rank_percentile(sorted_values, consumo[rows])
+        return percentile
+
+    def features(self, records):
+        """
+        Características del modelo para registros nuevos
+
+        Parameters:
+        - records: DataFrame con CONSUMO, PERIODO, DISTRITO y, si se tienen,
+          PROVINCIA, TARIFA, DEPARTAMENTO, ESTADO_CLIENTE y FACTURACIÓN
+
+        Se calculan con los mismos tipos que clean_and_enhance_data (CONSUMO y
+        FACTURACIÓN en float32) para reproducir las características del
+        ajuste. Los valores que no se pueden calcular (distrito o tarifa
+        desconocidos, columnas ausentes) toman las medianas del ajuste.
+        """
+        consumo = pd.to_numeric(records['CONSUMO'], errors='coerce').to_numpy(dtype=np.float32)
+        X = pd.DataFrame({'CONSUMO': consumo}, index=records.index)
+        if 'PERIODO' in records:
+            periodo = pd.to_numeric(records['PERIODO'], errors='coerce')
+            X['PERIODO'] = periodo
+            X['AÑO'] = periodo // 100
+            X['MES'] = periodo % 100
+        if 'FACTURACIÓN' in records:
+            facturacion = pd.to_numeric(records['FACTURACIÓN'], errors='coerce').to_numpy(dtype=np.float32)
+            X['FACTURACIÓN'] = facturacion
+            X['RATIO_CONSUMO_FACTURACION'] = consumo / (facturacion + 1e-8)
+            X['EFICIENCIA_ENERGETICA'] = facturacion / (consumo + 1e-8)
+
+        for level, stats in self.group_stats.items():
+            if level not in records:
+                continue
+            joined = stats.reindex(records[level].astype(str))
+            mean = joined['mean'].to_numpy()
+            std = joined['std'].to_numpy()
+            X[f'MEAN_{level}'] = mean
+            X[f'STD_{level}'] = std
+            X[f'Z_SCORE_{level}'] = (consumo - mean) / (std + 1e-8)
+        if 'MEAN_DISTRITO' in X:
+            X['CV_DISTRITO'] = X['STD_DISTRITO'] / (X['MEAN_DISTRITO'] + 1e-8)
+            X['PERCENTILE_DISTRITO'] = self._percentile_district(consumo, records['DISTRITO'].astype(str).to_numpy())
+        X['PERCENTILE_GLOBAL'] = average_rank_percentile(self.global_values, consumo)
+
+        for col, codes in self._codes.items():
+            if col in records:
+                X[f'{col}_ENCODED'] = codes.reindex(records[col].astype(str)).to_numpy()
+
+        X = X.reindex(columns=self.feature_names)
+        X = X.replace([np.inf, -np.inf], np.nan)
+        if self.fill_values is not None:
+            X = X.fillna(self.fill_values)
+        return X.fillna(pd.Series(self.scaler.mean_, index=self.feature_names))
+
+    def score(self, records):
+        """
+        Puntúa un lote de registros
+
+        Returns:
+        - DataFrame con ANOMALY_SCORE (más bajo = más anómalo), IS_ANOMALY y
+          Z_SCORE_DISTRITO (NaN si el distrito no estaba en el ajuste)
+        """
+        if isinstance(records, dict):
+            records = pd.DataFrame([records])
+        elif not isinstance(records, pd.DataFrame):
+            records = pd.DataFrame(list(records))
+        X = self.features(records)
+        X_scaled = self.scaler.transform(X)
+        scores = self.engine.score_samples(X_scaled)
+
+        z_distrito = np.full(len(records), np.nan)
+        if 'DISTRITO' in self.group_stats and 'DISTRITO' in records:
+            stats = self.group_stats['DISTRITO'].reindex(records['DISTRITO'].astype(str))
+            consumo = pd.to_numeric(records['CONSUMO'], errors='coerce').to_numpy(dtype=np.float64)
+            z_distrito = (consumo - stats['mean'].to_numpy()) / (stats['std'].to_numpy() + 1e-8)
+        return pd.DataFrame({
+            'ANOMALY_SCORE': scores,
+            'IS_ANOMALY': scores < self.engine.offset_,
+            'Z_SCORE_DISTRITO': z_distrito,
+        }, index=records.index)
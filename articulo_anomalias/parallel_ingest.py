@@ -0,0 +1,235 @@
+"""
+Lectura paralela de CSV por rangos de bytes
+
+El archivo se divide en rangos alineados a saltos de línea y cada proceso
+analiza su rango con `pd.read_csv` y el mismo mapa de tipos. Las columnas se
+devuelven por memoria compartida, sin serializar DataFrames:
+
+1. Cada proceso cuenta las filas de su rango, así se conoce el desplazamiento
+   de cada rango y el tamaño total de cada columna.
+2. Cada proceso analiza su rango y escribe en bloques de memoria compartida:
+   las columnas numéricas con su tipo final y las de texto/categoría como
+   códigos int32. Solo el vocabulario de cada columna de texto (valores
+   únicos del rango) vuelve por pickle.
+
+Las columnas 'category' del mapa de tipos se devuelven como Categorical con
+las categorías ordenadas (como `read_csv`) y las 'str'/'object' como texto.
+Las que no están en el mapa se analizan también como códigos y al final se
+infiere su tipo sobre el vocabulario global, como lo haría `read_csv` con la
+columna completa: entera si todos los valores son enteros y no faltan,
+float64 si son numéricos con faltantes o decimales, bool si son True/False y
+texto en otro caso. Los faltantes quedan como NaN. Supone que ningún campo
+contiene saltos de línea entre comillas (el formato de reporte.csv).
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+import pandas as pd
+
+CODE_DTYPE = np.int32
+
+
+def byte_ranges(file_path, n_parts):
+    """
+    Divide el archivo en rangos [inicio, fin) que empiezan y terminan en un salto de línea
+
+    Returns:
+    - header: Nombres de columnas (primera línea)
+    - ranges: Lista de (inicio, fin) en bytes, sin incluir el encabezado
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        header_line = f.readline()
+        data_start = f.tell()
+        header = header_line.decode('utf-8-sig').rstrip('\r\n').split(',')
+
+        cuts = [data_start]
+        for i in range(1, n_parts):
+            target = data_start + (size - data_start) * i // n_parts
+            if target <= cuts[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()  # avanzar hasta el final de la línea en curso
+            position = f.tell()
+            if cuts[-1] < position < size:
+                cuts.append(position)
+        cuts.append(size)
+
+    return header, [(start, end) for start, end in zip(cuts[:-1], cuts[1:]) if end > start]
+
+
+def _read_range(file_path, start, end):
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        return f.read(end - start)
+
+
+def _attach(name):
+    """Abre un bloque existente sin que el proceso hijo lo registre como propio"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        # Antes de 3.13 abrir un bloque lo registra en el resource_tracker, que
+        # lo borraría o avisaría de una fuga; el proceso principal es el dueño
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _count_rows(file_path, start, end):
+    """Filas no vacías del rango (read_csv omite las líneas en blanco)"""
+    data = np.frombuffer(_read_range(file_path, start, end), dtype=np.uint8)
+    newlines = np.flatnonzero(data == ord('\n'))
+    starts = np.concatenate([[0], newlines + 1])
+    ends = np.concatenate([newlines, [len(data)]])
+    lengths = ends - starts
+    # Un '\r' final no cuenta como contenido
+    carriage = (lengths > 0) & (data[np.maximum(ends - 1, 0)] == ord('\r'))
+    return int(np.count_nonzero(lengths - carriage))
+
+
+def _parse_range(file_path, start, end, offset, n_rows, header, parse_dtypes, numeric, blocks):
+    """
+    Analiza un rango y escribe sus columnas en la memoria compartida
+
+    Returns:
+    - Vocabulario local de cada columna de texto {columna: valores únicos}
+    """
+    chunk = pd.read_csv(io.BytesIO(_read_range(file_path, start, end)), header=None, names=header,
+                        dtype=parse_dtypes, encoding='utf-8', low_memory=False)
+    if len(chunk) != n_rows:
+        raise ValueError(f"Rango {start}-{end}: se esperaban {n_rows} filas y se leyeron {len(chunk)}")
+
+    vocabularies = {}
+    for col, (name, dtype) in blocks.items():
+        shm = _attach(name)
+        try:
+            target = np.ndarray((offset + n_rows,), dtype=dtype, buffer=shm.buf)[offset:]
+            if col in numeric:
+                target[:] = chunk[col].to_numpy(dtype=dtype)
+            else:
+                # El parser de pandas ya entrega códigos y categorías ordenadas
+                target[:] = chunk[col].cat.codes.to_numpy()
+                vocabularies[col] = chunk[col].cat.categories
+            del target
+        finally:
+            shm.close()
+    return vocabularies
+
+
+def read_csv_parallel(file_path, dtype=None, n_workers=None):
+    """
+    Lee un CSV en paralelo por rangos de bytes
+
+    Parameters:
+    - file_path: Ruta del CSV
+    - dtype: Mapa de tipos por columna (como en `pd.read_csv`)
+    - n_workers: Procesos (None = todos los núcleos)
+
+    Returns:
+    - DataFrame con las columnas en el orden del archivo
+    """
+    dtype = dict(dtype or {})
+    n_workers = n_workers or os.cpu_count() or 1
+    header, ranges = byte_ranges(file_path, n_workers)
+
+    numeric = {col: np.dtype(t) for col, t in dtype.items() if t not in ('category', 'str', 'object', str, object)}
+    categorical = [col for col in header if dtype.get(col) == 'category']
+    # Todo lo que no es numérico se analiza como categoría (códigos + vocabulario)
+    parse_dtypes = {col: numeric.get(col, 'category') for col in header}
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        # Fase 1: filas por rango → desplazamientos
+        counts = list(pool.map(_count_rows, [file_path] * len(ranges), *zip(*ranges)))
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        total = int(np.sum(counts))
+
+        shms, blocks = [], {}
+        try:
+            for col in header:
+                col_dtype = numeric.get(col, np.dtype(CODE_DTYPE))
+                shm = shared_memory.SharedMemory(create=True, size=max(1, total * col_dtype.itemsize))
+                shms.append(shm)
+                blocks[col] = (shm.name, col_dtype)
+
+            # Fase 2: análisis en paralelo directo a memoria compartida
+            tasks = [
+                pool.submit(_parse_range, file_path, start, end, int(offset), int(n_rows),
+                            header, parse_dtypes, set(numeric), blocks)
+                for (start, end), offset, n_rows in zip(ranges, offsets, counts)
+            ]
+            vocabularies = [task.result() for task in tasks]
+
+            columns = {}
+            for col, shm in zip(header, shms):
+                values = np.ndarray((total,), dtype=blocks[col][1], buffer=shm.buf).copy()
+                if col in numeric:
+                    columns[col] = values
+                elif col in categorical:
+                    columns[col] = _decode(values, [v[col] for v in vocabularies], counts)
+                else:
+                    columns[col] = _infer_column(_decode(values, [v[col] for v in vocabularies], counts),
+                                                 as_text=col in dtype)
+        finally:
+            for shm in shms:
+                shm.close()
+                shm.unlink()
+
+    return pd.DataFrame(columns)
+
+
+def _decode(codes, vocabularies, counts):
+    """Pasa los códigos locales de cada rango a un vocabulario global"""
+    merged_index = pd.Index(vocabularies[0]) if vocabularies else pd.Index([], dtype='str')
+    for vocabulary in vocabularies[1:]:
+        if not merged_index.equals(vocabulary):
+            merged_index = merged_index.union(vocabulary)  # unión ordenada
+
+    start = 0
+    for vocabulary, n_rows in zip(vocabularies, counts):
+        segment = codes[start:start + n_rows]
+        if not merged_index.equals(vocabulary):
+            remap = merged_index.get_indexer(vocabulary).astype(CODE_DTYPE)
+            valid = segment >= 0
+            segment[valid] = remap[segment[valid]]
+        start += n_rows
+
+    return pd.Categorical.from_codes(codes, categories=merged_index)
+
+
+def _infer_column(values, as_text=False):
+    """
+    Tipo final de una columna sin tipo en el mapa, decidido sobre su vocabulario
+    (as_text=True para las columnas marcadas 'str'/'object', que no se convierten)
+
+    Replica la inferencia de `read_csv` sobre la columna completa: el
+    vocabulario (valores únicos) es mucho más corto que la columna, así que
+    convertirlo cuesta poco aunque la columna tenga cientos de miles de filas.
+    """
+    codes = values.codes
+    missing = codes < 0
+    categories = pd.Series(np.asarray(values.categories, dtype=object))
+    if not len(categories):
+        return np.full(len(codes), np.nan)  # columna vacía: read_csv la deja en float64
+
+    numbers = pd.to_numeric(categories, errors='coerce')
+    if not as_text and numbers.notna().all():
+        decoded = numbers.to_numpy()[codes]
+        if missing.any():
+            decoded = decoded.astype(np.float64)
+            decoded[missing] = np.nan
+        return decoded
+
+    lowered = categories.str.lower()
+    if not as_text and lowered.isin(['true', 'false']).all() and not missing.any():
+        return (lowered == 'true').to_numpy()[codes]
+
+    # Texto: mismo tipo que da read_csv (str en pandas 3, object antes) y NaN en los faltantes
+    decoded = categories.to_numpy()[codes]
+    decoded[missing] = np.nan
+    return pd.Series(decoded).array
@@ -0,0 +1,245 @@
+"""
+Pruebas de hipótesis agrupadas y vectorizadas
+
+En una sola pasada se calculan los estadísticos suficientes de cada grupo
+(conteo, suma, suma de cuadrados y suma de rangos); con ellos se resuelven a
+la vez ANOVA de una vía, Kruskal-Wallis y todas las t de Welch por pares,
+sin volver a recorrer los datos por cada prueba. Las pruebas chi-cuadrado de
+independencia se arman como un tensor de contingencia (grupo x fila x columna)
+con `np.bincount` y se evalúan todas juntas.
+"""
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def _codificar(columnas):
+    """Código entero y etiqueta de cada combinación de columnas (p. ej. DISTRITO x TARIFA)"""
+    if isinstance(columnas, pd.DataFrame):
+        columnas = [columnas[c] for c in columnas.columns]
+    elif isinstance(columnas, (pd.Series, np.ndarray)):
+        columnas = [columnas]
+    codigos = np.zeros(len(columnas[0]), dtype=np.int64)
+    etiquetas = None
+    for columna in columnas:
+        codigos_col, valores = pd.factorize(np.asarray(columna), sort=True)
+        codigos = codigos * len(valores) + codigos_col
+        etiquetas = [str(v) for v in valores] if etiquetas is None else \
+            [f"{a} | {b}" for a in etiquetas for b in valores]
+    usados, codigos = np.unique(codigos, return_inverse=True)
+    return codigos, np.asarray(etiquetas, dtype=object)[usados]
+
+
+class EstadisticosSuficientes:
+    """Conteos, sumas, sumas de cuadrados y sumas de rangos por grupo"""
+
+    def __init__(self, valores, grupos):
+        """
+        Args:
+            valores (array): Variable numérica (p. ej. CONSUMO), sin nulos
+            grupos (array | list | DataFrame): Columna(s) que definen los grupos
+        """
+        valores = np.asarray(valores, dtype=np.float64)
+        codigos, self.nombres = _codificar(grupos)
+        k = len(self.nombres)
+
+        self.N = len(valores)
+        self.n = np.bincount(codigos, minlength=k).astype(np.float64)
+        self.suma = np.bincount(codigos, weights=valores, minlength=k)
+        self.suma_cuadrados = np.bincount(codigos, weights=valores ** 2, minlength=k)
+
+        # Rangos promedio con empates a partir de los valores únicos
+        unicos, inverso, repeticiones = np.unique(valores, return_inverse=True, return_counts=True)
+        rango_promedio = np.cumsum(repeticiones) - (repeticiones - 1) / 2
+        self.suma_rangos = np.bincount(codigos, weights=rango_promedio[inverso], minlength=k)
+        self.empates = float(np.sum(repeticiones.astype(np.float64) ** 3 - repeticiones))
+
+    @property
+    def media(self):
+        return self.suma / self.n
+
+    @property
+    def varianza(self):
+        """Varianza muestral (n - 1) de cada grupo"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (self.suma_cuadrados - self.suma ** 2 / self.n) / (self.n - 1)
+
+    def tabla(self):
+        return pd.DataFrame({
+            'grupo': self.nombres,
+            'n': self.n.astype(np.int64),
+            'media': self.media,
+            'desviacion_estandar': np.sqrt(np.maximum(self.varianza, 0)),
+            'rango_promedio': self.suma_rangos / self.n,
+        })
+
+
+def anova_una_via(suf):
+    """ANOVA de una vía a partir de los estadísticos suficientes"""
+    k = len(suf.n)
+    media_global = suf.suma.sum() / suf.N
+    ss_entre = np.sum(suf.n * (suf.media - media_global) ** 2)
+    ss_dentro = np.sum(suf.suma_cuadrados - suf.suma ** 2 / suf.n)
+    gl_entre, gl_dentro = k - 1, suf.N - k
+    f = (ss_entre / gl_entre) / (ss_dentro / gl_dentro)
+    return {'prueba': 'ANOVA', 'estadistico': f, 'gl_1': gl_entre, 'gl_2': gl_dentro,
+            'p_valor': stats.f.sf(f, gl_entre, gl_dentro)}
+
+
+def kruskal_wallis(suf):
+    """Kruskal-Wallis con corrección por empates"""
+    N = suf.N
+    h = 12 / (N * (N + 1)) * np.sum(suf.suma_rangos ** 2 / suf.n) - 3 * (N + 1)
+    h /= 1 - suf.empates / (N ** 3 - N)
+    gl = len(suf.n) - 1
+    return {'prueba': 'Kruskal-Wallis', 'estadistico': h, 'gl_1': gl, 'gl_2': np.nan,
+            'p_valor': stats.chi2.sf(h, gl)}
+
+
+def corregir_p_valores(p_valores, metodo='holm'):
+    """
+    Corrección por comparaciones múltiples ('holm', 'bh' o 'bonferroni'); los NaN se ignoran
+    """
+    p = np.asarray(p_valores, dtype=np.float64)
+    ajustados = np.full_like(p, np.nan)
+    validos = np.flatnonzero(~np.isnan(p))
+    m = len(validos)
+    if m == 0:
+        return ajustados
+
+    orden = validos[np.argsort(p[validos], kind='stable')]
+    ordenados = p[orden]
+    if metodo == 'holm':
+        corregidos = np.maximum.accumulate((m - np.arange(m)) * ordenados)
+    elif metodo == 'bh':
+        corregidos = np.minimum.accumulate((ordenados * m / np.arange(1, m + 1))[::-1])[::-1]
+    elif metodo == 'bonferroni':
+        corregidos = ordenados * m
+    else:
+        raise ValueError("metodo debe ser 'holm', 'bh' o 'bonferroni'")
+    ajustados[orden] = np.minimum(corregidos, 1.0)
+    return ajustados
+
+
+def welch_por_pares(suf, correccion='holm', min_n=2):
+    """
+    t de Welch para todos los pares de grupos, vectorizada
+
+    Returns:
+        pd.DataFrame: Un par por fila con diferencia de medias, t, gl, p y p corregido
+    """
+    validos = np.flatnonzero(suf.n >= min_n)
+    i, j = np.triu_indices(len(validos), k=1)
+    i, j = validos[i], validos[j]
+
+    media, n = suf.media, suf.n
+    var = np.maximum(suf.varianza, 0)  # la resta de sumas puede dejar -1e-12
+    a, b = var[i] / n[i], var[j] / n[j]
+    error = np.sqrt(a + b)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = (media[i] - media[j]) / error
+        gl = (a + b) ** 2 / (a ** 2 / (n[i] - 1) + b ** 2 / (n[j] - 1))
+    t[error == 0] = np.nan
+    p = 2 * stats.t.sf(np.abs(t), gl)
+
+    return pd.DataFrame({
+        'grupo_1': suf.nombres[i],
+        'grupo_2': suf.nombres[j],
+        'n_1': n[i].astype(np.int64),
+        'n_2': n[j].astype(np.int64),
+        'diferencia_medias': media[i] - media[j],
+        't': t,
+        'gl': gl,
+        'p_valor': p,
+        'p_corregido': corregir_p_valores(p, correccion),
+    })
+
+
+def chi_cuadrado_por_grupo(filas, columnas, grupos=None, correccion='holm'):
+    """
+    Chi-cuadrado de independencia filas x columnas dentro de cada grupo, todas a la vez
+
+    Args:
+        filas, columnas (array): Variables categóricas a cruzar (p. ej. TARIFA y ES_ANOMALIA)
+        grupos (array | list | DataFrame): Grupos donde se repite la prueba (None = una sola tabla)
+
+    Returns:
+        pd.DataFrame: Estadístico, gl, p y p corregido por grupo
+    """
+    codigo_fila, _ = _codificar(filas)
+    codigo_col, _ = _codificar(columnas)
+    if grupos is None:
+        codigo_grupo, nombres = np.zeros(len(codigo_fila), dtype=np.int64), np.array(['total'], dtype=object)
+    else:
+        codigo_grupo, nombres = _codificar(grupos)
+
+    G, R, C = len(nombres), codigo_fila.max() + 1, codigo_col.max() + 1
+    celda = (codigo_grupo * R + codigo_fila) * C + codigo_col
+    observados = np.bincount(celda, minlength=G * R * C).reshape(G, R, C).astype(np.float64)
+
+    total_fila = observados.sum(axis=2, keepdims=True)
+    total_col = observados.sum(axis=1, keepdims=True)
+    total = observados.sum(axis=(1, 2), keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        esperados = total_fila * total_col / total
+        aportes = np.where(esperados > 0, (observados - esperados) ** 2 / esperados, 0.0)
+    chi2 = aportes.sum(axis=(1, 2))
+
+    # Solo cuentan las filas y columnas presentes en cada grupo
+    gl = ((total_fila[:, :, 0] > 0).sum(axis=1) - 1) * ((total_col[:, 0, :] > 0).sum(axis=1) - 1)
+    p = np.where(gl > 0, stats.chi2.sf(chi2, np.maximum(gl, 1)), np.nan)
+    presentes = (total_fila > 0) & (total_col > 0)
+
+    return pd.DataFrame({
+        'grupo': nombres,
+        'n': total[:, 0, 0].astype(np.int64),
+        'chi_cuadrado': chi2,
+        'gl': gl,
+        'p_valor': p,
+        'p_corregido': corregir_p_valores(p, correccion),
+        # Regla usual: la aproximación es dudosa si algún esperado es < 5
+        'esperado_minimo': np.where(presentes, esperados, np.inf).min(axis=(1, 2)),
+    })
+
+
+def independencia_por_grupo(data, filas, columnas, por=None, correccion='holm'):
+    """
+    Chi-cuadrado de `filas` x `columnas` (p. ej. TARIFA x ESTADO_CLIENTE) dentro
+    de cada grupo de `por` (p. ej. DISTRITO), omitiendo las filas con nulos
+
+    Returns:
+        pd.DataFrame: Resultado de `chi_cuadrado_por_grupo`
+    """
+    por = [] if por is None else [por] if isinstance(por, str) else list(por)
+    datos = data[[filas, columnas] + por].dropna()
+    return chi_cuadrado_por_grupo(datos[filas], datos[columnas], datos[por] if por else None,
+                                  correccion=correccion)
+
+
+def comparar_grupos(data, valor, por, correccion='holm', min_n=2, independencia=None, independencia_por=None):
+    """
+    ANOVA, Kruskal-Wallis y Welch por pares de `valor` entre los grupos de `por`
+
+    Args:
+        independencia (tuple): Par de columnas categóricas para la chi-cuadrado
+            de independencia (p. ej. ('TARIFA', 'ESTADO_CLIENTE')); None = no se calcula
+        independencia_por (str | list): Columna(s) dentro de cuyos grupos se
+            repite la chi-cuadrado (p. ej. 'DISTRITO'); None = una sola tabla
+
+    Returns:
+        dict: 'descriptivos', 'globales' (ANOVA y Kruskal-Wallis), 'pares' y,
+        si se pidió, 'independencia'
+    """
+    por = [por] if isinstance(por, str) else list(por)
+    datos = data[[valor] + por].dropna()
+    suf = EstadisticosSuficientes(datos[valor].to_numpy(), datos[por])
+    resultado = {
+        'descriptivos': suf.tabla(),
+        'globales': pd.DataFrame([anova_una_via(suf), kruskal_wallis(suf)]),
+        'pares': welch_por_pares(suf, correccion=correccion, min_n=min_n),
+    }
+    if independencia is not None:
+        filas, columnas = independencia
+        resultado['independencia'] = independencia_por_grupo(data, filas, columnas, independencia_por,
+                                                             correccion=correccion)
+    return resultado
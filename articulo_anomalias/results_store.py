@@ -0,0 +1,240 @@
+import json
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Columnas de cada corrida: {nombre en disco: (columna de resultados, dtype)}
+RUN_COLUMNS = {
+    'periodo': ('PERIODO', np.int32),
+    'score': ('ANOMALY_SCORE', np.float32),
+    'anomalia': ('IS_ANOMALY', np.bool_),
+    'consumo': ('CONSUMO', np.float32),
+}
+
+
+def _codigo_array(values):
+    """CODIGO como int64 si todos son numéricos; si no, como texto de ancho fijo"""
+    values = pd.Series(np.asarray(values)).astype(str)
+    numeric = pd.to_numeric(values, errors='coerce')
+    if numeric.notna().all() and (numeric % 1 == 0).all():
+        return numeric.to_numpy(dtype=np.int64)
+    return values.to_numpy(dtype=str)
+
+
+class ResultsStore:
+    """
+    Almacén persistente de resultados por corrida, en columnas memory-mapped
+
+    Cada corrida es una carpeta con un .npy por columna (CODIGO, PERIODO,
+    score, marca de anomalía y consumo) ordenados por CODIGO y PERIODO, más un
+    índice CSR por distrito (filas de cada distrito en `distrito_filas.npy`,
+    delimitadas por `distrito_offsets.npy`). Los arreglos se abren con
+    `mmap_mode='r'`, así que una consulta solo lee las páginas que toca:
+
+    - Un cliente: búsqueda binaria sobre CODIGO, O(log n) por corrida.
+    - Un rango de CODIGO: dos búsquedas binarias y un corte contiguo.
+    - Un distrito: un corte del índice CSR.
+
+    `indice.json` lista las corridas con sus metadatos (fecha, filas,
+    periodos, motor, contaminación).
+    """
+
+    def __init__(self, directory):
+        """
+        Parameters:
+        - directory: Carpeta del almacén (se crea al guardar la primera corrida)
+        """
+        self.directory = directory
+        self.manifest = {'runs': {}}
+        self._open_runs = {}
+        if os.path.exists(os.path.join(directory, 'indice.json')):
+            with open(os.path.join(directory, 'indice.json'), encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+    @property
+    def runs(self):
+        """Identificadores de las corridas, de la más antigua a la más reciente"""
+        return sorted(self.manifest['runs'])
+
+    def _save_manifest(self):
+        with open(os.path.join(self.directory, 'indice.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+    def add_run(self, data_with_results, run_id=None, metadata=None):
+        """
+        Guarda una corrida a partir de los resultados de analyze_anomalies_detailed
+
+        Parameters:
+        - data_with_results: DataFrame con CODIGO, PERIODO, DISTRITO, CONSUMO, ANOMALY_SCORE e IS_ANOMALY
+        - run_id: Identificador (timestamp por defecto); si ya existe se reemplaza
+        - metadata: Diccionario adicional para el índice (motor, contaminación, archivo...)
+
+        Returns:
+        - Identificador de la corrida
+        """
+        run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        run_dir = os.path.join(self.directory, run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        self._open_runs.pop(run_id, None)
+
+        codigo = _codigo_array(data_with_results['CODIGO'])
+        periodo = data_with_results['PERIODO'].to_numpy(dtype=np.int32)
+        order = np.lexsort((periodo, codigo))
+        np.save(os.path.join(run_dir, 'codigo.npy'), codigo[order])
+        for name, (col, dtype) in RUN_COLUMNS.items():
+            np.save(os.path.join(run_dir, f'{name}.npy'), data_with_results[col].to_numpy(dtype=dtype)[order])
+
+        # Índice CSR por distrito: filas (ya ordenadas por CODIGO) agrupadas por distrito
+        district_codes, district_names = pd.factorize(data_with_results['DISTRITO'].astype(str).to_numpy()[order],
+                                                      sort=True)
+        rows = np.argsort(district_codes, kind='stable')
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(district_codes, minlength=len(district_names)))])
+        np.save(os.path.join(run_dir, 'distrito_filas.npy'), rows.astype(np.int64))
+        np.save(os.path.join(run_dir, 'distrito_offsets.npy'), offsets.astype(np.int64))
+
+        self.manifest['runs'][run_id] = {
+            'creado': datetime.now().isoformat(timespec='seconds'),
+            'filas': int(len(order)),
+            'anomalias': int(data_with_results['IS_ANOMALY'].sum()),
+            'periodos': sorted(int(p) for p in np.unique(periodo)),
+            'distritos': [str(d) for d in district_names],
+            **(metadata or {}),
+        }
+        self._save_manifest()
+        return run_id
+
+    def remove_run(self, run_id):
+        """Elimina una corrida del almacén"""
+        self._open_runs.pop(run_id, None)
+        info = self.manifest['runs'].pop(run_id)
+        run_dir = os.path.join(self.directory, run_id)
+        for name in ['codigo', 'distrito_filas', 'distrito_offsets'] + list(RUN_COLUMNS):
+            path = os.path.join(run_dir, f'{name}.npy')
+            if os.path.exists(path):
+                os.remove(path)
+        if os.path.isdir(run_dir) and not os.listdir(run_dir):
+            os.rmdir(run_dir)
+        self._save_manifest()
+        return info
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+    def _run(self, run_id):
+        """Arreglos memory-mapped de una corrida (se abren una vez)"""
+        if run_id not in self._open_runs:
+            if run_id not in self.manifest['runs']:
+                raise KeyError(f"Corrida no encontrada: {run_id}")
+            run_dir = os.path.join(self.directory, run_id)
+            names = ['codigo', 'distrito_filas', 'distrito_offsets'] + list(RUN_COLUMNS)
+            self._open_runs[run_id] = {name: np.load(os.path.join(run_dir, f'{name}.npy'), mmap_mode='r')
+                                       for name in names}
+        return self._open_runs[run_id]
+
+    def _frame(self, run_id, rows):
+        """DataFrame con las filas pedidas de una corrida"""
+        arrays = self._run(run_id)
+        frame = {'CORRIDA': run_id, 'CODIGO': np.asarray(arrays['codigo'][rows])}
+        for name, (col, _) in RUN_COLUMNS.items():
+            frame[col] = np.asarray(arrays[name][rows])
+        return pd.DataFrame(frame)
+
+    def _combine(self, frames):
+        frames = [f for f in frames if len(f)]
+        if not frames:
+            return pd.DataFrame(columns=['CORRIDA', 'CODIGO'] + [col for col, _ in RUN_COLUMNS.values()])
+        return pd.concat(frames, ignore_index=True)
+
+    def _key(self, arrays, codigo):
+        """
+        Convierte el CODIGO consultado al tipo almacenado en la corrida
+
+        Devuelve None si el código no puede estar en una corrida con CODIGO
+        numérico (p. ej. 'ABC'): la consulta lo trata como no encontrado.
+        """
+        if arrays['codigo'].dtype.kind == 'U':
+            return str(codigo)
+        try:
+            return int(str(codigo).strip())
+        except ValueError:
+            pass
+        try:
+            value = float(codigo)
+        except (TypeError, ValueError):
+            return None
+        return int(value) if value.is_integer() else None
+
+    def _bound(self, arrays, codigo):
+        """Extremo de un rango de CODIGO en el tipo de la corrida (ValueError si no es comparable)"""
+        if arrays['codigo'].dtype.kind == 'U':
+            return str(codigo)
+        try:
+            return float(codigo)
+        except (TypeError, ValueError):
+            raise ValueError(f"Los CODIGO de las corridas son numéricos; el rango debe serlo también: {codigo!r}")
+
+    def lookup(self, codigo, runs=None):
+        """
+        Historial de un cliente en las corridas indicadas (todas por defecto)
+
+        Returns:
+        - DataFrame con CORRIDA, CODIGO, PERIODO, ANOMALY_SCORE, IS_ANOMALY y CONSUMO
+        """
+        frames = []
+        for run_id in runs or self.runs:
+            arrays = self._run(run_id)
+            key = self._key(arrays, codigo)
+            if key is None:
+                continue
+            start = np.searchsorted(arrays['codigo'], key, side='left')
+            end = np.searchsorted(arrays['codigo'], key, side='right')
+            frames.append(self._frame(run_id, slice(start, end)))
+        return self._combine(frames)
+
+    def lookup_many(self, codigos, runs=None):
+        """Historial de varios clientes (una búsqueda binaria vectorizada por corrida)"""
+        frames = []
+        for run_id in runs or self.runs:
+            arrays = self._run(run_id)
+            keys = [self._key(arrays, c) for c in codigos]
+            keys = np.unique(np.asarray([k for k in keys if k is not None], dtype=arrays['codigo'].dtype))
+            starts = np.searchsorted(arrays['codigo'], keys, side='left')
+            ends = np.searchsorted(arrays['codigo'], keys, side='right')
+            rows = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)] or [np.empty(0, dtype=np.int64)])
+            frames.append(self._frame(run_id, rows))
+        return self._combine(frames)
+
+    def range_query(self, codigo_min, codigo_max, runs=None, only_anomalies=False):
+        """Clientes con CODIGO en [codigo_min, codigo_max]"""
+        frames = []
+        for run_id in runs or self.runs:
+            arrays = self._run(run_id)
+            start = np.searchsorted(arrays['codigo'], self._bound(arrays, codigo_min), side='left')
+            end = np.searchsorted(arrays['codigo'], self._bound(arrays, codigo_max), side='right')
+            rows = np.arange(start, end)
+            if only_anomalies:
+                rows = rows[np.asarray(arrays['anomalia'][start:end])]
+            frames.append(self._frame(run_id, rows))
+        return self._combine(frames)
+
+    def district(self, distrito, runs=None, only_anomalies=False):
+        """Filas de un distrito en las corridas indicadas, ordenadas por CODIGO"""
+        frames = []
+        for run_id in runs or self.runs:
+            names = self.manifest['runs'][run_id]['distritos']
+            position = np.searchsorted(names, distrito)
+            if position == len(names) or names[position] != distrito:
+                continue
+            arrays = self._run(run_id)
+            offsets = arrays['distrito_offsets']
+            rows = np.asarray(arrays['distrito_filas'][offsets[position]:offsets[position + 1]])
+            if only_anomalies:
+                rows = rows[np.asarray(arrays['anomalia'][rows])]
+            frame = self._frame(run_id, rows)
+            frame.insert(2, 'DISTRITO', distrito)
+            frames.append(frame)
+        return self._combine(frames)
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+
+
+class ScoreIndex:
+    """
+    Scores de anomalía con índice ordenado para cambiar el umbral sin reajustar
+
+    El modelo no cambia al variar `contamination`: solo cambia el corte sobre
+    los scores. Con los scores ordenados una vez, marcar las anomalías para un
+    nuevo corte es una búsqueda binaria más O(k) para las k filas marcadas, y
+    el resumen por distrito se arma con `np.bincount`.
+
+    Igual que los motores, valores más bajos son más anómalos y una fila es
+    anomalía si su score es menor que el umbral.
+    """
+
+    def __init__(self, scores, districts=None, consumption=None):
+        """
+        Parameters:
+        - scores: Score de cada fila (ANOMALY_SCORE)
+        - districts: Distrito de cada fila (opcional, para el resumen por distrito)
+        - consumption: Consumo de cada fila (opcional, para el resumen por distrito)
+        """
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.order = np.argsort(self.scores, kind='stable')
+        self.sorted_scores = self.scores[self.order]
+
+        self.district_codes = None
+        self.district_names = None
+        if districts is not None:
+            codes, names = pd.factorize(np.asarray(districts))
+            self.district_codes = codes.astype(np.int64)
+            self.district_names = np.asarray(names, dtype=object)
+        self.consumption = None if consumption is None else np.asarray(consumption, dtype=np.float64)
+
+    @classmethod
+    def from_results(cls, data_with_results, score_col='ANOMALY_SCORE'):
+        """Crea el índice a partir de los resultados de analyze_anomalies_detailed"""
+        return cls(
+            data_with_results[score_col].to_numpy(),
+            data_with_results['DISTRITO'].to_numpy() if 'DISTRITO' in data_with_results else None,
+            data_with_results['CONSUMO'].to_numpy() if 'CONSUMO' in data_with_results else None,
+        )
+
+    def threshold(self, contamination):
+        """Umbral para una proporción de anomalías (mismo percentil que `offset_` de los motores)"""
+        position = contamination * (len(self.sorted_scores) - 1)
+        low = int(np.floor(position))
+        high = min(low + 1, len(self.sorted_scores) - 1)
+        fraction = position - low
+        return self.sorted_scores[low] + fraction * (self.sorted_scores[high] - self.sorted_scores[low])
+
+    def anomaly_rows(self, contamination=None, score_threshold=None):
+        """Posiciones de las filas anómalas, de la más anómala a la menos"""
+        if (contamination is None) == (score_threshold is None):
+            raise ValueError("Indica contamination o score_threshold (solo uno)")
+        if score_threshold is None:
+            score_threshold = self.threshold(contamination)
+        k = np.searchsorted(self.sorted_scores, score_threshold, side='left')
+        return self.order[:k]
+
+    def flags(self, contamination=None, score_threshold=None):
+        """Máscara booleana de anomalías para el nuevo corte"""
+        mask = np.zeros(len(self.scores), dtype=bool)
+        mask[self.anomaly_rows(contamination, score_threshold)] = True
+        return mask
+
+    def district_summary(self, contamination=None, score_threshold=None):
+        """
+        Resumen por distrito con las mismas columnas que analyze_anomalies_detailed
+
+        Returns:
+        - DataFrame ordenado por número de anomalías
+        """
+        if self.district_codes is None or self.consumption is None:
+            raise ValueError("El índice se creó sin distritos o sin consumo")
+
+        rows = self.anomaly_rows(contamination, score_threshold)
+        n = len(self.district_names)
+        codes = self.district_codes
+        anomaly_codes = codes[rows]
+
+        total = np.bincount(codes, minlength=n)
+        anomalies = np.bincount(anomaly_codes, minlength=n)
+        consumption_sum = np.bincount(codes, weights=self.consumption, minlength=n)
+        anomaly_consumption = np.bincount(anomaly_codes, weights=self.consumption[rows], minlength=n)
+        anomaly_score = np.bincount(anomaly_codes, weights=self.scores[rows], minlength=n)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            distrito_df = pd.DataFrame({
+                'distrito': self.district_names,
+                'total_clientes': total,
+                'anomalias': anomalies,
+                'tasa_anomalias': np.where(total > 0, anomalies / total * 100, 0),
+                'consumo_promedio': consumption_sum / total,
+                'consumo_anomalo_promedio': np.where(anomalies > 0, anomaly_consumption / anomalies, 0),
+                'score_promedio': np.where(anomalies > 0, anomaly_score / anomalies, 0),
+            })
+        return distrito_df.sort_values('anomalias', ascending=False)
+
+    def save(self, path):
+        """Guarda scores, índice ordenado y datos del resumen en un .npz"""
+        arrays = {'scores': self.scores, 'order': self.order}
+        if self.district_codes is not None:
+            arrays['district_codes'] = self.district_codes
+            arrays['district_names'] = self.district_names.astype(str)
+        if self.consumption is not None:
+            arrays['consumption'] = self.consumption
+        np.savez(path, **arrays)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            index = cls.__new__(cls)
+            index.scores = f['scores']
+            index.order = f['order']
+            index.sorted_scores = index.scores[index.order]
+            index.district_codes = f['district_codes'] if 'district_codes' in f else None
+            index.district_names = f['district_names'].astype(object) if 'district_names' in f else None
+            index.consumption = f['consumption'] if 'consumption' in f else None
+        return index
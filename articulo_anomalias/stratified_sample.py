@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+STRATA_COLUMNS = ['DISTRITO', 'TARIFA']
+
+
+class StratifiedSample:
+    """
+    Índice de muestra estratificada (DISTRITO x TARIFA) compartido entre etapas
+
+    Se calcula una sola vez un orden de las filas tal que cualquier prefijo de
+    tamaño n es una muestra estratificada de tamaño n (muestras anidadas):
+
+    1. Primero entran hasta `min_per_stratum` filas de cada estrato, por
+       rondas, para que los distritos pequeños no queden fuera.
+    2. Después, cada fila restante de un estrato con N_s filas se ordena por
+       (rango + u) / N_s, con rango aleatorio dentro del estrato; así los
+       estratos se intercalan en proporción a su tamaño.
+
+    Las etapas piden el tamaño que necesitan (`indices(n)`) o copian una vez
+    el prefijo más grande con `take` y cortan prefijos más pequeños sin copiar.
+    `weights(n)` da el peso N_s / n_s de cada fila del prefijo para estimar
+    totales o histogramas de la población.
+    """
+
+    def __init__(self, strata, min_per_stratum=5, random_state=42):
+        """
+        Parameters:
+        - strata: DataFrame con las columnas de estrato (o una sola columna)
+        - min_per_stratum: Filas de cada estrato que van al inicio del orden
+        - random_state: Semilla para reproducibilidad
+        """
+        if isinstance(strata, pd.DataFrame):
+            columns = [strata[c].astype(str).to_numpy() for c in strata.columns]
+            codes = np.zeros(len(strata), dtype=np.int64)
+            for column in columns:
+                column_codes, values = pd.factorize(column)
+                codes = codes * len(values) + column_codes
+        else:
+            codes = pd.factorize(np.asarray(strata))[0].astype(np.int64)
+        _, self.codes = np.unique(codes, return_inverse=True)
+        self.stratum_sizes = np.bincount(self.codes)
+        self.min_per_stratum = min_per_stratum
+
+        rng = np.random.default_rng(random_state)
+        noise = rng.random(len(self.codes))
+        # Rango aleatorio de cada fila dentro de su estrato
+        by_stratum = np.lexsort((noise, self.codes))
+        starts = np.concatenate([[0], np.cumsum(self.stratum_sizes)[:-1]])
+        rank = np.empty(len(self.codes), dtype=np.int64)
+        rank[by_stratum] = np.arange(len(self.codes)) - starts[self.codes[by_stratum]]
+
+        size = self.stratum_sizes[self.codes]
+        priority = np.where(rank < min_per_stratum,
+                            rank - min_per_stratum + 0.5 * noise,   # rondas iniciales (negativas)
+                            (rank + noise) / size)                  # intercalado proporcional
+        self.order = np.argsort(priority, kind='stable')
+
+    def __len__(self):
+        return len(self.order)
+
+    def indices(self, n):
+        """Posiciones de las filas de la muestra de tamaño n (vista del orden, sin copiar)"""
+        return self.order[:min(n, len(self.order))]
+
+    def weights(self, n):
+        """Peso de cada fila de la muestra de tamaño n: tamaño del estrato / filas del estrato en la muestra"""
+        codes = self.codes[self.indices(n)]
+        in_sample = np.bincount(codes, minlength=len(self.stratum_sizes))
+        return self.stratum_sizes[codes] / in_sample[codes]
+
+    def take(self, values, n):
+        """
+        Copia las filas de la muestra de tamaño n (en el orden de la muestra)
+
+        Como las muestras están anidadas, `take(values, n)[:m]` es la muestra
+        de tamaño m <= n sin otra copia.
+        """
+        rows = self.indices(n)
+        if isinstance(values, (pd.DataFrame, pd.Series)):
+            return values.iloc[rows]
+        return np.asarray(values)[rows]
+
+    def coverage(self, n):
+        """Proporción de estratos presentes en la muestra de tamaño n"""
+        return len(np.unique(self.codes[self.indices(n)])) / len(self.stratum_sizes)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans, kmeans_plusplus
+
+
+class StreamingKMeans:
+    """
+    K-Means por mini-lotes sobre todas las filas
+
+    Recorre los datos en chunks de un orden aleatorio (para que el primer
+    chunk no dependa del orden del archivo) y actualiza los centroides con
+    `MiniBatchKMeans.partial_fit`. El costo es lineal en el número de filas.
+    """
+
+    def __init__(self, n_clusters=3, chunk_size=50000, n_epochs=2, random_state=42, init=None):
+        """
+        Parameters:
+        - n_clusters: Número de clusters
+        - chunk_size: Filas por mini-lote
+        - n_epochs: Pasadas completas sobre los datos
+        - random_state: Semilla para reproducibilidad
+        - init: Centroides iniciales opcionales (n_clusters x d)
+        """
+        self.n_clusters = n_clusters
+        self.chunk_size = chunk_size
+        self.n_epochs = n_epochs
+        self.random_state = random_state
+        self.model = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            random_state=random_state,
+            batch_size=min(chunk_size, 4096),
+            init='k-means++' if init is None else np.asarray(init),
+            n_init=1
+        )
+        self.labels_ = None
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        rng = np.random.default_rng(self.random_state)
+
+        for _ in range(self.n_epochs):
+            order = rng.permutation(len(X))
+            for start in range(0, len(X), self.chunk_size):
+                chunk = X[order[start:start + self.chunk_size]]
+                if len(chunk) >= self.n_clusters:
+                    self.model.partial_fit(chunk)
+
+        self.labels_ = self.predict(X)
+        return self
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        labels = np.empty(len(X), dtype=np.int64)
+        for start in range(0, len(X), self.chunk_size):
+            labels[start:start + self.chunk_size] = self.model.predict(X[start:start + self.chunk_size])
+        return labels
+
+    @property
+    def cluster_centers_(self):
+        return self.model.cluster_centers_
+
+
+def cluster_names(n_clusters):
+    """Nombres de los clusters ordenados de menor a mayor consumo"""
+    if n_clusters == 3:
+        return ['bajo', 'medio', 'alto']
+    return [f'nivel_{i + 1}' for i in range(n_clusters)]
+
+
+def cluster_consumption(data, columns, n_clusters=3, chunk_size=50000, random_state=42,
+                        group_col='DISTRITO', init=None, init_rows=None):
+    """
+    Agrupa todas las filas por consumo y resume los clusters
+    (la primera columna de `columns` define el orden bajo → alto)
+
+    Si no se dan centroides iniciales y sí `init_rows` (p. ej. la muestra
+    estratificada), se inicializa con k-means++ sobre esas filas.
+
+    Returns:
+    - labels: Nombre del cluster de cada fila (ordenados por consumo medio)
+    - cluster_means: {nombre: consumo medio del cluster}
+    - group_mix: Proporción de cada cluster por `group_col` (filas = grupos)
+    """
+    X = data[columns].fillna(0).to_numpy(dtype=np.float64)
+    if init is None and init_rows is not None:
+        init, _ = kmeans_plusplus(X[init_rows], n_clusters, random_state=random_state)
+    model = StreamingKMeans(n_clusters=n_clusters, chunk_size=chunk_size,
+                            random_state=random_state, init=init).fit(X)
+
+    # Reordenar etiquetas de menor a mayor consumo medio
+    counts = np.bincount(model.labels_, minlength=n_clusters)
+    sums = np.bincount(model.labels_, weights=X[:, 0], minlength=n_clusters)
+    means = sums / np.maximum(counts, 1)
+    rank = np.empty(n_clusters, dtype=np.int64)
+    rank[np.argsort(means)] = np.arange(n_clusters)
+
+    names = np.array(cluster_names(n_clusters))
+    labels = names[rank[model.labels_]]
+    cluster_means = {names[rank[i]]: means[i] for i in np.argsort(means)}
+
+    group_mix = pd.crosstab(data[group_col].to_numpy(), labels, normalize='index')
+    group_mix = group_mix.reindex(columns=list(names), fill_value=0.0)
+    group_mix.index.name = group_col
+
+    return labels, cluster_means, group_mix
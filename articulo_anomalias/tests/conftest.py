@@ -0,0 +1,59 @@
+import contextlib
+import io
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+DIRECTORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO)
+
+
+def reporte_sintetico(n=3000, periodos=(202401, 202402), semilla=0):
+    """Reporte con las columnas de Electro Puno: muchos consumos en cero (empates) y un distrito de una fila"""
+    rng = np.random.default_rng(semilla)
+    distritos = {'JULIACA': 'SAN ROMAN', 'CARACOTO': 'SAN ROMAN', 'CABANA': 'SAN ROMAN',
+                 'PUNO': 'PUNO', 'ACORA': 'PUNO', 'AYAVIRI': 'MELGAR'}
+    nombres = list(distritos)
+    distrito = rng.choice(nombres, size=n, p=[0.4, 0.2, 0.1, 0.15, 0.1, 0.05])
+    distrito[-1] = 'PUSI'
+    provincia = np.array([distritos.get(d, 'AZANGARO') for d in distrito])
+    consumo = np.round(rng.lognormal(3.5, 1.0, n), 0)
+    consumo[rng.random(n) < 0.15] = 0
+    return pd.DataFrame({
+        'CODIGO': np.arange(1, n + 1),
+        'UBIGEO': 211101 + rng.integers(0, 5, n),
+        'DEPARTAMENTO': 'PUNO',
+        'PROVINCIA': provincia,
+        'DISTRITO': distrito,
+        'FECHA_ALTA': [f'{d:02d}/{m:02d}/{a}' for d, m, a in zip(rng.integers(1, 29, n), rng.integers(1, 13, n),
+                                                                 rng.integers(1990, 2023, n))],
+        'TARIFA': rng.choice(['BT5B', 'BT5C', 'BT6', 'MT3'], size=n, p=[0.7, 0.15, 0.1, 0.05]),
+        'PERIODO': rng.choice(periodos, size=n),
+        'CONSUMO': consumo,
+        'FACTURACIÓN': np.round(consumo * rng.uniform(0.8, 1.2, n) + 4.5, 4),
+        'ESTADO_CLIENTE': rng.choice(['NORMAL', 'CORTADO', 'SUSPENDIDO'], size=n, p=[0.9, 0.07, 0.03]),
+        'FECHA_CORTE': '13/02/2024',
+    })
+
+
+@pytest.fixture
+def reporte_csv(tmp_path):
+    ruta = tmp_path / 'reporte.csv'
+    reporte_sintetico().to_csv(ruta, index=False)
+    return str(ruta)
+
+
+@pytest.fixture(scope='session')
+def codigo_fuente():
+    """Módulo del detector avanzado (archivo sin extensión .py)"""
+    from electro_cli import RUTA_CODIGO_FUENTE, _cargar_modulo
+    return _cargar_modulo('codigo_fuente', RUTA_CODIGO_FUENTE)
+
+
+@contextlib.contextmanager
+def silencio():
+    """Oculta los mensajes de progreso del detector"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
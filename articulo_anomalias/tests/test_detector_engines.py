@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from detector_engines import ENGINES, DetectorEngine, RobustZEngine, create_engine
+
+
+def test_robust_z_ignora_residuos_de_redondeo():
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.normal(size=2000), np.full(2000, 5.0)])
+    X[:20, 1] += 1e-9  # columna casi constante: MAD, IQR y desviación prácticamente nulas
+    X[-1, 0] = 8.0
+
+    engine = RobustZEngine(contamination=0.01).fit(X)
+    assert (engine.scale_ >= 1e-6).all()
+    scores = engine.score_samples(X)
+    assert np.argmin(scores) == len(X) - 1
+    assert np.abs(scores[:20]).max() < 3
+
+
+def test_motor_incompleto_falla_al_crearlo():
+    class SinPuntuacion(DetectorEngine):
+        def _fit_sample(self, X):
+            pass
+
+    with pytest.raises(TypeError):
+        SinPuntuacion()
+    for nombre in ENGINES:
+        assert create_engine(nombre).name
@@ -0,0 +1,79 @@
+import os
+import numpy as np
+from conftest import reporte_sintetico, silencio
+from drift_monitor import GLOBAL_SEGMENT, DriftMonitor
+
+
+def _detectar(codigo_fuente, tmp_path, data, directorio):
+    ruta = tmp_path / f"mes_{data['PERIODO'].iloc[0]}.csv"
+    data.to_csv(ruta, index=False)
+    with silencio():
+        detector = codigo_fuente.ElectroPunoAnomalyDetectorAdvanced(drift_monitor=str(directorio))
+        cargado = detector.is_fitted
+        enriquecido = detector.load_and_preprocess_data(str(ruta))
+        predictions, scores = detector.detect_anomalies(enriquecido)
+    return detector, cargado, predictions
+
+
+def test_mitades_aleatorias_no_derivan():
+    data = reporte_sintetico(20000, semilla=4)
+    mitad = np.random.default_rng(0).random(len(data)) < 0.5
+    monitor = DriftMonitor()
+    with silencio():
+        monitor.set_reference(data[mitad])
+    resultado = monitor.check(data[~mitad])
+    assert resultado['drifted_segments'] == []
+    assert not resultado['refit']
+
+
+def test_check_no_modifica_la_referencia():
+    monitor = DriftMonitor()
+    with silencio():
+        monitor.set_reference(reporte_sintetico(5000, semilla=1))
+    segmentos, conteos = list(monitor.segments), monitor.counts.copy()
+    nuevo = reporte_sintetico(5000, semilla=2)
+    nuevo.loc[:500, 'DISTRITO'] = 'NUEVO'
+    resultado = monitor.check(nuevo)
+    assert (resultado['report']['valor'] == 'NUEVO').any()
+    assert monitor.segments == segmentos
+    np.testing.assert_array_equal(monitor.counts, conteos)
+
+
+def test_segmentos_excluidos_no_entran_en_el_global():
+    monitor = DriftMonitor()
+    with silencio():
+        monitor.set_reference(reporte_sintetico(5000, semilla=1))
+    global_antes = monitor.counts[monitor.segments.index(GLOBAL_SEGMENT)].sum(axis=1)
+    juliaca_antes = monitor.counts[monitor.segments.index('DISTRITO=JULIACA')].copy()
+
+    nuevo = reporte_sintetico(5000, semilla=2)
+    monitor.update_reference(nuevo, exclude=['DISTRITO=JULIACA'])
+    estables = int((nuevo['DISTRITO'] != 'JULIACA').sum())
+    global_despues = monitor.counts[monitor.segments.index(GLOBAL_SEGMENT)].sum(axis=1)
+    np.testing.assert_array_equal(global_despues - global_antes, estables)
+    np.testing.assert_array_equal(monitor.counts[monitor.segments.index('DISTRITO=JULIACA')], juliaca_antes)
+
+
+def test_deriva_decide_reajuste_entre_corridas(codigo_fuente, tmp_path):
+    directorio = tmp_path / 'deriva'
+
+    detector, cargado, _ = _detectar(codigo_fuente, tmp_path, reporte_sintetico(8000, (202401,), 1), directorio)
+    assert not cargado
+    modelo = directorio / codigo_fuente.DRIFT_MODEL_FILE
+    assert modelo.exists()
+    ajuste = os.path.getmtime(modelo)
+
+    # Mes estable: se recupera el modelo guardado y se puntúa sin reajustar
+    detector, cargado, predictions = _detectar(codigo_fuente, tmp_path, reporte_sintetico(8000, (202402,), 2),
+                                               directorio)
+    assert cargado
+    assert not detector.drift_result['refit']
+    assert len(predictions) > 0
+    assert os.path.getmtime(modelo) == ajuste
+
+    # Mes con consumos triplicados: deriva y se reajusta
+    movido = reporte_sintetico(8000, (202403,), 3)
+    movido['CONSUMO'] *= 3
+    detector, cargado, _ = _detectar(codigo_fuente, tmp_path, movido, directorio)
+    assert cargado
+    assert detector.drift_result['refit']
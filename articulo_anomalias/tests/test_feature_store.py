@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from conftest import reporte_sintetico, silencio
+from feature_store import IncrementalFeatureStore
+
+COLUMNAS = ['COUNT_DISTRITO', 'MEAN_DISTRITO', 'STD_DISTRITO', 'MEDIAN_DISTRITO', 'MIN_DISTRITO',
+            'MAX_DISTRITO', 'Q25_DISTRITO', 'Q75_DISTRITO', 'COUNT_PROVINCIA', 'MEAN_PROVINCIA',
+            'STD_PROVINCIA', 'MEAN_TARIFA', 'STD_TARIFA', 'MEDIAN_TARIFA', 'PERCENTILE_DISTRITO',
+            'PERCENTILE_GLOBAL', 'Z_SCORE_DISTRITO', 'Z_SCORE_TARIFA']
+
+
+def _enriquecer(codigo_fuente, data, feature_store=None):
+    with silencio():
+        detector = codigo_fuente.ElectroPunoAnomalyDetectorAdvanced(feature_store=feature_store)
+        return detector.clean_and_enhance_data(data.copy()).sort_values('CODIGO', ignore_index=True)
+
+
+@pytest.mark.parametrize('entrega', ['mes_ampliado', 'por_partes'])
+def test_almacen_igual_al_calculo_completo(codigo_fuente, tmp_path, entrega):
+    data = reporte_sintetico(6000, semilla=5)
+    mes_2 = data['PERIODO'] == 202402
+    primera_parte = ~mes_2 | (np.random.default_rng(5).random(len(data)) < 0.6)
+
+    directorio = str(tmp_path / 'almacen')
+    _enriquecer(codigo_fuente, data[primera_parte], IncrementalFeatureStore(directorio))
+    # El reporte del mes 202402 vuelve completo o solo con las filas que faltaban
+    segunda = data if entrega == 'mes_ampliado' else data[~primera_parte]
+    with silencio():
+        store = IncrementalFeatureStore(directorio)
+        assert store.update(segunda) == [202402]
+
+    esperado = _enriquecer(codigo_fuente, data)
+    store = IncrementalFeatureStore(directorio)
+    resultado = _enriquecer(codigo_fuente, data, store)
+    assert store.periods == [202401, 202402]
+    for col in COLUMNAS:
+        np.testing.assert_allclose(resultado[col], esperado[col], rtol=1e-6, err_msg=col)
+
+
+def test_periodo_repetido_no_se_duplica():
+    data = reporte_sintetico(2000, semilla=6)
+    store = IncrementalFeatureStore()
+    with silencio():
+        store.update(data)
+        assert store.update(data) == []
+        assert store.update(data.iloc[:500]) == []
+    assert store.global_stats()['count'] == len(data)
+
+
+def test_solo_se_enriquece_el_periodo_nuevo(codigo_fuente):
+    data = reporte_sintetico(6000, semilla=8)
+    store = IncrementalFeatureStore()
+    _enriquecer(codigo_fuente, data[data['PERIODO'] == 202401], store)
+
+    resultado = _enriquecer(codigo_fuente, data, store)
+    assert (resultado['PERIODO'] == 202402).all()
+    esperado = _enriquecer(codigo_fuente, data)
+    esperado = esperado[esperado['PERIODO'] == 202402].reset_index(drop=True)
+    assert len(resultado) == len(esperado)
+    for col in COLUMNAS:
+        np.testing.assert_allclose(resultado[col], esperado[col], rtol=1e-6, err_msg=col)
@@ -0,0 +1,31 @@
+import threading
+import pandas as pd
+import pytest
+from micro_batch import MicroBatchScorer
+
+
+def test_peticion_invalida_no_afecta_a_su_lote():
+    lotes = []
+    listo = threading.Event()
+
+    def puntuar(records):
+        lotes.append(len(records))
+        listo.wait(5)  # retiene el primer lote hasta que estén todas las peticiones en cola
+        return pd.DataFrame({'ANOMALY_SCORE': pd.to_numeric(records['CONSUMO']) * 2.0})
+
+    scorer = MicroBatchScorer(puntuar, max_wait_ms=500)
+    buenas = [scorer.submit(pd.DataFrame({'CONSUMO': [i, i + 1]})) for i in range(3)]
+    mala = scorer.submit(pd.DataFrame({'CONSUMO': ['abc']}))
+    otra = scorer.submit(pd.DataFrame({'CONSUMO': [10]}))
+    listo.set()
+
+    for i, future in enumerate(buenas):
+        assert future.result(5)['ANOMALY_SCORE'].tolist() == [2.0 * i, 2.0 * (i + 1)]
+    assert otra.result(5)['ANOMALY_SCORE'].tolist() == [20.0]
+    with pytest.raises(ValueError):
+        mala.result(5)
+
+    assert lotes[0] == 8  # las cinco peticiones compartieron el lote
+    metricas = scorer.metrics()
+    assert metricas['errores'] == 1
+    assert metricas['peticiones'] == 4
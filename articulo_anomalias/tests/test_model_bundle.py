@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import silencio
+from feature_store import IncrementalFeatureStore
+from model_bundle import ModelBundle, average_rank_percentile
+
+
+def test_percentil_igual_a_rank_promedio():
+    rng = np.random.default_rng(1)
+    valores = rng.integers(0, 20, 500).astype(np.float32)
+    valores[:100] = 0
+    percentil = average_rank_percentile(np.sort(valores), valores)
+    np.testing.assert_allclose(percentil, pd.Series(valores).rank(pct=True).to_numpy())
+
+
+@pytest.mark.parametrize('con_feature_store', [False, True])
+def test_bundle_reproduce_las_marcas_del_detector(codigo_fuente, reporte_csv, tmp_path, con_feature_store):
+    with silencio():
+        detector = codigo_fuente.ElectroPunoAnomalyDetectorAdvanced(
+            feature_store=IncrementalFeatureStore() if con_feature_store else None)
+        data = detector.load_and_preprocess_data(reporte_csv)
+        predictions, scores = detector.fit_predict_anomalies(data)
+        ruta = detector.save_model_bundle(data, str(tmp_path / 'modelo.joblib'))
+    bundle = ModelBundle.load(ruta)
+
+    resultado = bundle.score(data)
+    np.testing.assert_array_equal(resultado['IS_ANOMALY'].to_numpy(), predictions == -1)
+    np.testing.assert_allclose(resultado['ANOMALY_SCORE'].to_numpy(), scores)
+    np.testing.assert_allclose(bundle.features(data)['PERCENTILE_DISTRITO'], data['PERCENTILE_DISTRITO'])
+
+
+def test_bundle_acepta_registros_sueltos_y_distritos_nuevos(codigo_fuente, reporte_csv, tmp_path):
+    with silencio():
+        detector = codigo_fuente.ElectroPunoAnomalyDetectorAdvanced()
+        data = detector.load_and_preprocess_data(reporte_csv)
+        detector.fit_predict_anomalies(data)
+    bundle = ModelBundle.from_detector(detector, data)
+
+    resultado = bundle.score([{'CONSUMO': 40, 'DISTRITO': 'JULIACA', 'PERIODO': 202402, 'TARIFA': 'BT5B'},
+                              {'CONSUMO': 9000, 'DISTRITO': 'NUEVO', 'PERIODO': 202402}])
+    assert len(resultado) == 2
+    assert np.isfinite(resultado['ANOMALY_SCORE']).all()
+    assert np.isfinite(resultado['Z_SCORE_DISTRITO'].iloc[0])
+    assert np.isnan(resultado['Z_SCORE_DISTRITO'].iloc[1])
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import reporte_sintetico
+from parallel_ingest import read_csv_parallel
+
+DTYPE_ELECTRO = {
+    'CODIGO': 'category', 'UBIGEO': 'str', 'DEPARTAMENTO': 'category', 'PROVINCIA': 'category',
+    'DISTRITO': 'category', 'FECHA_ALTA': 'str', 'TARIFA': 'category', 'PERIODO': 'int32',
+    'CONSUMO': 'float32', 'FACTURACIÓN': 'float32', 'ESTADO_CLIENTE': 'category', 'FECHA_CORTE': 'str',
+}
+
+
+@pytest.fixture(scope='module')
+def reporte_con_faltantes(tmp_path_factory):
+    data = reporte_sintetico(5000, semilla=7)
+    rng = np.random.default_rng(7)
+    data.loc[rng.random(len(data)) < 0.05, 'CONSUMO'] = np.nan
+    data.loc[rng.random(len(data)) < 0.05, 'ESTADO_CLIENTE'] = np.nan
+    data.loc[rng.random(len(data)) < 0.05, 'FECHA_ALTA'] = np.nan
+    data['ACTIVO'] = rng.random(len(data)) < 0.5
+    ruta = tmp_path_factory.mktemp('ingesta') / 'reporte.csv'
+    data.to_csv(ruta, index=False)
+    return str(ruta)
+
+
+@pytest.mark.parametrize('dtype', [
+    DTYPE_ELECTRO,
+    {'CONSUMO': 'float32', 'FACTURACIÓN': 'float32'},
+    None,
+], ids=['completo', 'parcial', 'sin_mapa'])
+def test_lectura_paralela_igual_a_read_csv(reporte_con_faltantes, dtype):
+    esperado = pd.read_csv(reporte_con_faltantes, dtype=dtype, low_memory=False)
+    resultado = read_csv_parallel(reporte_con_faltantes, dtype=dtype, n_workers=3)
+    pd.testing.assert_frame_equal(resultado, esperado)
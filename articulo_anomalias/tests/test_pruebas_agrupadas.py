@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from conftest import reporte_sintetico, silencio
+from pruebas_agrupadas import (EstadisticosSuficientes, anova_una_via, chi_cuadrado_por_grupo, comparar_grupos,
+                               kruskal_wallis, welch_por_pares)
+
+
+@pytest.fixture(scope='module')
+def reporte():
+    data = reporte_sintetico(4000, semilla=3)
+    return data[data['DISTRITO'] != 'PUSI']
+
+
+def _muestras(data):
+    return {nombre: grupo['CONSUMO'].to_numpy() for nombre, grupo in data.groupby('DISTRITO')}
+
+
+def test_anova_y_kruskal_iguales_a_scipy(reporte):
+    suf = EstadisticosSuficientes(reporte['CONSUMO'], reporte['DISTRITO'])
+    muestras = list(_muestras(reporte).values())
+
+    anova = anova_una_via(suf)
+    esperado = stats.f_oneway(*muestras)
+    np.testing.assert_allclose([anova['estadistico'], anova['p_valor']], [esperado.statistic, esperado.pvalue],
+                               rtol=1e-9)
+
+    kruskal = kruskal_wallis(suf)
+    esperado = stats.kruskal(*muestras)
+    np.testing.assert_allclose([kruskal['estadistico'], kruskal['p_valor']], [esperado.statistic, esperado.pvalue],
+                               rtol=1e-9)
+
+
+def test_welch_por_pares_igual_a_scipy(reporte):
+    muestras = _muestras(reporte)
+    pares = welch_por_pares(EstadisticosSuficientes(reporte['CONSUMO'], reporte['DISTRITO']))
+    assert len(pares) == len(muestras) * (len(muestras) - 1) // 2
+    for _, par in pares.iterrows():
+        esperado = stats.ttest_ind(muestras[par['grupo_1']], muestras[par['grupo_2']], equal_var=False)
+        np.testing.assert_allclose([par['t'], par['p_valor']], [esperado.statistic, esperado.pvalue], rtol=1e-9)
+
+
+def test_chi_cuadrado_por_grupo_igual_a_scipy(reporte):
+    tabla = chi_cuadrado_por_grupo(reporte['TARIFA'], reporte['ESTADO_CLIENTE'], reporte['DISTRITO'])
+    for _, fila in tabla.iterrows():
+        grupo = reporte[reporte['DISTRITO'] == fila['grupo']]
+        esperado = stats.chi2_contingency(pd.crosstab(grupo['TARIFA'], grupo['ESTADO_CLIENTE']), correction=False)
+        assert fila['gl'] == esperado.dof
+        np.testing.assert_allclose([fila['chi_cuadrado'], fila['p_valor']], [esperado.statistic, esperado.pvalue],
+                                   rtol=1e-9)
+
+
+def test_comparar_grupos_incluye_independencia(reporte):
+    resultado = comparar_grupos(reporte, 'CONSUMO', 'DISTRITO', independencia=('TARIFA', 'ESTADO_CLIENTE'),
+                                independencia_por='DISTRITO')
+    esperado = chi_cuadrado_por_grupo(reporte['TARIFA'], reporte['ESTADO_CLIENTE'], reporte['DISTRITO'])
+    pd.testing.assert_frame_equal(resultado['independencia'], esperado)
+    assert 'independencia' not in comparar_grupos(reporte, 'CONSUMO', 'DISTRITO')
+
+
+def test_estadisticas_dataset_compara_con_independencia(reporte_csv):
+    from estaditicosbasic import EstadisticasDataset
+    calc = EstadisticasDataset(reporte_csv)
+    with silencio():
+        calc.cargar_datos()
+        resultados = calc.comparar_grupos(por='DISTRITO', independencia=('TARIFA', 'ESTADO_CLIENTE'),
+                                          independencia_por='DISTRITO')
+    assert {'consumo', 'facturacion', 'independencia'} <= set(resultados)
+    assert len(resultados['independencia']) == calc.df['DISTRITO'].nunique()
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+from conftest import silencio
+from electro_cli import main
+from results_store import ResultsStore
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    resultados = pd.DataFrame({
+        'CODIGO': [101, 102, 103, 101],
+        'PERIODO': [202401, 202401, 202401, 202402],
+        'DISTRITO': ['PUNO', 'JULIACA', 'PUNO', 'PUNO'],
+        'CONSUMO': [10.0, 20.0, 30.0, 12.0],
+        'ANOMALY_SCORE': [0.1, -0.2, 0.3, 0.1],
+        'IS_ANOMALY': [False, True, False, False],
+    })
+    store = ResultsStore(str(tmp_path / 'almacen'))
+    store.add_run(resultados, run_id='corrida')
+    return store
+
+
+def test_codigo_no_numerico_se_trata_como_no_encontrado(almacen):
+    assert almacen.lookup('ABC').empty
+    resultado = almacen.lookup_many(['ABC', '101', 102.0])
+    assert resultado['CODIGO'].tolist() == [101, 101, 102]
+    with pytest.raises(ValueError):
+        almacen.range_query('A', 'Z')
+
+
+def test_cli_historial_no_falla_con_codigos_invalidos(almacen):
+    with silencio():
+        assert main(['historial', almacen.directory, '--codigo', 'ABC']) == 0
+        assert main(['historial', almacen.directory, '--rango', 'A', 'Z']) == 1
+        assert main(['historial', almacen.directory, '--codigo', '101']) == 0
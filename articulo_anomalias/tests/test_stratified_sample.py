@@ -0,0 +1,16 @@
+from conftest import reporte_sintetico, silencio
+
+
+def test_muestra_se_recalcula_con_otro_mes_del_mismo_tamano(codigo_fuente):
+    with silencio():
+        detector = codigo_fuente.ElectroPunoAnomalyDetectorAdvanced()
+    enero = reporte_sintetico(3000, (202401,), semilla=1)
+    febrero = reporte_sintetico(3000, (202402,), semilla=2)
+
+    muestra = detector.get_sample(enero)
+    assert detector.get_sample(enero) is muestra
+    assert detector.get_sample(enero.copy()) is muestra  # mismas filas en otro DataFrame
+
+    otra = detector.get_sample(febrero)
+    assert otra is not muestra
+    assert detector.get_sample(febrero.iloc[::-1].reset_index(drop=True)) is not otra
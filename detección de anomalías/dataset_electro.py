@@ -1,34 +1,53 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
-import optuna
-from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.cluster import KMeans
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+# Módulos compartidos con el detector avanzado (carpeta articulo_anomalias)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'articulo_anomalias'))
+from detector_engines import create_engine
+from anomaly_explanations import AnomalyExplainer
+from score_index import ScoreIndex
+from parallel_ingest import read_csv_parallel
+from archive_sources import is_archive_source, read_csv_sources
+from stratified_sample import STRATA_COLUMNS, StratifiedSample
+
+DTYPE_CONSUMO = {'CONSUMO': 'float32', 'FACTURACIÓN': 'float32'}
+
 class FastAnomalyDetector:
-    def __init__(self, csv_file='reporte.csv'):
+    def __init__(self, csv_file='reporte.csv', engine='isolation_forest', n_workers=1):
    
         self.data = None
         self.model = None
+        self.explainer = None
+        self.score_index = None
+        self.engine = engine  # 'isolation_forest', 'hbos' o 'robust_z'
         self.scaler = StandardScaler()
         self.label_encoder = LabelEncoder()
         self.best_params = None
         self.patterns_found = {}
+        self.sample = None      # muestra estratificada DISTRITO x TARIFA compartida por las etapas
+        self._sample_X = None   # características escaladas de la muestra (se copian una vez)
         
         print("🔍 Iniciando sistema de detección de anomalías...")
-        self.load_and_preprocess_data(csv_file)
+        self.load_and_preprocess_data(csv_file, n_workers)
         
-    def load_and_preprocess_data(self, csv_file):
+    def load_and_preprocess_data(self, csv_file, n_workers=1):
     
         try:
             print("📂 Cargando dataset...")
-            # Cargar con optimizaciones para datasets grandes
-            self.data = pd.read_csv(csv_file, dtype={'CONSUMO': 'float32', 'FACTURACIÓN': 'float32'})
+            # Cargar con optimizaciones para datasets grandes (n_workers > 1: lectura por rangos de bytes;
+            # .zip/.gz o patrón glob de meses: flujo sin extraer, con PERIODO_FUENTE)
+            if is_archive_source(csv_file):
+                self.data = read_csv_sources(csv_file, dtype=DTYPE_CONSUMO)
+            elif n_workers != 1:
+                self.data = read_csv_parallel(csv_file, dtype=DTYPE_CONSUMO, n_workers=n_workers)
+            else:
+                self.data = pd.read_csv(csv_file, dtype=DTYPE_CONSUMO)
             print(f"✅ Datos cargados: {self.data.shape[0]:,} registros")
             
             # Preprocesamiento rápido
@@ -50,13 +69,14 @@ class FastAnomalyDetector:
             
             # Eliminar outliers extremos (valores imposibles)
             self.data = self.data[(self.data['CONSUMO'] >= 0) & (self.data['FACTURACIÓN'] >= 0)]
+            self.sample = StratifiedSample(self.data[STRATA_COLUMNS], random_state=42)
             
             print("🔧 Preprocesamiento completado")
             
         except Exception as e:
             print(f"❌ Error al cargar datos: {e}")
             
-    def detect_patterns_fast(self):
+    def detect_patterns_fast(self, n_clusters=3, chunk_size=50000):
         """Detección rápida de patrones en el dataset"""
         print("🧠 Analizando patrones en el dataset...")
         
@@ -77,40 +97,45 @@ class FastAnomalyDetector:
         patterns['distrito_mayor_consumo'] = district_stats['mean'].idxmax()
         patterns['distrito_menor_consumo'] = district_stats['mean'].idxmin()
         
-        # Patrón 4: Detección de clustering rápido
-        sample_data = self.data.sample(n=min(5000, len(self.data)), random_state=42)
-        kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-        sample_features = sample_data[['CONSUMO', 'FACTURACIÓN']].fillna(0)
-        clusters = kmeans.fit_predict(sample_features)
-        
-        cluster_means = []
-        for i in range(3):
-            cluster_data = sample_data[clusters == i]
-            cluster_means.append(cluster_data['CONSUMO'].mean())
+        # Patrón 4: Clustering por mini-lotes sobre todas las filas
+        from streaming_clustering import cluster_consumption
+        labels, cluster_means, district_mix = cluster_consumption(
+            self.data, ['CONSUMO', 'FACTURACIÓN'], n_clusters=n_clusters,
+            chunk_size=chunk_size, random_state=42,
+            init_rows=self.sample.indices(5000)  # k-means++ sobre la muestra estratificada
+        )
+        self.data['CLUSTER_CONSUMO'] = labels
         
-        patterns['clusters_consumo'] = {
-            'bajo': min(cluster_means),
-            'medio': sorted(cluster_means)[1],
-            'alto': max(cluster_means)
-        }
+        patterns['clusters_consumo'] = cluster_means
+        patterns['mezcla_clusters_distrito'] = district_mix
         
         self.patterns_found = patterns
         print("✅ Patrones detectados exitosamente")
         return patterns
     
+    def sample_matrix(self, n):
+        """
+        Características escaladas de la muestra estratificada de tamaño n
+        
+        La muestra se copia y escala una vez al tamaño más grande pedido; los
+        tamaños menores son prefijos (vistas) de esa matriz.
+        """
+        n = min(n, len(self.data))
+        if self._sample_X is None or len(self._sample_X) < n:
+            X = self.sample.take(self.data[self.features], n).fillna(0)
+            self._sample_X = StandardScaler().fit_transform(X)
+        return self._sample_X[:n]
+    
     def objective_fast(self, trial):
         """Función objetivo optimizada para datasets grandes"""
         # Hiperparámetros con rangos optimizados
         n_estimators = trial.suggest_int('n_estimators', 50, 150)  # Reducido para velocidad
         contamination = trial.suggest_float('contamination', 0.005, 0.05)  # Más específico
         max_samples = trial.suggest_categorical('max_samples', [0.3, 0.5, 0.7])  # Discreto
+        from sklearn.ensemble import IsolationForest
         
-        # Usar muestra para optimización rápida
-        sample_size = min(10000, len(self.data))
-        sample_data = self.data.sample(n=sample_size, random_state=42)
-        
-        X = sample_data[self.features].fillna(0)
-        X_scaled = StandardScaler().fit_transform(X)
+        # Usar muestra para optimización rápida (la misma en todos los trials)
+        X_scaled = self.sample_matrix(10000)
         
         # Modelo optimizado
         model = IsolationForest(
@@ -132,6 +157,7 @@ class FastAnomalyDetector:
     def optimize_fast(self, n_trials=20):
         """Optimización rápida con menos trials"""
         print("⚡ Optimizando hiperparámetros (modo rápido)...")
+        import optuna  # solo la optimización lo necesita
         
         study = optuna.create_study(direction='maximize')
         study.optimize(self.objective_fast, n_trials=n_trials, show_progress_bar=True)
@@ -156,18 +182,28 @@ class FastAnomalyDetector:
         X = self.data[self.features].fillna(0)
         X_scaled = self.scaler.fit_transform(X)
         
-        # Modelo final optimizado
-        self.model = IsolationForest(
-            n_estimators=self.best_params['n_estimators'],
+        # Modelo final optimizado (los parámetros del bosque solo aplican a Isolation Forest)
+        engine_params = {}
+        if self.engine == 'isolation_forest':
+            engine_params = {
+                'n_estimators': self.best_params['n_estimators'],
+                'tree_max_samples': self.best_params['max_samples'],
+                'n_jobs': -1
+            }
+        self.model = create_engine(
+            self.engine,
             contamination=self.best_params['contamination'],
-            max_samples=self.best_params['max_samples'],
             random_state=42,
-            n_jobs=-1
+            **engine_params
         )
         
         # Entrenar y predecir
         predictions = self.model.fit_predict(X_scaled)
         scores = self.model.decision_function(X_scaled)
+        # Explicaciones bajo demanda (solo para las filas que se muestren)
+        self.explainer = AnomalyExplainer(self.model, X_scaled, self.features,
+                                          baseline_rows=self.sample.indices(10000))
+        self.score_index = ScoreIndex(scores, self.data['DISTRITO'].to_numpy(), self.data['CONSUMO'].to_numpy())
         
         # Agregar resultados
         self.data['ES_ANOMALIA'] = predictions == -1
@@ -178,6 +214,20 @@ class FastAnomalyDetector:
         
         return anomalies_count > 0
     
+    def rethreshold(self, contamination=None, score_threshold=None):
+        """Cambia la proporción de anomalías (o el corte de score) sin reentrenar"""
+        if self.score_index is None:
+            print("❌ Primero ejecuta la detección de anomalías")
+            return False
+        
+        self.data['ES_ANOMALIA'] = self.score_index.flags(contamination, score_threshold)
+        if contamination is not None:
+            self.best_params['contamination'] = contamination
+        
+        anomalies_count = int(self.data['ES_ANOMALIA'].sum())
+        print(f"🎚️  Nuevo umbral: {anomalies_count:,} anomalías")
+        return anomalies_count > 0
+    
     def quick_report(self):
         """Reporte rápido de anomalías detectadas"""
         if 'ES_ANOMALIA' not in self.data.columns:
@@ -202,8 +252,11 @@ class FastAnomalyDetector:
             # Top 3 anomalías más extremas
             print("\n🔍 TOP 3 ANOMALÍAS MÁS EXTREMAS:")
             top_anomalies = anomalies.nsmallest(3, 'SCORE_ANOMALIA')
-            for i, (_, row) in enumerate(top_anomalies.iterrows(), 1):
-                print(f"  {i}. Cliente {row['CORRELATIVO']}: {row['CONSUMO']:.2f} kWh (Score: {row['SCORE_ANOMALIA']:.3f})")
+            explanations = self.explainer.explain(self.data.index.get_indexer(top_anomalies.index))
+            for i, ((_, row), reason) in enumerate(zip(top_anomalies.iterrows(), explanations['EXPLICACION']), 1):
+                cliente = row['CORRELATIVO'] if 'CORRELATIVO' in row else row['CODIGO']
+                print(f"  {i}. Cliente {cliente}: {row['CONSUMO']:.2f} kWh (Score: {row['SCORE_ANOMALIA']:.3f})")
+                print(f"     Factores: {reason}")
             
             # Distribución por distrito
             if len(anomalies) > 0:
@@ -245,9 +298,17 @@ class FastAnomalyDetector:
         
         clusters = patterns['clusters_consumo']
         print(f"\n🎯 Clusters de Consumo Identificados:")
-        print(f"  • Consumo Bajo: {clusters['bajo']:.2f} kWh")
-        print(f"  • Consumo Medio: {clusters['medio']:.2f} kWh")
-        print(f"  • Consumo Alto: {clusters['alto']:.2f} kWh")
+        for name, mean in clusters.items():
+            print(f"  • Consumo {name.capitalize()}: {mean:.2f} kWh")
+        
+        # Distritos con mayor proporción en el cluster de consumo más alto
+        district_mix = patterns['mezcla_clusters_distrito']
+        top_cluster = list(clusters)[-1]
+        district_counts = self.data['DISTRITO'].value_counts()
+        district_mix = district_mix[district_mix.index.isin(district_counts[district_counts >= 100].index)]
+        print(f"\n🏘️  Distritos con mayor proporción de consumo '{top_cluster}' (mín. 100 registros):")
+        for distrito, share in district_mix[top_cluster].nlargest(3).items():
+            print(f"  • {distrito}: {share*100:.1f}%")
         
         print("="*60)
     
@@ -258,8 +319,11 @@ class FastAnomalyDetector:
         # 1. Detectar patrones
         self.detect_patterns_fast()
         
-        # 2. Optimizar modelo
-        self.optimize_fast(n_trials=15)
+        # 2. Optimizar modelo (el objetivo ajusta un Isolation Forest; los otros motores usan sus valores por defecto)
+        if self.engine == 'isolation_forest':
+            self.optimize_fast(n_trials=15)
+        else:
+            print(f"⏭️  Sin optimización de hiperparámetros para el motor '{self.engine}'")
         
         # 3. Detectar anomalías
         has_anomalies = self.detect_anomalies_fast()
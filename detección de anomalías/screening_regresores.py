@@ -0,0 +1,364 @@
+"""
+Screening de regresores con presupuesto de tiempo, en paralelo
+
+Alternativa a `LazyRegressor` para volúmenes reales de Electro Puno:
+
+- Cada candidato se ajusta en su propio proceso (hasta `n_procesos` a la
+  vez) con un presupuesto de segundos; si lo supera, el proceso se termina.
+- Halving sucesivo: todos los candidatos empiezan con una fracción de las
+  filas de entrenamiento y en cada ronda solo sigue la mejor parte (por R²)
+  con más filas. Se descartan antes los modelos cuyo tiempo, extrapolado al
+  tamaño de la ronda siguiente, excede el presupuesto.
+- Los modelos ajustados y sus métricas se guardan con joblib en una caché
+  por huella del dataset (contenido de X e y, partición y filas de la
+  ronda), así que repetir el screening sobre los mismos datos no reentrena.
+  Cada resultado se guarda además bajo una huella de su spec (clase,
+  parámetros, escalado) y del presupuesto: cambiar los hiperparámetros de
+  un candidato lo reentrena, y un tiempo agotado se reintenta con otro
+  presupuesto.
+- La tabla final incluye tiempo de ajuste y memoria pico (tracemalloc) de
+  cada modelo.
+
+Uso:
+    python screening_regresores.py reporte.csv --objetivo FACTURACIÓN --presupuesto 60 --procesos 4
+"""
+import argparse
+import hashlib
+import importlib
+import json
+import math
+import multiprocessing
+import os
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# Candidatos: nombre → (módulo, clase, parámetros, escalar antes)
+CANDIDATOS = {
+    'LinearRegression': ('sklearn.linear_model', 'LinearRegression', {}, False),
+    'Ridge': ('sklearn.linear_model', 'Ridge', {}, True),
+    'Lasso': ('sklearn.linear_model', 'Lasso', {}, True),
+    'ElasticNet': ('sklearn.linear_model', 'ElasticNet', {}, True),
+    'BayesianRidge': ('sklearn.linear_model', 'BayesianRidge', {}, True),
+    'HuberRegressor': ('sklearn.linear_model', 'HuberRegressor', {'max_iter': 500}, True),
+    'SGDRegressor': ('sklearn.linear_model', 'SGDRegressor', {'random_state': 42}, True),
+    'KNeighborsRegressor': ('sklearn.neighbors', 'KNeighborsRegressor', {}, True),
+    'DecisionTreeRegressor': ('sklearn.tree', 'DecisionTreeRegressor', {'random_state': 42}, False),
+    'RandomForestRegressor': ('sklearn.ensemble', 'RandomForestRegressor', {'random_state': 42}, False),
+    'ExtraTreesRegressor': ('sklearn.ensemble', 'ExtraTreesRegressor', {'random_state': 42}, False),
+    'GradientBoostingRegressor': ('sklearn.ensemble', 'GradientBoostingRegressor', {'random_state': 42}, False),
+    'HistGradientBoostingRegressor': ('sklearn.ensemble', 'HistGradientBoostingRegressor',
+                                      {'random_state': 42}, False),
+    'AdaBoostRegressor': ('sklearn.ensemble', 'AdaBoostRegressor', {'random_state': 42}, False),
+    'SVR': ('sklearn.svm', 'SVR', {}, True),
+    'LinearSVR': ('sklearn.svm', 'LinearSVR', {'random_state': 42, 'max_iter': 5000}, True),
+    'MLPRegressor': ('sklearn.neural_network', 'MLPRegressor', {'random_state': 42, 'max_iter': 300}, True),
+}
+
+# Regresores de scikit-learn que no se prueban con `todos_los_regresores`:
+# meta-estimadores que requieren otro modelo, entradas 1D o memoria O(n²)
+EXCLUIDOS = {
+    'StackingRegressor', 'VotingRegressor', 'MultiOutputRegressor', 'RegressorChain',
+    'TransformedTargetRegressor', 'IsotonicRegression', 'KernelRidge', 'GaussianProcessRegressor',
+    'QuantileRegressor', 'CCA', 'PLSCanonical', 'MultiTaskLasso', 'MultiTaskElasticNet',
+    'MultiTaskLassoCV', 'MultiTaskElasticNetCV',
+}
+
+ESTADOS_FINALES = ['ok', 'descartado', 'tiempo agotado', 'error']
+
+
+def todos_los_regresores():
+    """Todos los regresores de scikit-learn (como LazyRegressor), con escalado previo"""
+    from sklearn.utils import all_estimators
+    return {nombre: (clase.__module__, nombre, {}, True)
+            for nombre, clase in all_estimators(type_filter='regressor') if nombre not in EXCLUIDOS}
+
+
+def huella_dataset(X, y):
+    """Huella SHA-1 del contenido y la forma de X e y"""
+    h = hashlib.sha1()
+    for arreglo in (np.ascontiguousarray(X, dtype=np.float64), np.ascontiguousarray(y, dtype=np.float64)):
+        h.update(str(arreglo.shape).encode())
+        h.update(arreglo.tobytes())
+    return h.hexdigest()[:16]
+
+
+def clave_cache(nombre, spec, presupuesto_s):
+    """Clave de un candidato en la caché: su nombre más la huella de la spec y del presupuesto"""
+    contenido = json.dumps([nombre, list(spec), presupuesto_s], sort_keys=True, default=repr)
+    return f"{nombre}_{hashlib.sha1(contenido.encode()).hexdigest()[:10]}"
+
+
+def _crear_modelo(spec):
+    modulo, clase, parametros, escalar = spec
+    modelo = getattr(importlib.import_module(modulo), clase)(**parametros)
+    if escalar:
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+        modelo = make_pipeline(StandardScaler(), modelo)
+    return modelo
+
+
+def metricas(y_real, y_pred, n_caracteristicas):
+    """R², R² ajustado, RMSE y MAE"""
+    residuos = y_real - y_pred
+    ss_res = float(np.sum(residuos ** 2))
+    ss_tot = float(np.sum((y_real - y_real.mean()) ** 2))
+    r2 = 1 - ss_res / ss_tot if ss_tot > 0 else np.nan
+    n = len(y_real)
+    r2_ajustado = 1 - (1 - r2) * (n - 1) / (n - n_caracteristicas - 1) if n > n_caracteristicas + 1 else np.nan
+    return {'r2': r2, 'r2_ajustado': r2_ajustado, 'rmse': math.sqrt(ss_res / n),
+            'mae': float(np.mean(np.abs(residuos)))}
+
+
+def _trabajador(conexion, nombre, spec, X_train, y_train, X_test, y_test, ruta_modelo):
+    """Ajusta un candidato en un proceso aparte y envía sus métricas"""
+    import warnings
+    warnings.filterwarnings('ignore')
+    try:
+        # El import de la clase queda fuera de la medición (tracemalloc lo haría muy lento)
+        modelo = _crear_modelo(spec)
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        modelo.fit(X_train, y_train)
+        tiempo = time.perf_counter() - inicio
+        y_pred = np.asarray(modelo.predict(X_test), dtype=np.float64)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        import joblib
+        joblib.dump(modelo, ruta_modelo)
+        conexion.send({'modelo': nombre, 'estado': 'ok', 'tiempo_s': tiempo,
+                       'memoria_pico_mb': pico / 2 ** 20, **metricas(y_test, y_pred, X_train.shape[1])})
+    except Exception as e:
+        conexion.send({'modelo': nombre, 'estado': 'error', 'detalle': f"{type(e).__name__}: {e}"})
+    finally:
+        conexion.close()
+
+
+def _ejecutar_ronda(candidatos, datos, presupuesto_s, n_procesos, directorio):
+    """
+    Ajusta los candidatos con un proceso por modelo y límite de tiempo
+
+    Returns:
+    - Lista de resultados (uno por candidato)
+    """
+    # Importar los módulos en el proceso principal: los hijos (fork) los heredan ya cargados
+    for modulo, *_ in candidatos.values():
+        importlib.import_module(modulo)
+    importlib.import_module('sklearn.pipeline')
+    importlib.import_module('sklearn.preprocessing')
+
+    pendientes = list(candidatos.items())
+    activos = {}
+    resultados = []
+    while pendientes or activos:
+        while pendientes and len(activos) < n_procesos:
+            nombre, spec = pendientes.pop(0)
+            ruta_modelo = os.path.join(directorio, f'{clave_cache(nombre, spec, presupuesto_s)}.joblib')
+            receptor, emisor = multiprocessing.Pipe(duplex=False)
+            proceso = multiprocessing.Process(target=_trabajador,
+                                              args=(emisor, nombre, spec, *datos, ruta_modelo), daemon=True)
+            proceso.start()
+            emisor.close()
+            activos[nombre] = (proceso, receptor, time.perf_counter() + presupuesto_s)
+
+        for nombre, (proceso, receptor, limite) in list(activos.items()):
+            resultado = None
+            if receptor.poll():
+                try:
+                    resultado = receptor.recv()
+                except EOFError:
+                    resultado = {'modelo': nombre, 'estado': 'error', 'detalle': 'el proceso terminó sin resultado'}
+            elif time.perf_counter() > limite:
+                proceso.terminate()
+                resultado = {'modelo': nombre, 'estado': 'tiempo agotado', 'tiempo_s': presupuesto_s}
+            elif not proceso.is_alive():
+                resultado = {'modelo': nombre, 'estado': 'error',
+                             'detalle': f'el proceso terminó con código {proceso.exitcode}'}
+            if resultado is not None:
+                proceso.join()
+                receptor.close()
+                del activos[nombre]
+                resultados.append(resultado)
+        time.sleep(0.02)
+    return resultados
+
+
+def _cargar_cache(directorio, candidatos, presupuesto_s):
+    """
+    Resultados ya guardados para esta ronda y los candidatos que faltan
+
+    Los resultados se buscan por `clave_cache`, no solo por nombre: un
+    candidato con otros parámetros u otro presupuesto no reutiliza el ajuste.
+    """
+    ruta = os.path.join(directorio, 'resultados.json')
+    guardados = {}
+    if os.path.exists(ruta):
+        with open(ruta, encoding='utf-8') as f:
+            guardados = json.load(f)
+    claves = {n: clave_cache(n, spec, presupuesto_s) for n, spec in candidatos.items()}
+    en_cache = [dict(guardados[claves[n]], cache=True) for n in candidatos if claves[n] in guardados]
+    faltan = {n: spec for n, spec in candidatos.items() if claves[n] not in guardados}
+    return en_cache, faltan, guardados
+
+
+def screening_regresores(X, y, candidatos=None, presupuesto_s=60, n_procesos=None, fracciones=(0.1, 0.3, 1.0),
+                         eta=2, min_supervivientes=3, test_size=0.3, random_state=42,
+                         directorio_cache='cache_screening'):
+    """
+    Screening de regresores por halving sucesivo con presupuesto por modelo
+
+    Parameters:
+    - X, y: Características y objetivo (DataFrame/Series o arreglos)
+    - candidatos: {nombre: spec} (CANDIDATOS por defecto; ver `todos_los_regresores`)
+    - presupuesto_s: Segundos máximos de ajuste por modelo y ronda
+    - n_procesos: Modelos en paralelo (None = todos los núcleos)
+    - fracciones: Fracción de las filas de entrenamiento en cada ronda (la última debería ser 1.0)
+    - eta: En cada ronda sigue 1/eta de los candidatos (al menos `min_supervivientes`)
+    - test_size: Proporción de prueba (la misma en todas las rondas)
+    - random_state: Semilla de la partición y del orden de las filas
+    - directorio_cache: Carpeta de la caché de joblib (None = carpeta temporal)
+
+    Returns:
+    - DataFrame con una fila por modelo (su última ronda), ordenado por ronda y R²
+    """
+    candidatos = dict(candidatos or CANDIDATOS)
+    n_procesos = n_procesos or os.cpu_count() or 1
+    if directorio_cache is None:
+        import tempfile
+        directorio_cache = tempfile.mkdtemp(prefix='screening_')
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    huella = huella_dataset(X, y)
+
+    rng = np.random.default_rng(random_state)
+    orden = rng.permutation(len(X))
+    n_test = max(1, int(round(len(X) * test_size)))
+    prueba, entrenamiento = orden[:n_test], orden[n_test:]
+    X_test, y_test = X[prueba], y[prueba]
+
+    print(f"🧪 Screening de {len(candidatos)} regresores ({len(entrenamiento):,} filas de entrenamiento, "
+          f"presupuesto {presupuesto_s:g} s por modelo, {n_procesos} procesos, huella {huella})")
+
+    ultimo = {}
+    vivos = candidatos
+    for ronda, fraccion in enumerate(fracciones, start=1):
+        # Prefijos anidados de las filas de entrenamiento (ya en orden aleatorio)
+        n_filas = max(10, int(len(entrenamiento) * fraccion))
+        filas = entrenamiento[:n_filas]
+        directorio = os.path.join(directorio_cache, f'{huella}_t{test_size:g}_s{random_state}', f'filas_{n_filas}')
+        os.makedirs(directorio, exist_ok=True)
+
+        en_cache, faltan, guardados = _cargar_cache(directorio, vivos, presupuesto_s)
+        inicio = time.perf_counter()
+        nuevos = _ejecutar_ronda(faltan, (X[filas], y[filas], X_test, y_test), presupuesto_s,
+                                 n_procesos, directorio) if faltan else []
+        # La clave incluye el presupuesto: un tiempo agotado se reintenta si el presupuesto cambia
+        for resultado in nuevos:
+            nombre = resultado['modelo']
+            guardados[clave_cache(nombre, candidatos[nombre], presupuesto_s)] = resultado
+        with open(os.path.join(directorio, 'resultados.json'), 'w', encoding='utf-8') as f:
+            json.dump(guardados, f, ensure_ascii=False, indent=2, default=float)
+
+        resultados = en_cache + [dict(r, cache=False) for r in nuevos]
+        for resultado in resultados:
+            clave = clave_cache(resultado['modelo'], candidatos[resultado['modelo']], presupuesto_s)
+            ultimo[resultado['modelo']] = dict(resultado, ronda=ronda, filas=n_filas,
+                                               ruta_modelo=os.path.join(directorio, f'{clave}.joblib'))
+        ok = sorted((r for r in resultados if r['estado'] == 'ok'), key=lambda r: -np.nan_to_num(r['r2'], nan=-np.inf))
+        print(f"   Ronda {ronda}: {n_filas:,} filas, {len(ok)}/{len(resultados)} ajustados "
+              f"({len(en_cache)} desde caché) en {time.perf_counter() - inicio:.1f} s")
+
+        if ronda == len(fracciones):
+            break
+        # Descartar los que no cabrían en el presupuesto con más filas y quedarse con los mejores
+        siguiente = max(10, int(len(entrenamiento) * fracciones[ronda]))
+        rapidos = [r for r in ok if r['tiempo_s'] * siguiente / n_filas <= presupuesto_s]
+        for r in ok:
+            if r not in rapidos:
+                ultimo[r['modelo']]['estado'] = 'descartado'
+                ultimo[r['modelo']]['detalle'] = 'tiempo extrapolado mayor al presupuesto'
+        conservar = max(min_supervivientes, math.ceil(len(ok) / eta))
+        for r in rapidos[conservar:]:
+            ultimo[r['modelo']]['estado'] = 'descartado'
+            ultimo[r['modelo']]['detalle'] = f'R² fuera del mejor 1/{eta}'
+        vivos = {r['modelo']: candidatos[r['modelo']] for r in rapidos[:conservar]}
+        if not vivos:
+            break
+
+    tabla = pd.DataFrame(list(ultimo.values()))
+    for columna in ['r2', 'r2_ajustado', 'rmse', 'mae', 'tiempo_s', 'memoria_pico_mb', 'detalle']:
+        if columna not in tabla:
+            tabla[columna] = np.nan
+    tabla['orden_estado'] = tabla['estado'].map({e: i for i, e in enumerate(ESTADOS_FINALES)})
+    tabla = tabla.sort_values(['ronda', 'orden_estado', 'r2'], ascending=[False, True, False])
+    columnas = ['modelo', 'estado', 'ronda', 'filas', 'r2', 'r2_ajustado', 'rmse', 'mae',
+                'tiempo_s', 'memoria_pico_mb', 'cache', 'detalle', 'ruta_modelo']
+    return tabla[columnas].set_index('modelo')
+
+
+def cargar_modelo(tabla, nombre=None):
+    """Modelo ajustado desde la caché (el primero de la tabla por defecto)"""
+    import joblib
+    fila = tabla.iloc[0] if nombre is None else tabla.loc[nombre]
+    if fila['estado'] != 'ok':
+        raise ValueError(f"El modelo {fila.name} no terminó su ajuste ({fila['estado']})")
+    return joblib.load(fila['ruta_modelo'])
+
+
+def preparar_datos_electro(archivo, objetivo='FACTURACIÓN'):
+    """
+    Características para pronosticar consumo o facturación con el reporte de Electro Puno
+
+    No se usa la otra variable monetaria/energética como entrada cuando el
+    objetivo es CONSUMO, para no filtrar el objetivo.
+    """
+    data = pd.read_csv(archivo, dtype={'CONSUMO': 'float32', 'FACTURACIÓN': 'float32'})
+    data = data[(data['CONSUMO'] >= 0) & (data['FACTURACIÓN'] >= 0)].dropna(subset=[objetivo])
+
+    alta = pd.to_datetime(data['FECHA_ALTA'], format='%d/%m/%Y', errors='coerce')
+    X = pd.DataFrame({
+        'MES_ALTA': alta.dt.month,
+        'AÑO_ALTA': alta.dt.year,
+        'MES': data['PERIODO'] % 100,
+    }, index=data.index)
+    for col in ['TARIFA', 'DISTRITO', 'PROVINCIA', 'ESTADO_CLIENTE']:
+        X[f'{col}_ENCODED'] = pd.factorize(data[col].astype(str))[0]
+    if objetivo != 'CONSUMO':
+        X['CONSUMO'] = data['CONSUMO']
+    X = X.fillna(X.median())
+    return X, data[objetivo]
+
+
+def imprimir_tabla(tabla, top=15):
+    print("\n🏁 TABLA DE POSICIONES")
+    print(tabla.drop(columns=['ruta_modelo', 'detalle']).head(top).to_string(float_format=lambda v: f'{v:,.4f}'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screening de regresores con presupuesto de tiempo")
+    parser.add_argument('archivo', help="reporte.csv de Electro Puno")
+    parser.add_argument('--objetivo', default='FACTURACIÓN', choices=['FACTURACIÓN', 'CONSUMO'])
+    parser.add_argument('--presupuesto', type=float, default=60, help="Segundos por modelo y ronda")
+    parser.add_argument('--procesos', type=int, default=0, help="Modelos en paralelo (0 = todos los núcleos)")
+    parser.add_argument('--fracciones', type=float, nargs='+', default=[0.1, 0.3, 1.0])
+    parser.add_argument('--todos', action='store_true', help="Probar todos los regresores de scikit-learn")
+    parser.add_argument('--cache', default='cache_screening', help="Carpeta de la caché de modelos")
+    parser.add_argument('--salida', metavar='CSV', help="Guardar la tabla de posiciones")
+    args = parser.parse_args()
+
+    X, y = preparar_datos_electro(args.archivo, args.objetivo)
+    tabla = screening_regresores(X, y, candidatos=todos_los_regresores() if args.todos else None,
+                                 presupuesto_s=args.presupuesto, n_procesos=args.procesos or None,
+                                 fracciones=args.fracciones, directorio_cache=args.cache)
+    imprimir_tabla(tabla)
+    if args.salida:
+        tabla.to_csv(args.salida, encoding='utf-8-sig')
+        print(f"💾 Tabla guardada en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
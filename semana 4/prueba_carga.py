@@ -0,0 +1,82 @@
+"""
+Prueba de carga local del endpoint /score
+
+Envía recibos del reporte de Electro Puno desde varios hilos a la vez (un
+recibo por petición, como el front office) y mide el rendimiento y la
+latencia vista por el cliente; al final muestra las métricas del servidor
+(/score/metricas), incluido el tamaño medio de los micro-lotes.
+
+Uso (con la app corriendo y el modelo exportado con
+`electro_cli.py export reporte.csv --modelo modelo_anomalias.joblib`):
+    python prueba_carga.py reporte.csv --concurrencia 16 --peticiones 2000
+"""
+import argparse
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+CAMPOS = ['CONSUMO', 'FACTURACIÓN', 'PERIODO', 'DEPARTAMENTO', 'PROVINCIA', 'DISTRITO', 'TARIFA', 'ESTADO_CLIENTE']
+
+
+def enviar(url, registro, timeout=30):
+    """POST de un recibo; devuelve (latencia en segundos, código HTTP)"""
+    cuerpo = json.dumps(registro).encode('utf-8')
+    peticion = urllib.request.Request(url, data=cuerpo, headers={'Content-Type': 'application/json'})
+    inicio = time.perf_counter()
+    try:
+        with urllib.request.urlopen(peticion, timeout=timeout) as respuesta:
+            respuesta.read()
+            codigo = respuesta.status
+    except urllib.error.HTTPError as e:
+        codigo = e.code
+    except OSError:
+        codigo = 0
+    return time.perf_counter() - inicio, codigo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del endpoint /score")
+    parser.add_argument('archivo', help="reporte.csv de donde se toman los recibos")
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--concurrencia', type=int, default=16, help="Hilos enviando peticiones a la vez")
+    parser.add_argument('--peticiones', type=int, default=2000)
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.archivo, usecols=lambda col: col in CAMPOS, nrows=max(args.peticiones, 1000))
+    registros = data.sample(args.peticiones, replace=len(data) < args.peticiones, random_state=42)
+    registros = [{k: (v.item() if hasattr(v, 'item') else v) for k, v in r.items()}
+                 for r in registros.to_dict(orient='records')]
+
+    url = args.url.rstrip('/') + '/score'
+    print(f"🚀 {args.peticiones:,} peticiones a {url} con {args.concurrencia} hilos...")
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrencia) as pool:
+        resultados = list(pool.map(lambda r: enviar(url, r), registros))
+    total = time.perf_counter() - inicio
+
+    latencias = np.array([l for l, _ in resultados]) * 1000
+    codigos = pd.Series([c for _, c in resultados]).value_counts().to_dict()
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+    print(f"\n📊 CLIENTE")
+    print(f"   Rendimiento: {args.peticiones / total:,.1f} peticiones/s ({total:.2f} s en total)")
+    print(f"   Latencia (ms): p50={p50:.1f}  p95={p95:.1f}  p99={p99:.1f}  max={latencias.max():.1f}")
+    print(f"   Códigos HTTP: {codigos}")
+
+    try:
+        with urllib.request.urlopen(args.url.rstrip('/') + '/score/metricas', timeout=10) as respuesta:
+            metricas = json.loads(respuesta.read())['metricas']
+        print(f"\n🖥️  SERVIDOR")
+        print(f"   Lotes: {metricas['lotes']:,} (promedio {metricas['registros_por_lote']} registros por lote)")
+        if 'latencia_ms' in metricas:
+            print(f"   Latencia en cola + puntuación (ms): {metricas['latencia_ms']}")
+        print(f"   Errores: {metricas['errores']}")
+    except (OSError, KeyError, ValueError) as e:
+        print(f"⚠️ No se pudieron leer las métricas del servidor: {e}")
+
+
+if __name__ == "__main__":
+    main()
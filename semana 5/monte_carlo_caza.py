@@ -0,0 +1,167 @@
+import argparse
+import csv
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from simulacion_vectorizada import SimulacionCazaVectorizada
+
+METRICAS = ['tasa_captura', 'exito', 'capturas', 'pasos', 'tiempo_primera_caza', 'tiempo_caza_medio']
+
+
+def ejecutar_episodio(episodio, semilla, pasos_max=500, **config):
+    """
+    Ejecuta un episodio sin gráficos con su propio generador aleatorio
+
+    Returns:
+        dict: Estadísticas del episodio
+    """
+    sim = SimulacionCazaVectorizada(semilla=semilla, **config)
+    sim.ejecutar(pasos_max)
+
+    tiempos = sim.estadisticas['tiempo_caza']
+    n_presas = len(sim.presas_vivas)
+    cazadas = n_presas - int(sim.presas_vivas.sum())
+    return {
+        'episodio': episodio,
+        'pasos': sim.tiempo,
+        'capturas': sim.estadisticas['capturas'],
+        'presas_cazadas': cazadas,
+        'tasa_captura': cazadas / n_presas if n_presas else np.nan,
+        'exito': cazadas == n_presas,
+        'tiempo_primera_caza': min(tiempos) if tiempos else np.nan,
+        'tiempo_caza_medio': float(np.mean(tiempos)) if tiempos else np.nan,
+    }
+
+
+def _ejecutar_lote(episodios, semillas, pasos_max, config):
+    """Tarea de un proceso: varios episodios para amortizar el envío"""
+    return [ejecutar_episodio(e, s, pasos_max, **config) for e, s in zip(episodios, semillas)]
+
+
+class AcumuladorResultados:
+    """Media y varianza en línea (Welford) de cada métrica a medida que llegan episodios"""
+
+    def __init__(self, metricas=METRICAS):
+        self.metricas = metricas
+        self.n = {m: 0 for m in metricas}
+        self.media = {m: 0.0 for m in metricas}
+        self.m2 = {m: 0.0 for m in metricas}
+
+    def agregar(self, fila):
+        for m in self.metricas:
+            valor = float(fila[m])
+            if np.isnan(valor):
+                continue
+            self.n[m] += 1
+            delta = valor - self.media[m]
+            self.media[m] += delta / self.n[m]
+            self.m2[m] += delta * (valor - self.media[m])
+
+    def tabla(self, z=1.96):
+        """Tabla con media, desviación e intervalo de confianza de cada métrica"""
+        filas = []
+        for m in self.metricas:
+            n = self.n[m]
+            media = self.media[m] if n else np.nan
+            desviacion = np.sqrt(self.m2[m] / (n - 1)) if n > 1 else np.nan
+
+            if m == 'exito' and n:
+                # Intervalo de Wilson para proporciones
+                centro = (media + z**2 / (2 * n)) / (1 + z**2 / n)
+                margen = z * np.sqrt(media * (1 - media) / n + z**2 / (4 * n**2)) / (1 + z**2 / n)
+                inferior, superior = centro - margen, centro + margen
+            else:
+                error = desviacion / np.sqrt(n) if n > 1 else np.nan
+                inferior, superior = media - z * error, media + z * error
+
+            filas.append({
+                'metrica': m,
+                'n': n,
+                'media': media,
+                'desviacion_estandar': desviacion,
+                'ic_95_inferior': inferior,
+                'ic_95_superior': superior,
+            })
+        return pd.DataFrame(filas)
+
+
+def ejecutar_monte_carlo(n_episodios=1000, semilla=42, pasos_max=500, n_procesos=None,
+                         tamano_lote=50, archivo_salida=None, **config):
+    """
+    Ejecuta episodios independientes en un pool de procesos
+
+    Cada episodio recibe un SeedSequence hijo de `semilla`, por lo que los
+    resultados son reproducibles sin importar el número de procesos.
+
+    Args:
+        n_episodios (int): Número de episodios
+        semilla (int): Semilla raíz
+        pasos_max (int): Pasos máximos por episodio
+        n_procesos (int): Procesos del pool (None = todos los núcleos)
+        tamano_lote (int): Episodios por tarea
+        archivo_salida (str): CSV donde se escriben los episodios a medida que terminan
+        **config: Parámetros de SimulacionCazaVectorizada (ancho, alto, n_manadas, n_presas...)
+
+    Returns:
+        tuple: (DataFrame de episodios, DataFrame resumen con intervalos de confianza)
+    """
+    semillas = np.random.SeedSequence(semilla).spawn(n_episodios)
+    acumulador = AcumuladorResultados()
+    filas = []
+    escritor = None
+    salida = open(archivo_salida, 'w', newline='', encoding='utf-8') if archivo_salida else None
+
+    print(f"🎲 Ejecutando {n_episodios:,} episodios (pasos máx.: {pasos_max})...")
+    inicio = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+            tareas = [
+                pool.submit(_ejecutar_lote, list(range(i, min(i + tamano_lote, n_episodios))),
+                            semillas[i:i + tamano_lote], pasos_max, config)
+                for i in range(0, n_episodios, tamano_lote)
+            ]
+            for tarea in as_completed(tareas):
+                for fila in tarea.result():
+                    acumulador.agregar(fila)
+                    filas.append(fila)
+                    if salida:
+                        if escritor is None:
+                            escritor = csv.DictWriter(salida, fieldnames=list(fila))
+                            escritor.writeheader()
+                        escritor.writerow(fila)
+                print(f"   {len(filas):,}/{n_episodios:,} episodios | "
+                      f"tasa de captura media: {acumulador.media['tasa_captura']:.3f}")
+    finally:
+        if salida:
+            salida.close()
+
+    duracion = time.perf_counter() - inicio
+    print(f"✅ {n_episodios:,} episodios en {duracion:.1f} s ({n_episodios / duracion:.1f} episodios/s)")
+
+    resultados = pd.DataFrame(filas).sort_values('episodio').reset_index(drop=True)
+    return resultados, acumulador.tabla()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo de episodios de caza sin gráficos")
+    parser.add_argument('--episodios', type=int, default=1000)
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--pasos', type=int, default=500)
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--manadas', type=int, default=1)
+    parser.add_argument('--presas', type=int, default=3)
+    parser.add_argument('--salida', default=None, help="CSV con el detalle de cada episodio")
+    args = parser.parse_args()
+
+    _, resumen = ejecutar_monte_carlo(
+        n_episodios=args.episodios, semilla=args.semilla, pasos_max=args.pasos,
+        n_procesos=args.procesos, archivo_salida=args.salida,
+        n_manadas=args.manadas, n_presas=args.presas
+    )
+    print("\n📊 RESUMEN (IC 95%)")
+    print(resumen.round(3).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+import time
+import numpy as np
+
+ALFA, CAZADOR, ACORRALADOR = 0, 1, 2
+CODIGOS_ROL = {"alfa": ALFA, "cazador": CAZADOR, "acorralador": ACORRALADOR}
+
+
+class RejillaEspacial:
+    """
+    Hash de rejilla uniforme para consultas de vecinos por radio
+
+    Los agentes se ordenan por celda; una consulta solo revisa las 9 celdas
+    alrededor del punto, por lo que el radio no puede superar el tamaño de celda.
+    """
+
+    def __init__(self, ancho, alto, tamano_celda):
+        self.tamano_celda = tamano_celda
+        self.nx = max(1, int(np.ceil(ancho / tamano_celda)))
+        self.ny = max(1, int(np.ceil(alto / tamano_celda)))
+        self.orden = np.empty(0, dtype=np.int64)
+        self.inicios = np.zeros(self.nx * self.ny, dtype=np.int64)
+        self.conteos = np.zeros(self.nx * self.ny, dtype=np.int64)
+        self.posiciones = np.empty((0, 2))
+
+    def _celdas(self, posiciones):
+        cx = np.clip((posiciones[:, 0] // self.tamano_celda).astype(np.int64), 0, self.nx - 1)
+        cy = np.clip((posiciones[:, 1] // self.tamano_celda).astype(np.int64), 0, self.ny - 1)
+        return cx, cy
+
+    def construir(self, posiciones):
+        """Indexa las posiciones (n x 2)"""
+        self.posiciones = posiciones
+        cx, cy = self._celdas(posiciones)
+        celdas = cx * self.ny + cy
+        self.orden = np.argsort(celdas, kind='stable')
+        self.conteos = np.bincount(celdas, minlength=self.nx * self.ny)
+        self.inicios = np.concatenate([[0], np.cumsum(self.conteos)[:-1]])
+        return self
+
+    def pares_en_radio(self, consultas, radio):
+        """
+        Pares (consulta, agente) a distancia menor que `radio`
+
+        Returns:
+        - i: índice de la consulta
+        - j: índice del agente indexado
+        - d: vector agente - consulta (k x 2)
+        - dist: distancia euclidiana
+        """
+        if radio > self.tamano_celda:
+            raise ValueError("El radio no puede ser mayor que el tamaño de celda")
+
+        qx, qy = self._celdas(consultas)
+        indices_i, indices_j = [], []
+        for ox in (-1, 0, 1):
+            for oy in (-1, 0, 1):
+                nx, ny = qx + ox, qy + oy
+                validas = (nx >= 0) & (nx < self.nx) & (ny >= 0) & (ny < self.ny)
+                consulta = np.nonzero(validas)[0]
+                celda = nx[validas] * self.ny + ny[validas]
+                conteo = self.conteos[celda]
+                total = conteo.sum()
+                if total == 0:
+                    continue
+                # Expandir cada consulta a todos los agentes de la celda vecina
+                desplazamiento = np.arange(total) - np.repeat(np.cumsum(conteo) - conteo, conteo)
+                indices_i.append(np.repeat(consulta, conteo))
+                indices_j.append(self.orden[np.repeat(self.inicios[celda], conteo) + desplazamiento])
+
+        if not indices_i:
+            vacio = np.empty(0, dtype=np.int64)
+            return vacio, vacio, np.empty((0, 2)), np.empty(0)
+
+        i = np.concatenate(indices_i)
+        j = np.concatenate(indices_j)
+        d = self.posiciones[j] - consultas[i]
+        dist = np.hypot(d[:, 0], d[:, 1])
+        cerca = dist < radio
+        return i[cerca], j[cerca], d[cerca], dist[cerca]
+
+
+def pares_exhaustivos(consultas, puntos, radio):
+    """Mismo resultado que RejillaEspacial.pares_en_radio comparando todos contra todos"""
+    d = puntos[None, :, :] - consultas[:, None, :]
+    dist = np.hypot(d[..., 0], d[..., 1])
+    i, j = np.nonzero(dist < radio)
+    return i, j, d[i, j], dist[i, j]
+
+
+class SimulacionCazaVectorizada:
+    """
+    Versión vectorizada de SimulacionCaza
+
+    Posiciones, velocidades, energía y roles se guardan en arreglos NumPy y
+    las consultas de vecinos usan una rejilla espacial, de modo que cada paso
+    cuesta O(n) en lugar de O(presas x lobos) en el intérprete. Las reglas de
+    huida, flanqueo y ataque son las mismas que en `monitoreo bioinspirado`;
+    con varias manadas, cada una persigue a la presa viva más cercana a su alfa.
+    """
+
+    ROLES_MANADA = ("alfa", "cazador", "cazador", "acorralador", "acorralador")
+    # Con pocos agentes comparar todos contra todos es más barato que la rejilla
+    PARES_EXHAUSTIVOS_MAX = 4096
+
+    def __init__(self, ancho=50, alto=40, n_manadas=1, n_presas=3, roles_manada=None,
+                 semilla=None, inicio_uniforme=False):
+        """
+        Args:
+            ancho, alto (float): Dimensiones del área
+            n_manadas (int): Número de manadas de lobos
+            n_presas (int): Número de presas
+            roles_manada (tuple): Roles de los lobos de cada manada
+            semilla (int | np.random.SeedSequence): Semilla del generador propio
+            inicio_uniforme (bool): Repartir agentes en toda el área en lugar
+                de lobos a la izquierda y presas a la derecha
+        """
+        self.ancho = ancho
+        self.alto = alto
+        self.rng = np.random.default_rng(semilla)
+        self.tiempo = 0
+        self.estadisticas = {
+            'capturas': 0,
+            'tiempo_caza': [],
+            'distancias_recorridas': []
+        }
+
+        # Parámetros de comportamiento (iguales a Presa y Lobo)
+        self.velocidad_presa = 2.0
+        self.velocidad_lobo = 1.8
+        self.radio_deteccion = 8.0
+        self.radio_comunicacion = 12.0
+        self.radio_ataque = 1.5
+        self.probabilidad_exito = 0.3
+        self.dano_ataque = 30
+
+        roles = [CODIGOS_ROL[r] for r in (roles_manada or self.ROLES_MANADA)]
+        self.rol = np.tile(np.array(roles, dtype=np.int8), n_manadas)
+        self.manada = np.repeat(np.arange(n_manadas), len(roles))
+        n_lobos = len(self.rol)
+
+        if inicio_uniforme:
+            self.pos_lobos = self.rng.uniform((0, 0), (ancho, alto), size=(n_lobos, 2))
+            self.pos_presas = self.rng.uniform((0, 0), (ancho, alto), size=(n_presas, 2))
+        else:
+            self.pos_lobos = self.rng.uniform((5, 5), (15, alto - 5), size=(n_lobos, 2))
+            self.pos_presas = self.rng.uniform((ancho - 15, 5), (ancho - 5, alto - 5), size=(n_presas, 2))
+
+        self.vel_lobos = np.zeros((n_lobos, 2))
+        self.vel_presas = np.zeros((n_presas, 2))
+        self.energia_presas = np.full(n_presas, 100.0)
+        self.presas_vivas = np.ones(n_presas, dtype=bool)
+
+        # Alfa de cada manada (o el primer lobo si la manada no tiene alfa)
+        primeros = np.searchsorted(self.manada, np.arange(n_manadas))
+        alfas = np.full(n_manadas, -1)
+        es_alfa = np.nonzero(self.rol == ALFA)[0]
+        alfas[self.manada[es_alfa][::-1]] = es_alfa[::-1]
+        self.alfas = np.where(alfas >= 0, alfas, primeros)
+
+        self.rejilla_lobos = RejillaEspacial(ancho, alto, self.radio_deteccion)
+
+    # ------------------------------------------------------------------
+    # Reglas vectorizadas
+    # ------------------------------------------------------------------
+    def huir(self):
+        """Cada presa viva huye de los lobos dentro de su radio de detección"""
+        vivas = np.nonzero(self.presas_vivas)[0]
+        if len(vivas) * len(self.rol) <= self.PARES_EXHAUSTIVOS_MAX:
+            i, _, d, dist = pares_exhaustivos(self.pos_presas[vivas], self.pos_lobos, self.radio_deteccion)
+        else:
+            self.rejilla_lobos.construir(self.pos_lobos)
+            i, _, d, dist = self.rejilla_lobos.pares_en_radio(self.pos_presas[vivas], self.radio_deteccion)
+
+        positiva = dist > 0
+        i, d, dist = i[positiva], d[positiva], dist[positiva]
+        # d apunta de la presa al lobo; escapar es la dirección opuesta
+        escape_x = np.bincount(i, weights=-d[:, 0] / dist, minlength=len(vivas))
+        escape_y = np.bincount(i, weights=-d[:, 1] / dist, minlength=len(vivas))
+
+        norma = np.hypot(escape_x, escape_y)
+        huyen = norma > 0
+        presas = vivas[huyen]
+        self.vel_presas[presas, 0] = escape_x[huyen] / norma[huyen] * self.velocidad_presa
+        self.vel_presas[presas, 1] = escape_y[huyen] / norma[huyen] * self.velocidad_presa
+
+    def mover_presas(self):
+        """Actualiza posiciones con rebote en los bordes y fricción"""
+        vivas = self.presas_vivas
+        pos = self.pos_presas[vivas] + self.vel_presas[vivas]
+        vel = self.vel_presas[vivas]
+
+        for eje, limite in enumerate((self.ancho, self.alto)):
+            fuera = (pos[:, eje] <= 0) | (pos[:, eje] >= limite)
+            vel[fuera, eje] *= -1
+            pos[:, eje] = np.clip(pos[:, eje], 0, limite)
+
+        self.pos_presas[vivas] = pos
+        self.vel_presas[vivas] = vel * 0.95
+
+    def asignar_objetivos(self, bloque=512):
+        """Presa viva más cercana al alfa de cada manada"""
+        vivas = np.nonzero(self.presas_vivas)[0]
+        pos_vivas = self.pos_presas[vivas]
+        pos_alfas = self.pos_lobos[self.alfas]
+        objetivos = np.full(len(self.alfas), -1, dtype=np.int64)
+
+        # Primero en la rejilla: celdas con ~4 presas vivas en promedio
+        celda = max(1.0, np.sqrt(self.ancho * self.alto * 4 / len(vivas)))
+        if len(vivas) * len(self.alfas) > self.PARES_EXHAUSTIVOS_MAX and celda < max(self.ancho, self.alto):
+            rejilla = RejillaEspacial(self.ancho, self.alto, celda).construir(pos_vivas)
+            i, j, _, dist = rejilla.pares_en_radio(pos_alfas, celda)
+            orden = np.lexsort((dist, i))
+            primero = np.concatenate([[True], i[orden][1:] != i[orden][:-1]]) if len(i) else np.empty(0, dtype=bool)
+            objetivos[i[orden][primero]] = vivas[j[orden][primero]]
+
+        # Alfas sin presas cerca: búsqueda exhaustiva por bloques
+        pendientes = np.nonzero(objetivos < 0)[0]
+        for inicio in range(0, len(pendientes), bloque):
+            manadas = pendientes[inicio:inicio + bloque]
+            diferencia = pos_alfas[manadas, None, :] - pos_vivas[None, :, :]
+            distancia = np.einsum('ijk,ijk->ij', diferencia, diferencia)
+            objetivos[manadas] = vivas[np.argmin(distancia, axis=1)]
+
+        return objetivos[self.manada]
+
+    def perseguir(self, objetivo_lobo):
+        """Calcula la posición de flanqueo según el rol y ajusta la velocidad"""
+        presa = self.pos_presas[objetivo_lobo]
+        vel_presa = self.vel_presas[objetivo_lobo]
+        angulo_base = np.arctan2(presa[:, 1] - self.pos_lobos[:, 1], presa[:, 0] - self.pos_lobos[:, 0])
+
+        destino = presa.copy()
+        cazador = self.rol == CAZADOR
+        destino[cazador] = presa[cazador] + vel_presa[cazador] * 3
+
+        acorralador = self.rol == ACORRALADOR
+        desvio = self.rng.choice([-np.pi / 2, np.pi / 2], size=acorralador.sum())
+        angulo = angulo_base[acorralador] + desvio
+        destino[acorralador, 0] = presa[acorralador, 0] + np.cos(angulo) * 6.0
+        destino[acorralador, 1] = presa[acorralador, 1] + np.sin(angulo) * 6.0
+
+        d = destino - self.pos_lobos
+        distancia = np.hypot(d[:, 0], d[:, 1])
+        factor = np.where(self.rol == ALFA, 1.2, np.where(distancia < 3.0, 0.6, 1.0))
+
+        mueve = distancia > 0
+        escala = self.velocidad_lobo * factor[mueve] / distancia[mueve]
+        self.vel_lobos[mueve] = d[mueve] * escala[:, None]
+
+    def mover_lobos(self):
+        self.pos_lobos += self.vel_lobos
+        np.clip(self.pos_lobos, 0, (self.ancho, self.alto), out=self.pos_lobos)
+
+    def atacar(self, objetivo_lobo):
+        """
+        Ataques de los lobos a su objetivo; una presa deja de recibir golpes
+        en cuanto muere, igual que en la versión por objetos
+        """
+        d = self.pos_lobos - self.pos_presas[objetivo_lobo]
+        alcance = np.hypot(d[:, 0], d[:, 1]) < self.radio_ataque
+        exito = alcance & (self.rng.random(len(self.rol)) < self.probabilidad_exito)
+
+        golpes = np.bincount(objetivo_lobo[exito], minlength=len(self.presas_vivas))
+        necesarios = np.ceil(self.energia_presas / self.dano_ataque).astype(np.int64)
+        efectivos = np.where(self.presas_vivas, np.minimum(golpes, necesarios), 0)
+
+        self.energia_presas -= efectivos * self.dano_ataque
+        self.estadisticas['capturas'] += int(efectivos.sum())
+
+        muertas = self.presas_vivas & (self.energia_presas <= 0)
+        self.presas_vivas[muertas] = False
+        self.estadisticas['tiempo_caza'].extend([self.tiempo] * int(muertas.sum()))
+
+    def comunicarse(self):
+        """Número de compañeros de manada dentro del radio de comunicación"""
+        rejilla = RejillaEspacial(self.ancho, self.alto, self.radio_comunicacion).construir(self.pos_lobos)
+        i, j, _, _ = rejilla.pares_en_radio(self.pos_lobos, self.radio_comunicacion)
+        mismo = (i != j) & (self.manada[i] == self.manada[j])
+        return np.bincount(i[mismo], minlength=len(self.rol))
+
+    # ------------------------------------------------------------------
+    # Ciclo de simulación
+    # ------------------------------------------------------------------
+    def paso_simulacion(self):
+        """Ejecuta un paso de la simulación"""
+        self.tiempo += 1
+
+        if self.presas_vivas.any():
+            self.huir()
+            self.mover_presas()
+
+        if self.presas_vivas.any():
+            objetivo_lobo = self.asignar_objetivos()
+            self.perseguir(objetivo_lobo)
+            self.mover_lobos()
+            self.atacar(objetivo_lobo)
+
+    def ejecutar(self, pasos):
+        for _ in range(pasos):
+            self.paso_simulacion()
+            if not self.presas_vivas.any():
+                break
+        return self.estadisticas
+
+
+def medir_rendimiento(n_manadas=400, n_presas=8000, pasos=50, ancho=1000, alto=800):
+    """Mide pasos por segundo con miles de agentes"""
+    sim = SimulacionCazaVectorizada(ancho, alto, n_manadas=n_manadas, n_presas=n_presas,
+                                    semilla=42, inicio_uniforme=True)
+    n_agentes = len(sim.rol) + n_presas
+
+    inicio = time.perf_counter()
+    for _ in range(pasos):
+        sim.paso_simulacion()
+    duracion = time.perf_counter() - inicio
+
+    print(f"🐺 {n_agentes:,} agentes ({len(sim.rol):,} lobos, {n_presas:,} presas)")
+    print(f"⏱️  {pasos} pasos en {duracion:.2f} s → {pasos / duracion:.1f} pasos/s")
+    print(f"🎯 Capturas: {sim.estadisticas['capturas']:,} | Presas cazadas: {len(sim.estadisticas['tiempo_caza']):,}")
+    return pasos / duracion
+
+
+if __name__ == "__main__":
+    medir_rendimiento()